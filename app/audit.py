@@ -0,0 +1,216 @@
+"""
+Degree audit over ``degree_requirements.csv``.
+
+Each credit requirement is compiled once per dataset into an int bitmask
+over the courses it accepts, with every course's credit weight alongside.
+A student's completions become one bitmask, so auditing a requirement is an
+AND plus a credit sum. ``audit_population`` builds every student's bitmask
+in a single pass over the course -> completers index (touching only the
+courses some requirement counts) and audits each distinct bitmask once,
+since most students share a handful of completion patterns.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import AbstractSet, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .data_loader import SyntheticDataset, dataset_cache, get_dataset
+
+GPA_PATTERN = re.compile(r"(\d+(?:\.\d+)?)")
+
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in (value or "").split("|") if item.strip()]
+
+
+def _bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class _Requirement:
+    __slots__ = ("requirement_id", "label", "category", "mask", "credit_min", "credit_max", "gpa_min")
+
+    def __init__(
+        self,
+        requirement_id: str,
+        label: str,
+        category: str,
+        mask: int = 0,
+        credit_min: float = 0.0,
+        credit_max: Optional[float] = None,
+        gpa_min: Optional[float] = None,
+    ) -> None:
+        self.requirement_id = requirement_id
+        self.label = label
+        self.category = category
+        self.mask = mask
+        self.credit_min = credit_min
+        self.credit_max = credit_max
+        self.gpa_min = gpa_min
+
+
+class _AuditIndex:
+    """Requirement bitmasks and course credit weights for one dataset."""
+
+    def __init__(self, dataset: SyntheticDataset) -> None:
+        eligible_by_requirement: Dict[str, List[str]] = {
+            requirement_id: [cid for cid in _split(row.get("eligible_courses", "")) if cid in dataset.courses]
+            for requirement_id, row in dataset.degree_requirements.items()
+        }
+        counted = {cid for eligible in eligible_by_requirement.values() for cid in eligible}
+        self.course_ids: Tuple[str, ...] = tuple(cid for cid in dataset.courses if cid in counted)
+        self.bit: Dict[str, int] = {cid: pos for pos, cid in enumerate(self.course_ids)}
+        self.credits: List[float] = [
+            _parse_float(dataset.courses[cid].get("credits")) or 0.0 for cid in self.course_ids
+        ]
+
+        self.requirements: List[_Requirement] = []
+        for requirement_id, row in dataset.degree_requirements.items():
+            requirement = _Requirement(requirement_id, row.get("label", ""), row.get("category", ""))
+            eligible = eligible_by_requirement[requirement_id]
+            if eligible:
+                requirement.mask = self.mask_of(eligible)
+                requirement.credit_min = _parse_float(row.get("credit_min")) or 0.0
+                requirement.credit_max = _parse_float(row.get("credit_max"))
+            elif requirement.category == "minimum-gpa":
+                # The CSV has no GPA column, so the threshold comes from the label
+                match = GPA_PATTERN.search(requirement.label)
+                requirement.gpa_min = float(match.group(1)) if match else None
+            self.requirements.append(requirement)
+
+    def mask_of(self, course_ids: Iterable[str]) -> int:
+        mask = 0
+        for course_id in course_ids:
+            if course_id in self.bit:
+                mask |= 1 << self.bit[course_id]
+        return mask
+
+    def credits_in(self, mask: int) -> float:
+        return sum((self.credits[pos] for pos in _bits(mask)), 0.0)
+
+
+@dataset_cache
+def _audit_index(dataset: SyntheticDataset) -> _AuditIndex:
+    return _AuditIndex(dataset)
+
+
+def _course_results(index: _AuditIndex, mask: int) -> List[Dict[str, object]]:
+    results: List[Dict[str, object]] = []
+    for requirement in index.requirements:
+        if not requirement.mask:
+            continue
+        counted = mask & requirement.mask
+        earned = index.credits_in(counted)
+        if requirement.credit_max is not None:
+            earned = min(earned, requirement.credit_max)
+        remaining = max(requirement.credit_min - earned, 0.0)
+        results.append({
+            "requirement_id": requirement.requirement_id,
+            "label": requirement.label,
+            "category": requirement.category,
+            "satisfied": remaining == 0,
+            "credits_earned": earned,
+            "credits_required": requirement.credit_min,
+            "remaining_credits": remaining,
+            "completed_courses": [index.course_ids[pos] for pos in _bits(counted)],
+        })
+    return results
+
+
+def _gpa_results(index: _AuditIndex, gpa: Optional[float]) -> List[Dict[str, object]]:
+    results: List[Dict[str, object]] = []
+    for requirement in index.requirements:
+        if requirement.mask:
+            continue
+        if requirement.gpa_min is None or gpa is None:
+            satisfied: Optional[bool] = None  # needs an advisor
+        else:
+            satisfied = gpa >= requirement.gpa_min
+        results.append({
+            "requirement_id": requirement.requirement_id,
+            "label": requirement.label,
+            "category": requirement.category,
+            "satisfied": satisfied,
+            "gpa": gpa,
+            "gpa_required": requirement.gpa_min,
+        })
+    return results
+
+
+def _student_gpa(student_id: str, dataset: SyntheticDataset) -> Optional[float]:
+    return _parse_float((dataset.performance.get(student_id) or {}).get("cumulative_gpa"))
+
+
+def _audit_payload(
+    student_id: str,
+    course_results: List[Dict[str, object]],
+    gpa_results: List[Dict[str, object]],
+) -> Dict[str, object]:
+    requirements = course_results + gpa_results
+    return {
+        "student_id": student_id,
+        "satisfied": all(item["satisfied"] is True for item in requirements),
+        "remaining_credits": sum((float(item["remaining_credits"]) for item in course_results), 0.0),
+        "requirements": requirements,
+    }
+
+
+def audit_student(student_id: str, dataset: Optional[SyntheticDataset] = None) -> Dict[str, object]:
+    """Requirement-by-requirement audit of one student's completed courses."""
+    dataset = dataset or get_dataset()
+    index = _audit_index(dataset)
+    mask = index.mask_of(dataset.student_completed_courses.get(student_id, set()))
+    return _audit_payload(
+        student_id,
+        _course_results(index, mask),
+        _gpa_results(index, _student_gpa(student_id, dataset)),
+    )
+
+
+def audit_population(dataset: Optional[SyntheticDataset] = None) -> Iterator[Dict[str, object]]:
+    """Yield an audit for every student in ``students.csv`` order."""
+    dataset = dataset or get_dataset()
+    index = _audit_index(dataset)
+    masks: Dict[str, int] = {}
+    for pos, course_id in enumerate(index.course_ids):
+        bit = 1 << pos
+        for student_id in dataset.collaborative_matrix.get(course_id, ()):
+            masks[student_id] = masks.get(student_id, 0) | bit
+
+    by_mask: Dict[int, List[Dict[str, object]]] = {}
+    for student_id in dataset.students:
+        mask = masks.get(student_id, 0)
+        if mask not in by_mask:
+            by_mask[mask] = _course_results(index, mask)
+        yield _audit_payload(
+            student_id,
+            by_mask[mask],
+            _gpa_results(index, _student_gpa(student_id, dataset)),
+        )
+
+
+def open_requirement_courses(
+    completed_courses: AbstractSet[str], dataset: SyntheticDataset
+) -> Set[str]:
+    """Uncompleted courses that count toward a requirement the student has not yet met."""
+    index = _audit_index(dataset)
+    mask = index.mask_of(completed_courses)
+    gaps = 0
+    for requirement in index.requirements:
+        if not requirement.mask:
+            continue
+        earned = index.credits_in(mask & requirement.mask)
+        if earned < requirement.credit_min:
+            gaps |= requirement.mask & ~mask
+    return {index.course_ids[pos] for pos in _bits(gaps)}
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+
+V = TypeVar("V")
+
+
+class SizedLRUCache(Generic[V]):
+    """Thread-safe LRU cache bounded by the total size of its values.
+
+    ``sizeof`` measures each value when it is stored (``len`` by default, so
+    byte strings are bounded by their length). Values larger than the whole
+    budget are not cached at all.
+    """
+
+    def __init__(self, max_size: int, sizeof: Callable[[V], int] = len) -> None:
+        self.max_size = max_size
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, tuple[V, int]]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, value: V) -> bool:
+        size = self._sizeof(value)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_size:
+                return False
+            self._entries[key] = (value, size)
+            self._total += size
+            while self._total > self.max_size:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+            return True
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            self._discard(key)
+            return entry[0] if entry else None
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def total_size(self) -> int:
+        return self._total
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total -= entry[1]
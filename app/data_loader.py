@@ -1,19 +1,70 @@
 from __future__ import annotations
 
 import csv
-from dataclasses import dataclass
-from functools import lru_cache
+import gc
+import hashlib
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import lru_cache, wraps
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from types import FunctionType, ModuleType
+from typing import AbstractSet, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple, TypeVar
+
+from .metrics import CACHE_LOOKUPS, DATASET_BUILDS, DATASET_EVICTIONS, METRICS, STAGE_SECONDS
+from .shared_index import SharedIndex, course_students_view, student_courses_view, student_tags_view
+from .terms import SEASON_NAMES, term_sort_key
 
 
 BASE_DIR = Path(__file__).resolve().parents[1]
-DATA_DIR = BASE_DIR / "data" / "synthetic"
+DATA_DIR = Path(os.environ.get("MAC_DATA_DIR") or BASE_DIR / "data" / "synthetic")
+DATASET_FILES = (
+    "courses.csv",
+    "students.csv",
+    "enrollments.csv",
+    "student_preferences.csv",
+    "student_performance.csv",
+    "course_offerings.csv",
+    "degree_requirements.csv",
+)
+# Only the planner, timetable and audit read these; without them those sections are empty
+OPTIONAL_DATASET_FILES = frozenset({"course_offerings.csv", "degree_requirements.csv"})
+# Catalog columns indexed value -> course IDs for filtered recommendation queries
+FACET_FIELDS = ("delivery_mode", "category", "difficulty_level", "credits")
+# Set by gunicorn.conf.py when preloading; swaps hot dict/set indexes for SharedIndex
+SHARED_DATASET = os.environ.get("MAC_SHARED_DATASET", "0") == "1"
+DEFAULT_DATASET = "default"
+DATASET_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def _parse_dataset_dirs(value: str) -> Dict[str, Path]:
+    directories: Dict[str, Path] = {}
+    for item in value.split(","):
+        name, _, path = (part.strip() for part in item.partition("="))
+        if not name and not path:
+            continue
+        if not DATASET_NAME_PATTERN.match(name) or name == DEFAULT_DATASET or not path:
+            raise ValueError(f"MAC_DATASETS entries must look like name=/path/to/csvs, got {item.strip()!r}")
+        directories[name] = Path(path).expanduser()
+    return directories
+
+
+# More CSV sets served by name, e.g. MAC_DATASETS="engineering=/srv/eng,nursing=/srv/nursing"
+DATASET_DIRS = _parse_dataset_dirs(os.environ.get("MAC_DATASETS", ""))
+# Ceiling on the measured footprint of those datasets; 0 never evicts
+DATASET_MEMORY_MB = float(os.environ.get("MAC_DATASET_MEMORY_MB", "0"))
 
+T = TypeVar("T")
 
-def _read_csv(filename: str) -> List[Dict[str, str]]:
-    path = DATA_DIR / filename
+
+def _read_csv(filename: str, data_dir: Path = DATA_DIR) -> List[Dict[str, str]]:
+    path = data_dir / filename
     if not path.exists():
+        if filename in OPTIONAL_DATASET_FILES:
+            return []
         raise FileNotFoundError(f"Expected dataset file missing: {path}")
 
     with path.open("r", encoding="utf-8-sig") as handle:
@@ -21,44 +72,108 @@ def _read_csv(filename: str) -> List[Dict[str, str]]:
         return [dict(row) for row in reader]
 
 
-@dataclass(frozen=True)
-class SyntheticDataset:
-    courses: Dict[str, Dict[str, str]]
-    students: Dict[str, Dict[str, str]]
-    enrollments: List[Dict[str, str]]
-    preferences: Dict[str, List[Dict[str, str]]]
-    performance: Dict[str, Dict[str, str]]
-    student_completed_courses: Dict[str, Set[str]]
-    student_interest_tags: Dict[str, Set[str]]
-    course_skill_tags: Dict[str, Set[str]]
-    collaborative_matrix: Dict[str, Set[str]]
-    interest_catalog: Tuple[str, ...]
+def _attribute_values(obj: object) -> List[object]:
+    """Instance attributes of ``obj``, from its ``__dict__`` and any ``__slots__``."""
+    values: List[object] = []
+    instance_dict = getattr(obj, "__dict__", None)
+    if isinstance(instance_dict, dict):
+        values.append(instance_dict)
+    for cls in type(obj).__mro__:
+        for slot in cls.__dict__.get("__slots__", ()):
+            if slot not in ("__dict__", "__weakref__") and hasattr(obj, slot):
+                values.append(getattr(obj, slot))
+    return values
 
 
-def _split_tags(value: str) -> Set[str]:
-    return {item.strip() for item in value.split("|") if item.strip()} if value else set()
+def _deep_sizeof(root: object, sample: int = 512) -> int:
+    """Approximate bytes held by ``root`` and everything reachable through its containers and attributes.
+
+    Each object is counted once. Containers with more than ``sample``
+    entries are measured from an evenly strided sample scaled up to their
+    length, which keeps the walk far cheaper than building the section.
+    The walk stops at datasets and ``SharedIndex`` (measured separately),
+    classes, modules and functions.
+    """
+    seen: Set[int] = set()
+    stack: List[Tuple[object, float]] = [(root, 1.0)]
+    total = 0.0
+    while stack:
+        obj, weight = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj) * weight
+        if isinstance(obj, dict):
+            entries = obj.items()
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            entries = obj
+        elif isinstance(obj, (str, bytes, int, float, memoryview)):
+            continue
+        elif isinstance(obj, (SyntheticDataset, SharedIndex, type, ModuleType, FunctionType)):
+            continue
+        else:
+            entries = _attribute_values(obj)
+        if len(entries) > sample:
+            entries = list(entries)
+            picked = entries[::len(entries) // sample]
+            weight *= len(entries) / len(picked)
+        else:
+            picked = entries
+        for entry in picked:
+            if isinstance(obj, dict):
+                stack.append((entry[0], weight))
+                stack.append((entry[1], weight))
+            else:
+                stack.append((entry, weight))
+    return int(total)
 
 
-def _build_dataset() -> SyntheticDataset:
-    courses_rows = _read_csv("courses.csv")
-    students_rows = _read_csv("students.csv")
-    enrollments_rows = _read_csv("enrollments.csv")
-    preferences_rows = _read_csv("student_preferences.csv")
-    performance_rows = _read_csv("student_performance.csv")
+def _dataset_version(data_dir: Path = DATA_DIR) -> str:
+    digest = hashlib.sha1()
+    for filename in DATASET_FILES:
+        path = data_dir / filename
+        if not path.exists():
+            if filename in OPTIONAL_DATASET_FILES:
+                digest.update(f"{filename}:missing;".encode())
+                continue
+            raise FileNotFoundError(f"Expected dataset file missing: {path}")
+        stat = path.stat()
+        digest.update(f"{filename}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:12]
 
-    courses = {row["course_id"]: row for row in courses_rows}
-    students = {row["student_id"]: row for row in students_rows}
-    performance = {row["student_id"]: row for row in performance_rows}
 
-    preferences: Dict[str, List[Dict[str, str]]] = {}
-    for row in preferences_rows:
-        preferences.setdefault(row["student_id"], []).append(row)
+def _split_tags(value: str) -> Set[str]:
+    return {item.strip() for item in value.split("|") if item.strip()} if value else set()
 
+
+def _build_catalog(dataset: SyntheticDataset) -> Dict[str, object]:
+    courses = {row["course_id"]: row for row in _read_csv("courses.csv", dataset.data_dir)}
     course_skill_tags = {
         course_id: _split_tags(row.get("skills", ""))
         for course_id, row in courses.items()
     }
+    return {"courses": courses, "course_skill_tags": course_skill_tags}
+
+
+def _build_facets(dataset: SyntheticDataset) -> Dict[str, object]:
+    course_facets: Dict[str, Dict[str, Set[str]]] = {field: {} for field in FACET_FIELDS}
+    for course_id, row in dataset.courses.items():
+        for field in FACET_FIELDS:
+            course_facets[field].setdefault((row.get(field) or "").strip(), set()).add(course_id)
+    return {"course_facets": course_facets}
+
+
+def _build_students(dataset: SyntheticDataset) -> Dict[str, object]:
+    students = {row["student_id"]: row for row in _read_csv("students.csv", dataset.data_dir)}
+    performance = {
+        row["student_id"]: row
+        for row in _read_csv("student_performance.csv", dataset.data_dir)
+    }
+    return {"students": students, "performance": performance}
 
+
+def _build_enrollment_graph(dataset: SyntheticDataset) -> Dict[str, object]:
+    enrollments_rows = _read_csv("enrollments.csv", dataset.data_dir)
     student_completed_courses: Dict[str, Set[str]] = {}
     collaborative_matrix: Dict[str, Set[str]] = {}
     for row in enrollments_rows:
@@ -68,9 +183,20 @@ def _build_dataset() -> SyntheticDataset:
         course_id = row["course_id"]
         student_completed_courses.setdefault(student_id, set()).add(course_id)
         collaborative_matrix.setdefault(course_id, set()).add(student_id)
+    return {
+        "enrollments": enrollments_rows,
+        "student_completed_courses": student_completed_courses,
+        "collaborative_matrix": collaborative_matrix,
+    }
+
+
+def _build_preferences(dataset: SyntheticDataset) -> Dict[str, object]:
+    preferences: Dict[str, List[Dict[str, str]]] = {}
+    for row in _read_csv("student_preferences.csv", dataset.data_dir):
+        preferences.setdefault(row["student_id"], []).append(row)
 
     student_interest_tags: Dict[str, Set[str]] = {}
-    for student_id, student in students.items():
+    for student_id, student in dataset.students.items():
         tags = _split_tags(student.get("interests", ""))
         pref_tags = {
             pref_tag
@@ -89,24 +215,370 @@ def _build_dataset() -> SyntheticDataset:
             }
         )
     )
+    return {
+        "preferences": preferences,
+        "student_interest_tags": student_interest_tags,
+        "interest_catalog": interest_catalog,
+    }
+
+
+def _build_offerings(dataset: SyntheticDataset) -> Dict[str, object]:
+    course_offerings: Dict[str, List[Dict[str, str]]] = {}
+    for row in _read_csv("course_offerings.csv", dataset.data_dir):
+        course_offerings.setdefault(row["course_id"], []).append(row)
+    return {"course_offerings": course_offerings}
+
+
+def _build_term_index(dataset: SyntheticDataset) -> Dict[str, object]:
+    term_offerings: Dict[str, Set[str]] = {}
+    for course_id, offerings in dataset.course_offerings.items():
+        if course_id not in dataset.courses:
+            continue
+        for row in offerings:
+            term_offerings.setdefault(row["term_code"], set()).add(course_id)
+
+    season_offerings: Dict[str, Set[str]] = {season: set() for season in SEASON_NAMES}
+    for course_id, course in dataset.courses.items():
+        patterns = {item.lower() for item in _split_tags(course.get("term_patterns", ""))}
+        for season, name in SEASON_NAMES.items():
+            if name in patterns:
+                season_offerings[season].add(course_id)
+    return {"term_offerings": term_offerings, "season_offerings": season_offerings}
+
+
+def _build_requirements(dataset: SyntheticDataset) -> Dict[str, object]:
+    degree_requirements = {
+        row["requirement_id"]: row
+        for row in _read_csv("degree_requirements.csv", dataset.data_dir)
+    }
+    return {"degree_requirements": degree_requirements}
+
+
+def _count_popularity(dataset: SyntheticDataset) -> Dict[str, object]:
+    # Stream enrollments instead of materializing the graph for catalog-only routes
+    path = dataset.data_dir / "enrollments.csv"
+    completed: Dict[str, Set[str]] = {}
+    with path.open("r", encoding="utf-8-sig") as handle:
+        for row in csv.DictReader(handle):
+            if row.get("completion_status") == "completed":
+                completed.setdefault(row["course_id"], set()).add(row["student_id"])
+    return {"course_popularity": {course_id: len(peers) for course_id, peers in completed.items()}}
+
+
+_SECTION_BUILDERS: Dict[str, Callable[[SyntheticDataset], Dict[str, object]]] = {
+    "catalog": _build_catalog,
+    "facets": _build_facets,
+    "students": _build_students,
+    "enrollment_graph": _build_enrollment_graph,
+    "preferences": _build_preferences,
+    "popularity": _count_popularity,
+    "offerings": _build_offerings,
+    "term_index": _build_term_index,
+    "requirements": _build_requirements,
+}
+
+
+def _section_attribute(section: str, name: str) -> property:
+    return property(lambda self: self._section(section)[name])
+
+
+class SyntheticDataset:
+    """CSV-backed dataset whose sections are parsed on first access.
+
+    ``catalog`` (courses, skill tags), ``students`` (profiles, performance),
+    ``enrollment_graph`` (enrollments, completions, collaborative matrix),
+    ``preferences`` (preferences, interest tags, interest catalog),
+    ``facets`` (catalog value -> course IDs), ``term_index``,
+    ``offerings`` and ``requirements`` each have their own lock, so
+    concurrent first requests build a section once and catalog-only routes
+    never parse enrollments.
+    """
+
+    courses: Dict[str, Dict[str, str]] = _section_attribute("catalog", "courses")
+    course_skill_tags: Dict[str, Set[str]] = _section_attribute("catalog", "course_skill_tags")
+    students: Dict[str, Dict[str, str]] = _section_attribute("students", "students")
+    performance: Dict[str, Dict[str, str]] = _section_attribute("students", "performance")
+    enrollments: List[Dict[str, str]] = _section_attribute("enrollment_graph", "enrollments")
+    student_completed_courses: Mapping[str, AbstractSet[str]] = _section_attribute(
+        "enrollment_graph", "student_completed_courses"
+    )
+    collaborative_matrix: Mapping[str, AbstractSet[str]] = _section_attribute(
+        "enrollment_graph", "collaborative_matrix"
+    )
+    preferences: Dict[str, List[Dict[str, str]]] = _section_attribute("preferences", "preferences")
+    student_interest_tags: Mapping[str, AbstractSet[str]] = _section_attribute(
+        "preferences", "student_interest_tags"
+    )
+    interest_catalog: Tuple[str, ...] = _section_attribute("preferences", "interest_catalog")
+    course_offerings: Dict[str, List[Dict[str, str]]] = _section_attribute("offerings", "course_offerings")
+    degree_requirements: Dict[str, Dict[str, str]] = _section_attribute("requirements", "degree_requirements")
+
+    def __init__(self, data_dir: Path = DATA_DIR, version: Optional[str] = None) -> None:
+        self.data_dir = data_dir
+        self.version = version or _dataset_version(data_dir)
+        self.shared: Optional[SharedIndex] = None
+        self._sections: Dict[str, Dict[str, object]] = {}
+        self._section_bytes: Dict[str, int] = {}
+        self._derived_bytes: Dict[Callable, int] = {}
+        self._locks = {name: threading.Lock() for name in _SECTION_BUILDERS}
+        self._derived: Dict[Callable, object] = {}
+        self._derived_locks: Dict[Callable, threading.Lock] = {}
+        self._derived_lock = threading.Lock()
+
+    def _section(self, name: str) -> Dict[str, object]:
+        section = self._sections.get(name)
+        if section is None:
+            with self._locks[name]:
+                section = self._sections.get(name)
+                if section is None:
+                    with METRICS.timed(STAGE_SECONDS, stage=f"load_{name}"):
+                        section = _SECTION_BUILDERS[name](self)
+                    self._sections[name] = section
+        return section
+
+    def derived(self, build: Callable[[SyntheticDataset], T]) -> T:
+        """``build(self)``, computed once per dataset and kept with it (see ``dataset_cache``)."""
+        value = self._derived.get(build)
+        if value is None:
+            with self._derived_lock:
+                lock = self._derived_locks.setdefault(build, threading.Lock())
+            with lock:
+                value = self._derived.get(build)
+                if value is None:
+                    value = self._derived[build] = build(self)
+        return value  # type: ignore[return-value]
+
+    def is_loaded(self, section: str) -> bool:
+        return section in self._sections
+
+    def loaded_sections(self) -> List[str]:
+        return sorted(self._sections)
 
-    return SyntheticDataset(
-        courses=courses,
-        students=students,
-        enrollments=enrollments_rows,
-        preferences=preferences,
-        performance=performance,
-        student_completed_courses=student_completed_courses,
-        student_interest_tags=student_interest_tags,
-        course_skill_tags=course_skill_tags,
-        collaborative_matrix=collaborative_matrix,
-        interest_catalog=interest_catalog,
+    def footprint_bytes(self) -> int:
+        """Approximate memory held by the loaded sections and ``derived`` indexes.
+
+        Each is measured once, after it is built. Rows an index shares with
+        a section are counted in both, so the total errs high.
+        """
+        for name, section in list(self._sections.items()):
+            if name not in self._section_bytes:
+                self._section_bytes[name] = _deep_sizeof(section)
+        for build, value in list(self._derived.items()):
+            if build not in self._derived_bytes:
+                self._derived_bytes[build] = _deep_sizeof(value)
+        shared = self.shared.nbytes if self.shared is not None else 0
+        return shared + sum(self._section_bytes.values()) + sum(self._derived_bytes.values())
+
+    @property
+    def course_popularity(self) -> Dict[str, int]:
+        """Distinct completers per course, without building the graph if it is not loaded yet."""
+        if self.is_loaded("enrollment_graph"):
+            return {course_id: len(peers) for course_id, peers in self.collaborative_matrix.items()}
+        return self._section("popularity")["course_popularity"]
+
+    @property
+    def published_terms(self) -> Tuple[str, ...]:
+        return tuple(sorted(self._section("term_index")["term_offerings"], key=term_sort_key))
+
+    def offered_courses(self, term_code: str) -> Set[str]:
+        """Courses offered in ``term_code``; unpublished terms fall back to course ``term_patterns``."""
+        index = self._section("term_index")
+        if term_code in index["term_offerings"]:
+            return index["term_offerings"][term_code]
+        return index["season_offerings"].get(term_code[-1:], set())
+
+    def facet_values(self, field: str) -> Tuple[str, ...]:
+        return tuple(sorted(value for value in self._section("facets")["course_facets"][field] if value))
+
+    def facet_courses(self, field: str, values: Iterable[str]) -> Set[str]:
+        """Courses whose ``field`` column holds any of ``values``."""
+        facet = self._section("facets")["course_facets"][field]
+        matched: Set[str] = set()
+        for value in values:
+            matched |= facet.get(value, set())
+        return matched
+
+    def load_all(self) -> SyntheticDataset:
+        for name in (
+            "catalog",
+            "facets",
+            "students",
+            "enrollment_graph",
+            "preferences",
+            "offerings",
+            "term_index",
+            "requirements",
+        ):
+            self._section(name)
+        return self
+
+
+def _build_dataset(data_dir: Path = DATA_DIR) -> SyntheticDataset:
+    METRICS.inc(DATASET_BUILDS)
+    return SyntheticDataset(data_dir)
+
+
+def _share_dataset(dataset: SyntheticDataset) -> SyntheticDataset:
+    dataset.load_all()
+    course_ids = list(dataset.courses)
+    known = set(course_ids)
+    course_ids.extend(
+        course_id
+        for course_id in dataset.collaborative_matrix
+        if course_id not in known
+    )
+    index = SharedIndex(
+        dataset.student_completed_courses,
+        dataset.student_interest_tags,
+        course_ids,
+        dataset.interest_catalog,
     )
+    dataset._sections["enrollment_graph"] = {
+        **dataset._sections["enrollment_graph"],
+        "student_completed_courses": student_courses_view(index),
+        "collaborative_matrix": course_students_view(index),
+    }
+    dataset._sections["preferences"] = {
+        **dataset._sections["preferences"],
+        "student_interest_tags": student_tags_view(index),
+    }
+    dataset.shared = index
+    dataset._section_bytes.pop("enrollment_graph", None)
+    dataset._section_bytes.pop("preferences", None)
+    return dataset
 
 
 @lru_cache(maxsize=1)
-def get_dataset() -> SyntheticDataset:
-    return _build_dataset()
+def _load_dataset() -> SyntheticDataset:
+    dataset = _build_dataset()
+    return _share_dataset(dataset) if SHARED_DATASET else dataset
+
+
+def _loaded_default() -> Optional[SyntheticDataset]:
+    """The default dataset if it has been built; never builds it."""
+    return _load_dataset() if _load_dataset.cache_info().currsize else None
+
+
+def dataset_cache(build: Callable[[SyntheticDataset], T]) -> Callable[[SyntheticDataset], T]:
+    """Cache an index built from a dataset on that dataset, so it is built once and released with it."""
+
+    @wraps(build)
+    def cached(dataset: SyntheticDataset) -> T:
+        return dataset.derived(build)
+
+    return cached
+
+
+class DatasetRegistry:
+    """Named datasets built on first use and evicted least recently used past a memory ceiling.
+
+    Names that resolve to the same directory share one dataset, and its
+    sections still load lazily. After each request ``trim`` measures the
+    loaded datasets (``footprint_bytes``) and evicts the least recently used
+    until the total fits ``memory_limit``, always keeping the most recent.
+    ``pinned`` returns a dataset that is never evicted (the default one)
+    but whose footprint still counts against the limit. Indexes cached with ``dataset_cache`` live on their dataset, so eviction
+    releases them without touching the other datasets' caches. Requests
+    already holding an evicted dataset finish with it.
+    """
+
+    def __init__(
+        self,
+        directories: Mapping[str, Path],
+        memory_limit: Optional[int] = None,
+        pinned: Optional[Callable[[], Optional[SyntheticDataset]]] = None,
+    ) -> None:
+        self.directories = {name: Path(path).resolve() for name, path in directories.items()}
+        self.memory_limit = memory_limit
+        self.pinned = pinned
+        self._loaded: "OrderedDict[Path, SyntheticDataset]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.directories
+
+    def get(self, name: str) -> SyntheticDataset:
+        """Raises ``KeyError`` for names that are not configured."""
+        path = self.directories[name]
+        with self._lock:
+            dataset = self._loaded.get(path)
+            METRICS.inc(CACHE_LOOKUPS, cache="dataset", result="miss" if dataset is None else "hit")
+            if dataset is None:
+                dataset = self._loaded[path] = _build_dataset(path)
+            self._loaded.move_to_end(path)
+        return dataset
+
+    def trim(self) -> List[Path]:
+        """Evict least recently used datasets until the measured total fits; returns their directories."""
+        if not self.memory_limit:
+            return []
+        with self._lock:
+            loaded = list(self._loaded.items())
+        # Measure outside the lock; new sections are walked once and then remembered
+        sizes = {path: dataset.footprint_bytes() for path, dataset in loaded}
+        pinned = self.pinned() if self.pinned is not None else None
+        pinned_bytes = pinned.footprint_bytes() if pinned is not None else 0
+        evicted: List[Path] = []
+        with self._lock:
+            total = pinned_bytes + sum(sizes.get(path, 0) for path in self._loaded)
+            while total > self.memory_limit and len(self._loaded) > 1:
+                path, _ = self._loaded.popitem(last=False)
+                total -= sizes.get(path, 0)
+                evicted.append(path)
+        if evicted:
+            METRICS.inc(DATASET_EVICTIONS, amount=len(evicted))
+        return evicted
+
+    def status(self) -> List[Dict[str, object]]:
+        with self._lock:
+            loaded = dict(self._loaded)
+        status = []
+        for name, path in sorted(self.directories.items()):
+            dataset = loaded.get(path)
+            status.append({
+                "name": name,
+                "data_dir": str(path),
+                "loaded": dataset is not None,
+                "sections": dataset.loaded_sections() if dataset is not None else [],
+                "footprint_bytes": dataset.footprint_bytes() if dataset is not None else 0,
+            })
+        return status
+
+
+REGISTRY = DatasetRegistry(DATASET_DIRS, int(DATASET_MEMORY_MB * 1024 * 1024) or None, pinned=_loaded_default)
+_ACTIVE_DATASET: ContextVar[Optional[str]] = ContextVar("mac_active_dataset", default=None)
+
+
+def select_dataset(name: Optional[str]) -> None:
+    """Make ``get_dataset()`` in this context return dataset ``name`` (``None`` means the default)."""
+    _ACTIVE_DATASET.set(name)
+
+
+def get_dataset(name: Optional[str] = None) -> SyntheticDataset:
+    """Dataset ``name``, else the one selected for this context, else the default ``MAC_DATA_DIR`` one."""
+    name = name or _ACTIVE_DATASET.get()
+    if name and name != DEFAULT_DATASET:
+        with METRICS.timed(STAGE_SECONDS, stage="get_dataset"):
+            return REGISTRY.get(name)
+    with METRICS.timed(STAGE_SECONDS, stage="get_dataset"):
+        misses = _load_dataset.cache_info().misses
+        dataset = _load_dataset()
+    result = "miss" if _load_dataset.cache_info().misses > misses else "hit"
+    METRICS.inc(CACHE_LOOKUPS, cache="dataset", result=result)
+    return dataset
+
+
+get_dataset.cache_clear = _load_dataset.cache_clear  # type: ignore[attr-defined]
 
 
+def preload_dataset() -> SyntheticDataset:
+    """Build the dataset in a preforking master and freeze it out of the GC.
 
+    ``gc.freeze`` moves every surviving object to the permanent generation so
+    collections in the workers never write to their headers, keeping the
+    inherited pages shared.
+    """
+    dataset = get_dataset()
+    gc.collect()
+    gc.freeze()
+    return dataset
@@ -0,0 +1,144 @@
+"""
+Catalog filters pushed down into recommendation candidate generation.
+
+Filters resolve to a course-ID set through the dataset's precomputed
+facet index (catalog value -> course IDs) before anything is scored, so a
+filtered query scores fewer courses than an unfiltered one and still fills
+its top-N whenever enough courses qualify.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .data_loader import SyntheticDataset
+
+
+def _values(raw: Iterable[str]) -> FrozenSet[str]:
+    return frozenset(item.strip() for value in raw for item in value.split("|") if item.strip())
+
+
+def _int_or_none(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+
+class CourseFilters:
+    """Allowed delivery modes, categories and credit values plus a difficulty range.
+
+    Empty sets and ``None`` bounds mean "no constraint" for that facet.
+    """
+
+    __slots__ = ("delivery_modes", "categories", "credits", "min_difficulty", "max_difficulty")
+
+    def __init__(
+        self,
+        delivery_modes: Iterable[str] = (),
+        categories: Iterable[str] = (),
+        credits: Iterable[str] = (),
+        min_difficulty: Optional[int] = None,
+        max_difficulty: Optional[int] = None,
+    ) -> None:
+        self.delivery_modes = _values(delivery_modes)
+        self.categories = _values(categories)
+        self.credits = _values(credits)
+        self.min_difficulty = min_difficulty
+        self.max_difficulty = max_difficulty
+
+    @classmethod
+    def from_params(cls, values) -> Optional[CourseFilters]:
+        """Parse ``delivery``, ``category``, ``credits`` (repeatable or pipe-separated) and ``min_difficulty``/``max_difficulty``.
+
+        ``values`` is a werkzeug ``MultiDict`` such as ``request.values``.
+        Returns ``None`` when no filter is set, and ignores malformed bounds.
+        """
+        filters = cls(
+            delivery_modes=values.getlist("delivery"),
+            categories=values.getlist("category"),
+            credits=values.getlist("credits"),
+            min_difficulty=_int_or_none(values.get("min_difficulty")),
+            max_difficulty=_int_or_none(values.get("max_difficulty")),
+        )
+        return filters if filters.active else None
+
+    @property
+    def active(self) -> bool:
+        return bool(
+            self.delivery_modes
+            or self.categories
+            or self.credits
+            or self.min_difficulty is not None
+            or self.max_difficulty is not None
+        )
+
+    def as_params(self) -> List[Tuple[str, str]]:
+        """``(name, value)`` pairs that ``from_params`` reads back, for hidden form fields."""
+        params = [
+            (name, value)
+            for name, selected in (
+                ("delivery", self.delivery_modes),
+                ("category", self.categories),
+                ("credits", self.credits),
+            )
+            for value in sorted(selected)
+        ]
+        if self.min_difficulty is not None:
+            params.append(("min_difficulty", str(self.min_difficulty)))
+        if self.max_difficulty is not None:
+            params.append(("max_difficulty", str(self.max_difficulty)))
+        return params
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "delivery": sorted(self.delivery_modes),
+            "category": sorted(self.categories),
+            "credits": sorted(self.credits),
+            "min_difficulty": self.min_difficulty,
+            "max_difficulty": self.max_difficulty,
+        }
+
+    def matching_courses(self, dataset: SyntheticDataset) -> Set[str]:
+        """Intersect the facet sets for every active constraint, smallest first."""
+        matches: List[Set[str]] = []
+        if self.delivery_modes:
+            matches.append(dataset.facet_courses("delivery_mode", self.delivery_modes))
+        if self.categories:
+            matches.append(dataset.facet_courses("category", self.categories))
+        if self.credits:
+            matches.append(dataset.facet_courses("credits", _credit_labels(self.credits, dataset)))
+        if self.min_difficulty is not None or self.max_difficulty is not None:
+            low = self.min_difficulty if self.min_difficulty is not None else float("-inf")
+            high = self.max_difficulty if self.max_difficulty is not None else float("inf")
+            levels = [
+                level
+                for level in dataset.facet_values("difficulty_level")
+                if _int_or_none(level) is not None and low <= int(level) <= high
+            ]
+            matches.append(dataset.facet_courses("difficulty_level", levels))
+        if not matches:
+            return set(dataset.courses)
+        matches.sort(key=len)
+        result = set(matches[0])
+        for other in matches[1:]:
+            result &= other
+        return result
+
+
+def _credit_labels(requested: FrozenSet[str], dataset: SyntheticDataset) -> Set[str]:
+    # Accept "3" for the catalog's "3.0"
+    wanted = set()
+    for value in requested:
+        try:
+            wanted.add(float(value))
+        except ValueError:
+            continue
+    labels = set(requested)
+    for label in dataset.facet_values("credits"):
+        try:
+            if float(label) in wanted:
+                labels.add(label)
+        except ValueError:
+            continue
+    return labels
@@ -0,0 +1,234 @@
+"""
+Lightweight latency histograms and counters exposed in Prometheus text format.
+
+Each process aggregates in memory. When ``METRICS_DIR`` (or
+``PROMETHEUS_MULTIPROC_DIR``) is set, every process also snapshots its
+aggregates to ``<dir>/metrics_<pid>_<start>.json`` at most once per
+``flush_interval`` seconds, and ``render()`` sums all snapshots, so any
+gunicorn worker can answer ``/metrics`` for the whole server. Snapshots of
+exited processes are removed with ``forget_process``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# For histograms of similarity scores in [-1, 1] rather than latencies
+RATIO_BUCKETS = (-0.5, 0.0, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0)
+
+STAGE_SECONDS = "mac_stage_duration_seconds"
+REQUEST_SECONDS = "mac_request_duration_seconds"
+DATASET_BUILDS = "mac_dataset_builds_total"
+DATASET_EVICTIONS = "mac_dataset_evictions_total"
+CACHE_LOOKUPS = "mac_cache_lookups_total"
+PARTIAL_RESULTS = "mac_partial_recommendations_total"
+SHADOW_SECONDS = "mac_shadow_duration_seconds"
+SINGLEFLIGHT_CALLS = "mac_singleflight_calls_total"
+SHADOW_RUNS = "mac_shadow_runs_total"
+SHADOW_OVERLAP = "mac_shadow_topn_overlap"
+SHADOW_RANK_CORRELATION = "mac_shadow_rank_correlation"
+
+_HELP = {
+    STAGE_SECONDS: "Latency of recommender and rendering stages.",
+    REQUEST_SECONDS: "Latency of Flask routes.",
+    DATASET_BUILDS: "Number of times the CSV dataset was parsed and indexed.",
+    DATASET_EVICTIONS: "Named datasets evicted to stay under MAC_DATASET_MEMORY_MB.",
+    CACHE_LOOKUPS: "Cache lookups by cache and result (hit/miss).",
+    PARTIAL_RESULTS: "Recommendations returned before collaborative scoring finished, by route.",
+    SINGLEFLIGHT_CALLS: "Coalesced computations by group and role (leader ran it, follower shared it).",
+    SHADOW_SECONDS: "Latency of the primary and shadow engine on sampled shadow requests.",
+    SHADOW_RUNS: "Shadow engine runs by kind, engine and result (ok/error/dropped).",
+    SHADOW_OVERLAP: "Share of the primary top-N the shadow engine also returned.",
+    SHADOW_RANK_CORRELATION: "Spearman correlation of the ranks of courses both engines returned.",
+}
+_BUCKETS = {
+    SHADOW_OVERLAP: RATIO_BUCKETS,
+    SHADOW_RANK_CORRELATION: RATIO_BUCKETS,
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class MetricsRegistry:
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.directory = directory
+        self.buckets = buckets
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._started = time.time()
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._histograms: Dict[Tuple[str, LabelKey], List[float]] = {}
+        self._last_flush = 0.0
+
+    def _check_fork(self) -> None:
+        # A forked worker must not keep reporting the parent's samples as its own
+        if os.getpid() != self._pid:
+            self._reset()
+
+    def inc(self, name: str, amount: float = 1.0, **labels: object) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._check_fork()
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+            self._maybe_flush()
+
+    def observe(self, name: str, seconds: float, **labels: object) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._check_fork()
+            # Layout: one slot per bucket, then +Inf, sum, count
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [0.0] * (len(self._buckets_for(name)) + 3)
+            series[bisect_left(self._buckets_for(name), seconds)] += 1
+            series[-2] += seconds
+            series[-1] += 1
+            self._maybe_flush()
+
+    def _buckets_for(self, name: str) -> Tuple[float, ...]:
+        return _BUCKETS.get(name, self.buckets)
+
+    @contextmanager
+    def timed(self, name: str = STAGE_SECONDS, **labels: object) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed_stage(self, stage: str) -> Callable:
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timed(STAGE_SECONDS, stage=stage):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _snapshot(self) -> Dict[str, list]:
+        return {
+            "counters": [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+            "histograms": [[name, list(labels), list(series)] for (name, labels), series in self._histograms.items()],
+        }
+
+    def _maybe_flush(self, force: bool = False) -> None:
+        if self.directory is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"metrics_{self._pid}_{int(self._started * 1000)}.json"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._snapshot()), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _collect(self) -> Dict[str, list]:
+        with self._lock:
+            self._check_fork()
+            if self.directory is None:
+                return self._snapshot()
+            self._maybe_flush(force=True)
+
+        merged_counters: Dict[Tuple[str, LabelKey], float] = {}
+        merged_histograms: Dict[Tuple[str, LabelKey], List[float]] = {}
+        for path in sorted(self.directory.glob("metrics_*.json")):
+            try:
+                snapshot = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):  # unreadable, or removed by forget_process
+                continue
+            for name, labels, value in snapshot.get("counters", []):
+                key = (name, tuple(tuple(pair) for pair in labels))
+                merged_counters[key] = merged_counters.get(key, 0.0) + value
+            for name, labels, series in snapshot.get("histograms", []):
+                key = (name, tuple(tuple(pair) for pair in labels))
+                current = merged_histograms.setdefault(key, [0.0] * len(series))
+                for idx, value in enumerate(series):
+                    current[idx] += value
+        return {
+            "counters": [[name, list(labels), value] for (name, labels), value in merged_counters.items()],
+            "histograms": [[name, list(labels), series] for (name, labels), series in merged_histograms.items()],
+        }
+
+    def forget_process(self, pid: int) -> None:
+        """Delete the snapshots written by process ``pid``, e.g. once a gunicorn worker has exited."""
+        if self.directory is None:
+            return
+        for path in self.directory.glob(f"metrics_{pid}_*.json"):
+            path.unlink(missing_ok=True)
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        snapshot = self._collect()
+        lines: List[str] = []
+        seen = set()
+
+        def header(name: str, kind: str) -> None:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for name, labels, value in sorted(snapshot["counters"], key=lambda item: (item[0], item[1])):
+            header(name, "counter")
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for name, labels, series in sorted(snapshot["histograms"], key=lambda item: (item[0], item[1])):
+            header(name, "histogram")
+            cumulative = 0.0
+            for bound, count in zip(self._buckets_for(name) + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels, le=le)} {_format_value(cumulative)}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {series[-2]!r}")
+            lines.append(f"{name}_count{_format_labels(labels)} {_format_value(series[-1])}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels, **extra: str) -> str:
+    pairs = [tuple(pair) for pair in labels] + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def _metrics_dir() -> Optional[Path]:
+    directory = os.environ.get("METRICS_DIR") or os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    return Path(directory) if directory else None
+
+
+METRICS = MetricsRegistry(_metrics_dir())
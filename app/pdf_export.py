@@ -2,6 +2,9 @@
 PDF Export functionality for MAC Course Pathfinder recommendations.
 """
 
+import hashlib
+import json
+import os
 from io import BytesIO
 from datetime import datetime
 from reportlab.lib.pagesizes import letter
@@ -9,7 +12,100 @@ from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.pdfgen import canvas
+
+from .cache import SizedLRUCache
+from .metrics import CACHE_LOOKUPS, METRICS, STAGE_SECONDS
+from .singleflight import PDF_FLIGHTS
+
+
+# Styles are immutable once built, so share them across renders
+STYLES = getSampleStyleSheet()
+
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=STYLES['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#667eea'),
+    spaceAfter=12,
+    alignment=1,  # Center
+)
+
+HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=STYLES['Heading2'],
+    fontSize=16,
+    textColor=colors.HexColor('#667eea'),
+    spaceAfter=10,
+    spaceBefore=20,
+)
+
+SUBHEADING_STYLE = ParagraphStyle(
+    'CustomSubHeading',
+    parent=STYLES['Heading3'],
+    fontSize=14,
+    textColor=colors.HexColor('#1e293b'),
+    spaceAfter=8,
+)
+
+BODY_STYLE = ParagraphStyle(
+    'CustomBody',
+    parent=STYLES['BodyText'],
+    fontSize=10,
+    textColor=colors.HexColor('#475569'),
+    spaceAfter=6,
+)
+
+SMALL_STYLE = ParagraphStyle(
+    'SmallText',
+    parent=STYLES['BodyText'],
+    fontSize=8,
+    textColor=colors.HexColor('#64748b'),
+)
+
+PROFILE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f8fafc')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#1e293b')),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e2e8f0')),
+    ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#cbd5e1')),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('LEFTPADDING', (0, 0), (-1, -1), 10),
+])
+
+DETAILS_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#475569')),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('TOPPADDING', (0, 0), (-1, -1), 4),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+])
+
+# Rendered PDFs keyed by a hash of everything that appears in the document
+PDF_CACHE = SizedLRUCache(int(os.environ.get("PDF_CACHE_MB", "32")) * 1024 * 1024)
+
+
+def pdf_cache_key(student, performance, recommendations, context, selected_interests=None):
+    """Content address for a rendered document.
+
+    The footer's generation timestamp is not part of the key, so a cached
+    copy keeps the time it was actually rendered.
+    """
+    document = [
+        student,
+        performance,
+        recommendations,
+        context,
+        list(selected_interests) if selected_interests else None,
+    ]
+    encoded = json.dumps(document, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
 
 
 def generate_recommendations_pdf(student, performance, recommendations, context, selected_interests=None):
@@ -26,61 +122,38 @@ def generate_recommendations_pdf(student, performance, recommendations, context,
     Returns:
         BytesIO buffer containing the PDF
     """
+    cache_key = pdf_cache_key(student, performance, recommendations, context, selected_interests)
+    cached = PDF_CACHE.get(cache_key)
+    METRICS.inc(CACHE_LOOKUPS, cache="pdf", result="miss" if cached is None else "hit")
+    if cached is not None:
+        return BytesIO(cached)
+
+    # Identical renders already in progress are shared rather than repeated
+    pdf_bytes = PDF_FLIGHTS.do(
+        cache_key, _render_pdf, student, performance, recommendations, context, selected_interests, cache_key
+    )
+    return BytesIO(pdf_bytes)
+
+
+def _render_pdf(student, performance, recommendations, context, selected_interests, cache_key):
+    """Build the PDF, store it in ``PDF_CACHE`` and return its bytes."""
+    cached = PDF_CACHE.get(cache_key)
+    if cached is not None:
+        # A render for this key finished between the caller's lookup and this flight
+        return cached
+
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.75*inch, bottomMargin=0.75*inch)
     story = []
-    styles = getSampleStyleSheet()
-    
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#667eea'),
-        spaceAfter=12,
-        alignment=1,  # Center
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#667eea'),
-        spaceAfter=10,
-        spaceBefore=20,
-    )
-    
-    subheading_style = ParagraphStyle(
-        'CustomSubHeading',
-        parent=styles['Heading3'],
-        fontSize=14,
-        textColor=colors.HexColor('#1e293b'),
-        spaceAfter=8,
-    )
-    
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['BodyText'],
-        fontSize=10,
-        textColor=colors.HexColor('#475569'),
-        spaceAfter=6,
-    )
-    
-    small_style = ParagraphStyle(
-        'SmallText',
-        parent=styles['BodyText'],
-        fontSize=8,
-        textColor=colors.HexColor('#64748b'),
-    )
     
     # Title
-    story.append(Paragraph("MAC Course Pathfinder", title_style))
-    story.append(Paragraph("Personalized Course Recommendations", styles['Heading3']))
+    story.append(Paragraph("MAC Course Pathfinder", TITLE_STYLE))
+    story.append(Paragraph("Personalized Course Recommendations", STYLES['Heading3']))
     story.append(Spacer(1, 0.2*inch))
     
     # Student Information
     if student:
-        story.append(Paragraph("Student Profile", heading_style))
+        story.append(Paragraph("Student Profile", HEADING_STYLE))
         
         profile_data = [
             ["Student ID:", student.get('student_id', 'N/A')],
@@ -97,26 +170,13 @@ def generate_recommendations_pdf(student, performance, recommendations, context,
             ])
         
         profile_table = Table(profile_data, colWidths=[2*inch, 4*inch])
-        profile_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f8fafc')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#1e293b')),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e2e8f0')),
-            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#cbd5e1')),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('LEFTPADDING', (0, 0), (-1, -1), 10),
-        ]))
+        profile_table.setStyle(PROFILE_TABLE_STYLE)
         
         story.append(profile_table)
         story.append(Spacer(1, 0.3*inch))
     
     # Recommendation Context
-    story.append(Paragraph("Recommendation Method", heading_style))
+    story.append(Paragraph("Recommendation Method", HEADING_STYLE))
     if context == "history":
         context_text = "These recommendations blend your completed coursework with insights from peers who share similar academic trajectories."
     else:
@@ -125,17 +185,17 @@ def generate_recommendations_pdf(student, performance, recommendations, context,
         else:
             context_text = "Curated based on your interest profile."
     
-    story.append(Paragraph(context_text, body_style))
+    story.append(Paragraph(context_text, BODY_STYLE))
     story.append(Spacer(1, 0.3*inch))
     
     # Recommendations
-    story.append(Paragraph(f"Top {len(recommendations)} Recommended Courses", heading_style))
+    story.append(Paragraph(f"Top {len(recommendations)} Recommended Courses", HEADING_STYLE))
     story.append(Spacer(1, 0.1*inch))
     
     for idx, rec in enumerate(recommendations, 1):
         # Course header
         course_header = f"<b>{idx}. {rec['course_code']}: {rec['title']}</b>"
-        story.append(Paragraph(course_header, subheading_style))
+        story.append(Paragraph(course_header, SUBHEADING_STYLE))
         
         # Course details table
         details_data = [
@@ -147,29 +207,21 @@ def generate_recommendations_pdf(student, performance, recommendations, context,
         ]
         
         details_table = Table(details_data, colWidths=[1.5*inch, 4.5*inch])
-        details_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#475569')),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('TOPPADDING', (0, 0), (-1, -1), 4),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-        ]))
+        details_table.setStyle(DETAILS_TABLE_STYLE)
         
         story.append(details_table)
         story.append(Spacer(1, 0.1*inch))
         
         # Description
-        story.append(Paragraph(f"<b>Description:</b> {rec['description']}", body_style))
+        story.append(Paragraph(f"<b>Description:</b> {rec['description']}", BODY_STYLE))
         
         # Skills
         if rec.get('skills'):
             skills_text = f"<b>Key Skills:</b> {', '.join(rec['skills'])}"
-            story.append(Paragraph(skills_text, body_style))
+            story.append(Paragraph(skills_text, BODY_STYLE))
         
         # Explanation
-        story.append(Paragraph(f"<b>Why this course:</b> {rec['explanation']}", body_style))
+        story.append(Paragraph(f"<b>Why this course:</b> {rec['explanation']}", BODY_STYLE))
         
         story.append(Spacer(1, 0.2*inch))
         
@@ -180,10 +232,12 @@ def generate_recommendations_pdf(student, performance, recommendations, context,
     # Footer
     story.append(Spacer(1, 0.3*inch))
     footer_text = f"Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')} | MAC Course Pathfinder"
-    story.append(Paragraph(footer_text, small_style))
+    story.append(Paragraph(footer_text, SMALL_STYLE))
     
     # Build PDF
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+    with METRICS.timed(STAGE_SECONDS, stage="render_pdf"):
+        doc.build(story)
+    pdf_bytes = buffer.getvalue()
+    PDF_CACHE.put(cache_key, pdf_bytes)
+    return pdf_bytes
 
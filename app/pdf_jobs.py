@@ -0,0 +1,395 @@
+"""
+Background PDF rendering for the opt-in asynchronous export mode.
+
+Rendering runs in a small process pool so reportlab's layout work does not
+hold a web worker. Jobs are tracked per web process; finished PDFs live in a
+byte-bounded LRU cache and expire once evicted. When ``PDF_JOBS_DIR`` names
+a directory shared by the gunicorn workers, each job's status and PDF are
+also written there, so any worker can answer status and download requests.
+PDFs in that directory have their own byte budget and are evicted least
+recently used first, after which their jobs report expired. Without it, job IDs carry the owning process ID, and lookups that reach
+another worker are reported as misdirected instead of unknown.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cache import SizedLRUCache
+from .metrics import METRICS, SINGLEFLIGHT_CALLS
+from .pdf_export import PDF_CACHE, generate_recommendations_pdf, pdf_cache_key
+
+
+JOB_ID_PATTERN = re.compile(r"^([0-9a-f]+)-[0-9a-f]{32}$")
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when too many PDF renders are already waiting."""
+
+
+def _new_job_id() -> str:
+    return f"{os.getpid():x}-{uuid.uuid4().hex}"
+
+
+def job_owner(job_id: str) -> Optional[int]:
+    """Process ID that accepted ``job_id``, or ``None`` if it is not a job ID."""
+    match = JOB_ID_PATTERN.match(job_id)
+    return int(match.group(1), 16) if match else None
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _render_pdf_bytes(student, performance, recommendations, context, selected_interests) -> bytes:
+    return generate_recommendations_pdf(
+        student, performance, recommendations, context, selected_interests
+    ).getvalue()
+
+
+def _render_pdf_timed(student, performance, recommendations, context, selected_interests) -> Tuple[bytes, float]:
+    started = time.perf_counter()
+    pdf_bytes = _render_pdf_bytes(student, performance, recommendations, context, selected_interests)
+    return pdf_bytes, (time.perf_counter() - started) * 1000.0
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only sink that hands zip output back in chunks as it is produced."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class PdfJobQueue:
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_pending: int = 32,
+        cache_bytes: int = 64 * 1024 * 1024,
+        max_tracked_jobs: int = 1024,
+        jobs_dir: Optional[Path] = None,
+        jobs_dir_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_tracked_jobs = max_tracked_jobs
+        self.jobs_dir = jobs_dir
+        self.jobs_dir_bytes = jobs_dir_bytes
+        if jobs_dir is not None:
+            jobs_dir.mkdir(parents=True, exist_ok=True)
+        self.results: SizedLRUCache[bytes] = SizedLRUCache(cache_bytes)
+        self._jobs: "OrderedDict[str, Dict[str, object]]" = OrderedDict()
+        # cache_key -> pending job rendering it, so identical submissions share the job
+        self._in_flight: Dict[str, str] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created lazily so each gunicorn worker starts its own pool after forking.
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _submit(self, fn, *args) -> Future:
+        executor = self._get_executor()
+        try:
+            return executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # A render process died (e.g. OOM-killed); the pool rejects all work until replaced
+            self._replace_executor(executor)
+            return self._get_executor().submit(fn, *args)
+
+    def _replace_executor(self, broken: ProcessPoolExecutor) -> None:
+        with self._executor_lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(
+        self,
+        student,
+        performance,
+        recommendations: List[Dict[str, object]],
+        context: str,
+        selected_interests: Optional[List[str]],
+        filename: str,
+    ) -> str:
+        cache_key = pdf_cache_key(student, performance, recommendations, context, selected_interests)
+        cached = PDF_CACHE.get(cache_key)
+        if cached is not None:
+            return self._add_finished_job(cached, filename)
+
+        with self._lock:
+            job_id = self._in_flight.get(cache_key)
+            if job_id is not None and job_id in self._jobs:
+                METRICS.inc(SINGLEFLIGHT_CALLS, group="pdf_jobs", role="follower")
+                return job_id
+            if self._pending >= self.max_pending:
+                raise JobQueueFull("PDF render queue is full; try again shortly.")
+            # Submit before registering anything, so a failed submit leaves no pending job behind
+            future = self._submit(
+                _render_pdf_bytes,
+                student,
+                performance,
+                recommendations,
+                context,
+                selected_interests,
+            )
+            self._pending += 1
+            job_id = _new_job_id()
+            job = self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "pending",
+                "filename": filename,
+                "submitted_at": time.time(),
+            }
+            self._publish(job)
+            self._in_flight[cache_key] = job_id
+            self._trim_jobs()
+            METRICS.inc(SINGLEFLIGHT_CALLS, group="pdf_jobs", role="leader")
+        future.add_done_callback(lambda done: self._finish(job_id, cache_key, done))
+        return job_id
+
+    def _add_finished_job(self, pdf_bytes: bytes, filename: str) -> str:
+        job_id = _new_job_id()
+        now = time.time()
+        self.results.put(job_id, pdf_bytes)
+        with self._lock:
+            job = self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "done",
+                "filename": filename,
+                "submitted_at": now,
+                "finished_at": now,
+            }
+            self._publish(job, pdf_bytes)
+            self._trim_jobs()
+        return job_id
+
+    def _job_path(self, job_id: str, suffix: str) -> Path:
+        assert self.jobs_dir is not None
+        return self.jobs_dir / f"{job_id}{suffix}"
+
+    def _publish(self, job: Dict[str, object], pdf_bytes: Optional[bytes] = None) -> None:
+        """Mirror ``job`` (and its PDF) into ``jobs_dir`` for the other workers; the PDF goes first."""
+        if self.jobs_dir is None:
+            return
+        job_id = str(job["job_id"])
+        # Like the in-memory LRU, a PDF larger than the whole budget is not kept
+        if pdf_bytes is not None and len(pdf_bytes) <= self.jobs_dir_bytes:
+            _write_atomic(self._job_path(job_id, ".pdf"), pdf_bytes)
+            self._trim_jobs_dir()
+        _write_atomic(self._job_path(job_id, ".json"), json.dumps(job).encode("utf-8"))
+
+    def _trim_jobs_dir(self) -> None:
+        """Delete least recently used PDFs from ``jobs_dir`` until they fit ``jobs_dir_bytes``.
+
+        The budget covers every worker's PDFs; reads refresh a file's mtime,
+        so the oldest mtime is the least recently used.
+        """
+        assert self.jobs_dir is not None
+        files: List[Tuple[float, int, Path]] = []
+        for path in self.jobs_dir.glob("*.pdf"):
+            try:
+                stat = path.stat()
+            except OSError:  # deleted by another worker meanwhile
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.jobs_dir_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def _trim_jobs(self) -> None:
+        while len(self._jobs) > self.max_tracked_jobs:
+            stale_id, _ = self._jobs.popitem(last=False)
+            self.results.pop(stale_id)
+            if self.jobs_dir is not None:
+                self._job_path(stale_id, ".json").unlink(missing_ok=True)
+                self._job_path(stale_id, ".pdf").unlink(missing_ok=True)
+
+    def _finish(self, job_id: str, cache_key: str, future: Future) -> None:
+        error = future.exception()
+        if error is None:
+            PDF_CACHE.put(cache_key, future.result())
+            self.results.put(job_id, future.result())
+        with self._lock:
+            self._pending -= 1
+            if self._in_flight.get(cache_key) == job_id:
+                del self._in_flight[cache_key]
+            job = self._jobs.get(job_id)
+            if job is None:
+                self.results.pop(job_id)
+                return
+            job["finished_at"] = time.time()
+            if error is not None:
+                job["status"] = "failed"
+                job["error"] = str(error)
+            else:
+                job["status"] = "done"
+            self._publish(job, future.result() if error is None else None)
+
+    def stream_zip(self, documents: Iterable[Dict[str, object]]) -> Iterator[bytes]:
+        """Render ``documents`` on the pool and yield a ZIP archive incrementally.
+
+        Each document is a dict with ``filename``, ``student_id`` and ``args``
+        (the ``generate_recommendations_pdf`` arguments), or an ``error`` to
+        record in the manifest without rendering. At most
+        ``max_workers`` renders are in flight, PDFs are written in input order
+        as they complete, and ``manifest.json`` closes the archive with the
+        per-document render times.
+        """
+        sink = _ZipStream()
+        archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+        manifest: List[Dict[str, object]] = []
+        in_flight: Deque[Tuple[Dict[str, object], str, object]] = deque()
+        source = iter(documents)
+
+        def fill() -> None:
+            while len(in_flight) < self.max_workers:
+                document = next(source, None)
+                if document is None:
+                    return
+                if "error" in document:
+                    in_flight.append((document, "", None))
+                    continue
+                args = document["args"]
+                cache_key = pdf_cache_key(*args)
+                cached = PDF_CACHE.get(cache_key)
+                if cached is not None:
+                    in_flight.append((document, cache_key, (cached, 0.0, True)))
+                else:
+                    future = self._submit(_render_pdf_timed, *args)
+                    in_flight.append((document, cache_key, future))
+
+        fill()
+        while in_flight:
+            document, cache_key, pending = in_flight.popleft()
+            entry: Dict[str, object] = {
+                "filename": document["filename"],
+                "student_id": document.get("student_id"),
+            }
+            try:
+                if pending is None:
+                    raise ValueError(document["error"])
+                if isinstance(pending, tuple):
+                    pdf_bytes, render_ms, cached = pending
+                else:
+                    pdf_bytes, render_ms = pending.result()
+                    cached = False
+                    PDF_CACHE.put(cache_key, pdf_bytes)
+            except Exception as exc:  # keep the archive going past one bad document
+                entry["error"] = str(exc)
+            else:
+                archive.writestr(str(document["filename"]), pdf_bytes)
+                entry.update(render_ms=round(render_ms, 2), cached=cached, bytes=len(pdf_bytes))
+            manifest.append(entry)
+            fill()
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+
+        archive.writestr(
+            "manifest.json",
+            json.dumps({"documents": manifest}, indent=2),
+            compress_type=zipfile.ZIP_DEFLATED,
+        )
+        archive.close()
+        yield sink.drain()
+
+    def status(self, job_id: str) -> Optional[Dict[str, object]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job = dict(job)
+        if job is None:
+            return self._shared_status(job_id)
+        if job["status"] == "done" and job_id not in self.results and not self._shared_pdf_exists(job_id):
+            job["status"] = "expired"
+        return job
+
+    def _shared_status(self, job_id: str) -> Optional[Dict[str, object]]:
+        if self.jobs_dir is None or job_owner(job_id) is None:
+            return None
+        try:
+            job = json.loads(self._job_path(job_id, ".json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if job["status"] == "done" and not self._shared_pdf_exists(job_id):
+            job["status"] = "expired"
+        return job
+
+    def _shared_pdf_exists(self, job_id: str) -> bool:
+        return self.jobs_dir is not None and self._job_path(job_id, ".pdf").exists()
+
+    def result(self, job_id: str) -> Optional[bytes]:
+        pdf_bytes = self.results.get(job_id)
+        if self.jobs_dir is None or job_owner(job_id) is None:
+            return pdf_bytes
+        path = self._job_path(job_id, ".pdf")
+        try:
+            if pdf_bytes is None:
+                pdf_bytes = path.read_bytes()
+            # Mark the file recently used for _trim_jobs_dir
+            os.utime(path)
+        except OSError:
+            pass
+        return pdf_bytes
+
+    def owned_elsewhere(self, job_id: str) -> bool:
+        """True when ``job_id`` was accepted by another process that this one cannot see into."""
+        owner = job_owner(job_id)
+        return self.jobs_dir is None and owner is not None and owner != os.getpid()
+
+
+_queue: Optional[PdfJobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_pdf_jobs() -> PdfJobQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = PdfJobQueue(
+                max_workers=int(os.environ.get("PDF_RENDER_WORKERS", "2")),
+                max_pending=int(os.environ.get("PDF_MAX_PENDING", "32")),
+                cache_bytes=int(os.environ.get("PDF_RESULT_CACHE_MB", "64")) * 1024 * 1024,
+                jobs_dir=Path(os.environ["PDF_JOBS_DIR"]) if os.environ.get("PDF_JOBS_DIR") else None,
+                jobs_dir_bytes=int(os.environ.get("PDF_JOBS_DIR_MB", "256")) * 1024 * 1024,
+            )
+        return _queue
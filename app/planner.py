@@ -0,0 +1,410 @@
+"""
+Term-by-term degree pathway planner.
+
+A plan is a sequence of terms, each with up to ``courses_per_term`` courses.
+Every course must be offered that term and have its prerequisites completed
+in an earlier term, and the plan must reach each requirement's
+``credit_min``. Completion states are int bitsets over the courses that can
+count toward a requirement (plus their prerequisite closure). The search is
+a beam search layered by term: identical ``(term, bitset)`` states are
+memoized, redundant course combinations are pruned, and states that can no
+longer finish in time are dropped. Finished plans are trimmed of courses
+they do not need and ranked by the mean recommendation score of their
+courses, then by fewer terms. The search stops at ``budget_ms`` and
+returns the best it has so far.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from itertools import combinations
+from math import ceil
+from typing import Dict, FrozenSet, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .data_loader import SyntheticDataset, dataset_cache, get_dataset
+from .metrics import METRICS, STAGE_SECONDS
+from .recommender import score_remaining_courses
+from .terms import SEASON_NAMES, SEASONS, TERM_PATTERN, current_term, next_term, term_sequence
+
+DEFAULT_BUDGET_MS = float(os.environ.get("PLANNER_BUDGET_MS", "250"))
+DEFAULT_MAX_TERMS = 6
+DEFAULT_COURSES_PER_TERM = 3
+DEFAULT_BEAM_WIDTH = 48
+DEFAULT_BRANCH_LIMIT = 7
+DEFAULT_MAX_PLANS = 3
+
+
+def _bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _parse_credits(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+
+class _PlanningIndex:
+    """Per-dataset bitset encoding of courses, prerequisites, offerings and requirements."""
+
+    def __init__(self, dataset: SyntheticDataset) -> None:
+        self.unplannable: List[Dict[str, str]] = []
+        planned: List[Tuple[str, str, Set[str], float]] = []
+        for requirement_id, row in dataset.degree_requirements.items():
+            eligible = {
+                course_id
+                for course_id in _split(row.get("eligible_courses", ""))
+                if course_id in dataset.courses
+            }
+            credit_min = _parse_credits(row.get("credit_min"))
+            if not eligible or not credit_min:
+                self.unplannable.append({"requirement_id": requirement_id, "label": row.get("label", "")})
+                continue
+            planned.append((requirement_id, row.get("label", ""), eligible, credit_min))
+
+        relevant: Set[str] = set().union(*(eligible for _, _, eligible, _ in planned))
+        pending = list(relevant)
+        while pending:
+            for prereq in _split(dataset.courses[pending.pop()].get("prerequisites", "")):
+                if prereq in dataset.courses and prereq not in relevant:
+                    relevant.add(prereq)
+                    pending.append(prereq)
+
+        self.course_ids: Tuple[str, ...] = tuple(cid for cid in dataset.courses if cid in relevant)
+        self.bit: Dict[str, int] = {cid: pos for pos, cid in enumerate(self.course_ids)}
+        self.credits: List[float] = [
+            _parse_credits(dataset.courses[cid].get("credits")) or 0.0 for cid in self.course_ids
+        ]
+        self.max_credits = max(self.credits, default=0.0)
+
+        self.prereq_mask: List[int] = []
+        self.impossible = 0
+        for pos, course_id in enumerate(self.course_ids):
+            mask = 0
+            for prereq in _split(dataset.courses[course_id].get("prerequisites", "")):
+                if prereq in self.bit:
+                    mask |= 1 << self.bit[prereq]
+                else:
+                    self.impossible |= 1 << pos
+            self.prereq_mask.append(mask)
+
+        self.requirements: List[Tuple[str, str, int, float]] = [
+            (requirement_id, label, self.mask_of(sorted(eligible)), credit_min)
+            for requirement_id, label, eligible, credit_min in planned
+        ]
+        # Transitive prerequisites of every course a requirement could use
+        self.requirement_closure: List[int] = []
+        for _, _, eligible_mask, _ in self.requirements:
+            closure, frontier = 0, eligible_mask
+            while frontier:
+                step = 0
+                for pos in _bits(frontier):
+                    step |= self.prereq_mask[pos]
+                frontier = step & ~closure
+                closure |= step
+            self.requirement_closure.append(closure)
+
+        self.explicit_terms: Dict[str, int] = {}
+        self.season_mask: Dict[str, int] = {season: 0 for season in SEASONS}
+        for pos, course_id in enumerate(self.course_ids):
+            course_bit = 1 << pos
+            offered_seasons = set()
+            for offering in dataset.course_offerings.get(course_id, []):
+                term_code = offering.get("term_code", "")
+                self.explicit_terms[term_code] = self.explicit_terms.get(term_code, 0) | course_bit
+                if TERM_PATTERN.match(term_code):
+                    offered_seasons.add(term_code[4])
+            patterns = {item.lower() for item in _split(dataset.courses[course_id].get("term_patterns", ""))}
+            for season, name in SEASON_NAMES.items():
+                if name in patterns or (not patterns and season in offered_seasons):
+                    self.season_mask[season] |= course_bit
+
+    def mask_of(self, course_ids: Sequence[str]) -> int:
+        mask = 0
+        for course_id in course_ids:
+            if course_id in self.bit:
+                mask |= 1 << self.bit[course_id]
+        return mask
+
+    def offered(self, term_code: str) -> int:
+        # Published schedules are authoritative; later terms follow course term patterns
+        if term_code in self.explicit_terms:
+            return self.explicit_terms[term_code]
+        return self.season_mask[term_code[4]]
+
+    def credits_in(self, mask: int) -> float:
+        return sum((self.credits[pos] for pos in _bits(mask)), 0.0)
+
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split("|") if item.strip()]
+
+
+@dataset_cache
+def _planning_index(dataset: SyntheticDataset) -> _PlanningIndex:
+    return _PlanningIndex(dataset)
+
+
+class _Search:
+    def __init__(
+        self,
+        index: _PlanningIndex,
+        scores: Dict[str, float],
+        courses_per_term: int,
+        branch_limit: int,
+    ) -> None:
+        self.index = index
+        self.scores = [scores.get(course_id, 0.0) for course_id in index.course_ids]
+        self.courses_per_term = courses_per_term
+        self.branch_limit = branch_limit
+        self._shortfalls: Dict[int, Tuple[float, ...]] = {}
+
+    def shortfalls(self, mask: int) -> Tuple[float, ...]:
+        cached = self._shortfalls.get(mask)
+        if cached is None:
+            cached = tuple(
+                max(0.0, credit_min - self.index.credits_in(mask & eligible_mask))
+                for _, _, eligible_mask, credit_min in self.index.requirements
+            )
+            self._shortfalls[mask] = cached
+        return cached
+
+    def useful_mask(self, mask: int) -> int:
+        useful = 0
+        for (_, _, eligible_mask, _), closure, shortfall in zip(
+            self.index.requirements, self.index.requirement_closure, self.shortfalls(mask)
+        ):
+            if shortfall > 0:
+                useful |= eligible_mask | closure
+        return useful & ~mask
+
+    def terms_needed(self, mask: int) -> int:
+        per_term = self.courses_per_term * self.index.max_credits
+        if not per_term:
+            return 0
+        return max((ceil(shortfall / per_term) for shortfall in self.shortfalls(mask)), default=0)
+
+    def children(self, mask: int, term_code: str) -> List[Tuple[int, float, Tuple[int, ...]]]:
+        index = self.index
+        available = [
+            pos
+            for pos in _bits(index.offered(term_code) & self.useful_mask(mask) & ~index.impossible)
+            if index.prereq_mask[pos] & ~mask == 0
+        ]
+        if not available:
+            return [(mask, 0.0, ())]
+        available.sort(key=lambda pos: (-self.scores[pos], index.course_ids[pos]))
+        available = available[: self.branch_limit]
+
+        accepted: List[FrozenSet[int]] = []
+        children = []
+        for size in range(min(self.courses_per_term, len(available)), 0, -1):
+            for combo in combinations(available, size):
+                combo_set = frozenset(combo)
+                if any(combo_set < larger for larger in accepted):
+                    continue
+                child = self._apply(mask, combo)
+                if child is None:
+                    continue
+                accepted.append(combo_set)
+                children.append((child, sum(self.scores[pos] for pos in combo), combo))
+        return children
+
+    def trim(self, initial: int, path: Tuple[Tuple[int, ...], ...]) -> Tuple[float, int, Tuple[Tuple[int, ...], ...]]:
+        """Drop courses the finished plan does not need, latest first, then rescore it.
+
+        A course stays if a later kept course lists it as a prerequisite or if
+        removing it would reopen a requirement shortfall.
+        """
+        kept = [set(combo) for combo in path]
+        mask = initial
+        for combo in kept:
+            for pos in combo:
+                mask |= 1 << pos
+        needed = 0
+        for combo in reversed(kept):
+            for pos in sorted(combo, key=lambda pos: self.scores[pos]):
+                without = mask & ~(1 << pos)
+                if not (needed >> pos) & 1 and not any(self.shortfalls(without)):
+                    combo.discard(pos)
+                    mask = without
+            for pos in combo:
+                needed |= self.index.prereq_mask[pos]
+        while kept and not kept[-1]:
+            kept.pop()
+        trimmed = tuple(tuple(sorted(combo)) for combo in kept)
+        score = sum(self.scores[pos] for combo in trimmed for pos in combo)
+        return score, len(trimmed), trimmed
+
+    def _apply(self, mask: int, combo: Sequence[int]) -> Optional[int]:
+        """Add ``combo`` course by course; reject it if any course stops contributing."""
+        for pos in combo:
+            if not (self.useful_mask(mask) >> pos) & 1:
+                return None
+            mask |= 1 << pos
+        return mask
+
+
+def plan_pathways(
+    student_id: str,
+    start_term: Optional[str] = None,
+    max_terms: int = DEFAULT_MAX_TERMS,
+    courses_per_term: int = DEFAULT_COURSES_PER_TERM,
+    budget_ms: float = DEFAULT_BUDGET_MS,
+    max_plans: int = DEFAULT_MAX_PLANS,
+    beam_width: int = DEFAULT_BEAM_WIDTH,
+    branch_limit: int = DEFAULT_BRANCH_LIMIT,
+    dataset: Optional[SyntheticDataset] = None,
+) -> Dict[str, object]:
+    dataset = dataset or get_dataset()
+    started = time.perf_counter()
+    start_term = start_term or next_term(current_term())
+    terms = term_sequence(start_term, max_terms)
+
+    with METRICS.timed(STAGE_SECONDS, stage="plan_pathways"):
+        index = _planning_index(dataset)
+        completed = dataset.student_completed_courses.get(student_id, set())
+        search = _Search(index, score_remaining_courses(student_id, dataset), courses_per_term, branch_limit)
+        initial = index.mask_of(list(completed))
+        # The budget covers the search itself, not first-use dataset loading
+        deadline = time.perf_counter() + budget_ms / 1000.0
+
+        finished: List[Tuple[float, int, Tuple[Tuple[int, ...], ...]]] = []
+        layer: Dict[int, Tuple[float, Tuple[Tuple[int, ...], ...]]] = {initial: (0.0, ())}
+        best_partial = (initial, 0.0, ())
+        explored = 0
+        timed_out = False
+
+        if not any(search.shortfalls(initial)):
+            finished.append((0.0, 0, ()))
+            layer = {}
+
+        for term_idx, term_code in enumerate(terms):
+            if not layer or timed_out:
+                break
+            remaining_terms = max_terms - term_idx - 1
+            next_layer: Dict[int, Tuple[float, Tuple[Tuple[int, ...], ...]]] = {}
+            for mask, (score, path) in layer.items():
+                if time.perf_counter() > deadline:
+                    timed_out = True
+                    break
+                for child, gained, combo in search.children(mask, term_code):
+                    explored += 1
+                    child_score = score + gained
+                    child_path = path + (combo,)
+                    if not any(search.shortfalls(child)):
+                        finished.append((child_score, term_idx + 1, child_path))
+                        continue
+                    if search.terms_needed(child) > remaining_terms:
+                        continue
+                    known = next_layer.get(child)
+                    if known is None or known[0] < child_score:
+                        next_layer[child] = (child_score, child_path)
+
+            ranked = sorted(
+                next_layer.items(),
+                key=lambda item: (sum(search.shortfalls(item[0])), -item[1][0]),
+            )[:beam_width]
+            if ranked:
+                head_mask, (head_score, head_path) = ranked[0]
+                if sum(search.shortfalls(head_mask)) < sum(search.shortfalls(best_partial[0])):
+                    best_partial = (head_mask, head_score, head_path)
+            layer = dict(ranked)
+
+    finished = [search.trim(initial, path) for _, _, path in finished]
+    # Mean score per course, so padding a plan with extra courses never lifts it
+    finished.sort(key=lambda plan: (-_mean_score(plan[0], plan[2]), plan[1], plan[2]))
+    plans = [
+        _plan_payload(path, score, True, terms, search, dataset)
+        for score, _, path in _distinct(finished)[:max_plans]
+    ]
+    if not plans and best_partial[2]:
+        plans.append(_plan_payload(best_partial[2], best_partial[1], False, terms, search, dataset))
+
+    return {
+        "student_id": student_id,
+        "start_term": start_term,
+        "max_terms": max_terms,
+        "courses_per_term": courses_per_term,
+        "requirements": _requirements_payload(initial, search),
+        "unplanned_requirements": index.unplannable,
+        "plans": plans,
+        "timed_out": timed_out,
+        "states_explored": explored,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def _mean_score(score: float, path: Tuple[Tuple[int, ...], ...]) -> float:
+    count = sum(len(combo) for combo in path)
+    return score / count if count else 0.0
+
+
+def _distinct(
+    finished: List[Tuple[float, int, Tuple[Tuple[int, ...], ...]]]
+) -> List[Tuple[float, int, Tuple[Tuple[int, ...], ...]]]:
+    seen: Set[Tuple[FrozenSet[int], ...]] = set()
+    unique = []
+    for plan in finished:
+        key = tuple(frozenset(term) for term in plan[2])
+        if key not in seen:
+            seen.add(key)
+            unique.append(plan)
+    return unique
+
+
+def _requirements_payload(mask: int, search: _Search) -> List[Dict[str, object]]:
+    return [
+        {
+            "requirement_id": requirement_id,
+            "label": label,
+            "credit_min": credit_min,
+            "completed_credits": search.index.credits_in(mask & eligible_mask),
+            "remaining_credits": shortfall,
+        }
+        for (requirement_id, label, eligible_mask, credit_min), shortfall in zip(
+            search.index.requirements, search.shortfalls(mask)
+        )
+    ]
+
+
+def _plan_payload(
+    path: Tuple[Tuple[int, ...], ...],
+    score: float,
+    complete: bool,
+    terms: Sequence[str],
+    search: _Search,
+    dataset: SyntheticDataset,
+) -> Dict[str, object]:
+    index = search.index
+    scheduled = []
+    for term_code, combo in zip(terms, path):
+        courses = [
+            {
+                "course_id": index.course_ids[pos],
+                "title": dataset.courses[index.course_ids[pos]].get("title"),
+                "category": dataset.courses[index.course_ids[pos]].get("category"),
+                "credits": index.credits[pos],
+                "score": round(search.scores[pos], 3),
+            }
+            for pos in sorted(combo, key=lambda pos: index.course_ids[pos])
+        ]
+        scheduled.append({
+            "term_code": term_code,
+            "courses": courses,
+            "credits": sum(course["credits"] for course in courses),
+        })
+    while scheduled and not scheduled[-1]["courses"]:
+        scheduled.pop()
+    return {
+        "complete": complete,
+        "terms_used": len(scheduled),
+        "total_score": round(score, 3),
+        "mean_score": round(_mean_score(score, path), 3),
+        "terms": scheduled,
+    }
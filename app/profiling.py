@@ -0,0 +1,113 @@
+"""
+On-demand, admin-guarded request profiling.
+
+Profiling is off unless ``PROFILE_TOKEN`` is configured. A request opts in by
+sending the token in the ``X-Profile`` header or the ``profile`` query
+parameter; it then runs under cProfile and the pstats report is written to
+``PROFILE_DIR``. Streamed responses stay under the profiler until their
+body has been sent, and the report is written when the stream closes.
+``PROFILE_MAX_CONCURRENT`` caps how many requests may be profiled at once;
+extra requests run unprofiled.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from flask import Request, Response
+from werkzeug.wsgi import ClosingIterator
+
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_PARAM = "profile"
+SORT_KEYS = {"cumulative", "tottime", "calls"}
+
+
+class RequestProfiler:
+    def __init__(
+        self,
+        token: Optional[str],
+        report_dir: Path,
+        max_concurrent: int = 1,
+    ) -> None:
+        self.token = token
+        self.report_dir = report_dir
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    def requested(self, request: Request) -> bool:
+        if not self.token:
+            return False
+        supplied = request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_PARAM)
+        # compare_digest only accepts ASCII str, so compare the UTF-8 bytes
+        return bool(supplied) and hmac.compare_digest(supplied.encode("utf-8"), self.token.encode("utf-8"))
+
+    def start(self) -> Optional[cProfile.Profile]:
+        if not self._slots.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler already owns the interpreter hook
+            self._slots.release()
+            return None
+        return profile
+
+    def stop(self, profile: cProfile.Profile) -> None:
+        profile.disable()
+        self._slots.release()
+
+    def write_report(self, profile: cProfile.Profile, report_id: str, sort_by: str = "cumulative", limit: int = 40) -> str:
+        """Dump raw pstats plus a text summary as ``report_id``; return the summary text."""
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(str(self.report_dir / f"{report_id}.pstats"))
+
+        summary = io.StringIO()
+        stats = pstats.Stats(profile, stream=summary)
+        stats.strip_dirs().sort_stats(sort_by).print_stats(limit)
+        text = summary.getvalue()
+        (self.report_dir / f"{report_id}.txt").write_text(text, encoding="utf-8")
+        return text
+
+    def finish(self, profile: cProfile.Profile, request: Request, response: Response) -> Response:
+        sort_by = request.args.get("profile_sort", "cumulative")
+        sort_by = sort_by if sort_by in SORT_KEYS else "cumulative"
+        report_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{request.endpoint or 'unmatched'}-{uuid.uuid4().hex[:8]}"
+        if response.is_streamed:
+            # The body is generated while the server sends it, after this hook; the
+            # server iterates it on this thread, so keep profiling until it closes
+            finished = threading.Event()
+
+            def close() -> None:
+                if not finished.is_set():
+                    finished.set()
+                    self.stop(profile)
+                    self.write_report(profile, report_id, sort_by=sort_by)
+
+            response.response = ClosingIterator(response.response, close)
+        else:
+            self.stop(profile)
+            text = self.write_report(profile, report_id, sort_by=sort_by)
+            if request.args.get("profile_format") == "text":
+                response = Response(text, mimetype="text/plain")
+        response.headers["X-Profile-Report"] = report_id
+        response.headers["X-Profile-Status"] = "captured"
+        return response
+
+
+def profiler_from_env() -> RequestProfiler:
+    return RequestProfiler(
+        token=os.environ.get("PROFILE_TOKEN") or None,
+        report_dir=Path(os.environ.get("PROFILE_DIR") or Path(tempfile.gettempdir()) / "mac-profiles"),
+        max_concurrent=int(os.environ.get("PROFILE_MAX_CONCURRENT", "1")),
+    )
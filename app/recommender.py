@@ -1,9 +1,32 @@
 from __future__ import annotations
 
+import os
+import time
 from collections import Counter, defaultdict
-from typing import Dict, Iterable, List, Sequence, Set
+from itertools import islice
+from typing import AbstractSet, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
+from .audit import open_requirement_courses
 from .data_loader import SyntheticDataset, get_dataset
+from .filters import CourseFilters
+from .metrics import METRICS, STAGE_SECONDS
+from .shared_index import SharedIndex
+from .timetable import get_timetable
+from .topk import sparse_content_scores, top_k
+
+# Added to the blended score of courses that close an open degree requirement
+DEFAULT_AUDIT_BOOST = float(os.environ.get("RECOMMENDER_AUDIT_BOOST", "0"))
+# (content, collaborative) blend weights per mode
+HISTORY_WEIGHTS = (0.6, 0.4)
+INTEREST_WEIGHTS = (0.7, 0.3)
+# Budgeted collaborative scoring checks the clock once per this many peers
+DEADLINE_CHECK_INTERVAL = 64
+
+
+class RecommendationList(list):
+    """A list of recommendation entries; ``partial`` is set when a latency budget cut scoring short."""
+
+    partial = False
 
 
 def _normalize(scores: Dict[str, float]) -> Dict[str, float]:
@@ -56,31 +79,28 @@ def _content_profile_from_interests(
     return profile
 
 
+@METRICS.timed_stage("score_content")
 def _score_content(
     candidate_courses: Set[str],
     profile: Counter,
     dataset: SyntheticDataset,
 ) -> Dict[str, float]:
-    scores: Dict[str, float] = {}
-    for course_id in candidate_courses:
-        course = dataset.courses[course_id]
-        score = 0.0
-        for skill in dataset.course_skill_tags.get(course_id, set()):
-            score += profile.get(skill, 0.0)
-        score += profile.get(f"category::{course['category']}", 0.0)
-        score += profile.get(f"delivery::{course.get('delivery_mode', '')}", 0.0)
-        for term in _split_to_set(course.get("term_patterns", "")):
-            score += 0.1 * profile.get(f"term::{term.lower()}", 0.0)
-        scores[course_id] = score
-    return scores
+    """Raw content scores for the candidates sharing a feature with ``profile``; the rest score 0.0."""
+    return sparse_content_scores(candidate_courses, profile, dataset)
 
 
+@METRICS.timed_stage("score_collaborative_history")
 def _score_collaborative_history(
     student_id: str,
     candidate_courses: Set[str],
     completed_courses: Set[str],
     dataset: SyntheticDataset,
 ) -> Dict[str, float]:
+    if dataset.shared is not None:
+        return _score_collaborative_history_shared(
+            student_id, candidate_courses, completed_courses, dataset.shared
+        )
+
     collab_scores: Dict[str, float] = defaultdict(float)
     for other_student, other_courses in dataset.student_completed_courses.items():
         if other_student == student_id:
@@ -102,16 +122,24 @@ def _score_collaborative_history(
     return dict(collab_scores)
 
 
+@METRICS.timed_stage("score_collaborative_interests")
 def _score_collaborative_interests(
     candidate_courses: Set[str],
     interest_tags: Set[str],
     dataset: SyntheticDataset,
+    exclude_student: Optional[str] = None,
 ) -> Dict[str, float]:
     collab_scores: Dict[str, float] = defaultdict(float)
     if not interest_tags:
         return collab_scores
+    if dataset.shared is not None:
+        return _score_collaborative_interests_shared(
+            candidate_courses, interest_tags, dataset.shared, exclude_student
+        )
 
     for student_id, tags in dataset.student_interest_tags.items():
+        if student_id == exclude_student:
+            continue
         overlap = len(tags & interest_tags)
         if not overlap:
             continue
@@ -126,127 +154,567 @@ def _score_collaborative_interests(
     return dict(collab_scores)
 
 
+def _score_collaborative_history_shared(
+    student_id: str,
+    candidate_courses: Set[str],
+    completed_courses: AbstractSet[str],
+    index: SharedIndex,
+) -> Dict[str, float]:
+    # Only peers sharing a course can have a non-zero Jaccard similarity, so
+    # walk course -> students instead of every student's set
+    completed_positions = {
+        index.course_position[course_id]
+        for course_id in completed_courses
+        if course_id in index.course_position
+    }
+    intersections: Dict[int, int] = defaultdict(int)
+    for course_pos in completed_positions:
+        for peer in index.course_students.row(course_pos):
+            intersections[peer] += 1
+    intersections.pop(index.history_position.get(student_id, -1), None)
+
+    wanted = _candidate_positions(candidate_courses, index) - completed_positions
+    own_size = len(completed_courses)
+    collab_scores: Dict[int, float] = defaultdict(float)
+    # Ascending positions replay the dict path's peer order, so float sums match
+    for peer in sorted(intersections):
+        intersection = intersections[peer]
+        similarity = intersection / (own_size + index.student_courses.row_length(peer) - intersection)
+        for course_pos in index.student_courses.row(peer):
+            if course_pos in wanted:
+                collab_scores[course_pos] += similarity
+    return {index.course_ids[pos]: score for pos, score in collab_scores.items()}
+
+
+def _score_collaborative_interests_shared(
+    candidate_courses: Set[str],
+    interest_tags: Set[str],
+    index: SharedIndex,
+    exclude_student: Optional[str] = None,
+) -> Dict[str, float]:
+    overlaps: Dict[int, int] = defaultdict(int)
+    for tag in interest_tags:
+        tag_pos = index.tag_position.get(tag)
+        if tag_pos is None:
+            continue
+        for student_pos in index.tag_students.row(tag_pos):
+            overlaps[student_pos] += 1
+    if exclude_student is not None:
+        overlaps.pop(index.interest_position.get(exclude_student, -1), None)
+
+    wanted = _candidate_positions(candidate_courses, index)
+    collab_scores: Dict[int, float] = defaultdict(float)
+    for student_pos in sorted(overlaps):
+        history_pos = index.interest_to_history[student_pos]
+        if history_pos < 0:
+            continue
+        similarity = overlaps[student_pos] / len(interest_tags)
+        for course_pos in index.student_courses.row(history_pos):
+            if course_pos in wanted:
+                collab_scores[course_pos] += similarity
+    return {index.course_ids[pos]: score for pos, score in collab_scores.items()}
+
+
+@METRICS.timed_stage("score_collaborative_history")
+def _score_collaborative_history_budgeted(
+    student_id: str,
+    candidate_courses: Set[str],
+    completed_courses: AbstractSet[str],
+    dataset: SyntheticDataset,
+    deadline: float,
+) -> Tuple[Dict[str, float], bool]:
+    """Jaccard peer scoring that visits the most similar peers first and stops at ``deadline``.
+
+    Peers and their overlap come from the course -> completers index, so
+    ranking them is cheap next to walking their histories. Returns the
+    scores and whether every peer was visited.
+    """
+    if dataset.shared is not None:
+        return _score_collaborative_history_budgeted_shared(
+            student_id, candidate_courses, completed_courses, dataset.shared, deadline
+        )
+
+    if time.perf_counter() >= deadline:
+        return {}, not completed_courses
+    overlaps: Counter[str] = Counter()
+    for course_id in completed_courses:
+        overlaps.update(dataset.collaborative_matrix.get(course_id, ()))
+        if time.perf_counter() >= deadline:
+            return {}, False
+    overlaps.pop(student_id, None)
+
+    own_size = len(completed_courses)
+    student_courses = dataset.student_completed_courses
+    # Negated similarity so a plain tuple sort gives most similar first, ties by peer
+    ranked = [
+        (-overlap / (own_size + len(student_courses[peer]) - overlap), peer)
+        for peer, overlap in overlaps.items()
+    ]
+    ranked.sort()
+    collab_scores, complete = _accumulate_until(
+        ranked, student_courses.__getitem__, candidate_courses - completed_courses, deadline
+    )
+    return dict(collab_scores), complete
+
+
+def _score_collaborative_history_budgeted_shared(
+    student_id: str,
+    candidate_courses: Set[str],
+    completed_courses: AbstractSet[str],
+    index: SharedIndex,
+    deadline: float,
+) -> Tuple[Dict[str, float], bool]:
+    if time.perf_counter() >= deadline:
+        return {}, not completed_courses
+    completed_positions = {
+        index.course_position[course_id]
+        for course_id in completed_courses
+        if course_id in index.course_position
+    }
+    overlaps: Counter[int] = Counter()
+    for course_pos in completed_positions:
+        overlaps.update(index.course_students.row(course_pos))
+        if time.perf_counter() >= deadline:
+            return {}, False
+    overlaps.pop(index.history_position.get(student_id, -1), None)
+
+    own_size = len(completed_courses)
+    row_length = index.student_courses.row_length
+    ranked = [
+        (-overlap / (own_size + row_length(peer) - overlap), peer)
+        for peer, overlap in overlaps.items()
+    ]
+    ranked.sort()
+    wanted = _candidate_positions(candidate_courses, index) - completed_positions
+    collab_scores, complete = _accumulate_until(ranked, index.student_courses.row, wanted, deadline)
+    return {index.course_ids[pos]: score for pos, score in collab_scores.items()}, complete
+
+
+def _accumulate_until(
+    ranked: List[Tuple[float, object]],
+    peer_courses: Callable,
+    wanted: Set,
+    deadline: float,
+) -> Tuple[Dict, bool]:
+    collab_scores: Dict = defaultdict(float)
+    for visited, (negated, peer) in enumerate(ranked):
+        if visited % DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() >= deadline:
+            return collab_scores, False
+        similarity = -negated
+        for course in wanted.intersection(peer_courses(peer)):
+            collab_scores[course] += similarity
+    return collab_scores, True
+
+
+def _candidate_positions(candidate_courses: Set[str], index: SharedIndex) -> Set[int]:
+    return {
+        index.course_position[course_id]
+        for course_id in candidate_courses
+        if course_id in index.course_position
+    }
+
+
 def _candidate_courses(
     completed_courses: Set[str],
     dataset: SyntheticDataset,
+    term: Optional[str] = None,
+    filters: Optional[CourseFilters] = None,
 ) -> Set[str]:
+    # Narrow to the term's offerings and filter facets first so nothing excluded gets scored
+    pool = dataset.offered_courses(term) if term else dataset.courses
+    if filters is not None and filters.active:
+        allowed = filters.matching_courses(dataset)
+        pool = allowed if pool is dataset.courses else allowed & pool
     return {
         course_id
-        for course_id in dataset.courses
-        if course_id not in completed_courses
+        for course_id in pool
+        if course_id not in completed_courses and course_id in dataset.courses
     }
 
 
-def recommend_for_student(
-    student_id: str,
-    top_n: int = 6,
-) -> List[Dict[str, object]]:
-    dataset = get_dataset()
-    completed_courses = dataset.student_completed_courses.get(student_id, set())
-    candidate = {
-        course_id
-        for course_id in _candidate_courses(completed_courses, dataset)
-        if _prerequisites_met(course_id, completed_courses, dataset)
-    }
-    if not candidate:
-        return []
+def _blend(
+    candidate: Set[str],
+    content_raw: Dict[str, float],
+    collab_scores: Dict[str, float],
+    content_weight: float,
+    collab_weight: float,
+) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, float]]:
+    """Combined scores for every candidate, for callers that need more than the top N."""
+    content_scores = _normalize({**dict.fromkeys(candidate, 0.0), **content_raw})
+    combined_scores: Dict[str, float] = {}
+    for course_id in candidate:
+        content = content_scores.get(course_id, 0.0)
+        collab = collab_scores.get(course_id, 0.0)
+        combined_scores[course_id] = content_weight * content + collab_weight * collab
+    return combined_scores, content_scores, collab_scores
 
+
+def _history_signals(
+    student_id: str,
+    candidate: Set[str],
+    completed_courses: AbstractSet[str],
+    dataset: SyntheticDataset,
+    deadline: Optional[float] = None,
+) -> Tuple[Dict[str, float], Dict[str, float], bool]:
+    """Raw (sparse) content scores, normalized collaborative scores and whether peer scoring finished."""
     content_profile = _content_profile_from_courses(completed_courses, dataset)
-    content_scores = _normalize(
-        _score_content(candidate, content_profile, dataset)
-    )
+    content_raw = _score_content(candidate, content_profile, dataset)
+
+    complete = True
+    if deadline is None:
+        raw_collab = _score_collaborative_history(student_id, candidate, completed_courses, dataset)
+    else:
+        raw_collab, complete = _score_collaborative_history_budgeted(
+            student_id, candidate, completed_courses, dataset, deadline
+        )
+    return content_raw, _normalize(raw_collab), complete
+
+
+def _history_scores(
+    student_id: str,
+    candidate: Set[str],
+    completed_courses: AbstractSet[str],
+    dataset: SyntheticDataset,
+) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, float]]:
+    content_raw, collab_scores, _ = _history_signals(student_id, candidate, completed_courses, dataset)
+    return _blend(candidate, content_raw, collab_scores, *HISTORY_WEIGHTS)
+
 
+def _interest_signals(
+    candidate: Set[str],
+    cleaned_interests: Set[str],
+    dataset: SyntheticDataset,
+    exclude_student: Optional[str] = None,
+) -> Tuple[Dict[str, float], Dict[str, float]]:
+    content_profile = _content_profile_from_interests(tuple(cleaned_interests))
+    content_raw = _score_content(candidate, content_profile, dataset)
     collab_scores = _normalize(
-        _score_collaborative_history(student_id, candidate, completed_courses, dataset)
+        _score_collaborative_interests(candidate, cleaned_interests, dataset, exclude_student)
     )
+    return content_raw, collab_scores
 
-    combined_scores: Dict[str, float] = {}
-    for course_id in candidate:
-        content = content_scores.get(course_id, 0.0)
-        collab = collab_scores.get(course_id, 0.0)
-        combined_scores[course_id] = 0.6 * content + 0.4 * collab
 
-    return _build_recommendation_payload(
-        combined_scores,
-        content_scores,
+def _interest_scores(
+    candidate: Set[str],
+    cleaned_interests: Set[str],
+    dataset: SyntheticDataset,
+) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, float]]:
+    content_raw, collab_scores = _interest_signals(candidate, cleaned_interests, dataset)
+    return _blend(candidate, content_raw, collab_scores, *INTEREST_WEIGHTS)
+
+
+def recommend_for_student(
+    student_id: str,
+    top_n: int = 6,
+    dataset: Optional[SyntheticDataset] = None,
+    term: Optional[str] = None,
+    audit_boost: Optional[float] = None,
+    filters: Optional[CourseFilters] = None,
+    budget_ms: Optional[float] = None,
+    completed_courses: Optional[AbstractSet[str]] = None,
+) -> RecommendationList:
+    """Top ``top_n`` history-based recommendations for ``student_id``.
+
+    With ``budget_ms``, content scoring always completes but collaborative
+    scoring visits peers from most to least similar and stops once the
+    budget (measured from the call) is spent; the result then has
+    ``partial`` set. ``completed_courses`` replaces the student's stored
+    history, e.g. to score a held-out history in offline evaluation.
+    """
+    deadline = time.perf_counter() + budget_ms / 1000.0 if budget_ms is not None else None
+    dataset = dataset or get_dataset()
+    audit_boost = DEFAULT_AUDIT_BOOST if audit_boost is None else audit_boost
+    if completed_courses is None:
+        completed_courses = dataset.student_completed_courses.get(student_id, set())
+    with METRICS.timed(STAGE_SECONDS, stage="candidates"):
+        candidate = {
+            course_id
+            for course_id in _candidate_courses(completed_courses, dataset, term, filters)
+            if _prerequisites_met(course_id, completed_courses, dataset)
+        }
+    if not candidate:
+        return RecommendationList()
+
+    content_raw, collab_scores, complete = _history_signals(
+        student_id, candidate, completed_courses, dataset, deadline
+    )
+    boosts = None
+    if audit_boost:
+        boosts = dict.fromkeys(open_requirement_courses(completed_courses, dataset) & candidate, audit_boost)
+    recommendations = RecommendationList(_build_recommendation_payload(
+        candidate,
+        content_raw,
         collab_scores,
+        HISTORY_WEIGHTS,
         dataset,
         top_n=top_n,
-    )
+        boosts=boosts,
+    ))
+    recommendations.partial = not complete
+    return recommendations
 
 
 def recommend_for_interests(
     interest_tags: Sequence[str],
     top_n: int = 6,
+    dataset: Optional[SyntheticDataset] = None,
+    term: Optional[str] = None,
+    filters: Optional[CourseFilters] = None,
+    exclude_student: Optional[str] = None,
 ) -> List[Dict[str, object]]:
-    dataset = get_dataset()
+    """Top ``top_n`` interest-based recommendations.
+
+    ``exclude_student`` leaves that student out of the collaborative peers,
+    so offline evaluation never scores a student against their own history.
+    """
+    dataset = dataset or get_dataset()
     cleaned_interests = {tag for tag in interest_tags if tag}
-    candidate = _candidate_courses(set(), dataset)
+    with METRICS.timed(STAGE_SECONDS, stage="candidates"):
+        candidate = _candidate_courses(set(), dataset, term, filters)
     if not candidate:
         return []
 
-    content_profile = _content_profile_from_interests(tuple(cleaned_interests))
-    content_scores = _normalize(
-        _score_content(candidate, content_profile, dataset)
-    )
-    collab_scores = _normalize(
-        _score_collaborative_interests(candidate, cleaned_interests, dataset)
-    )
-
-    combined_scores: Dict[str, float] = {}
-    for course_id in candidate:
-        content = content_scores.get(course_id, 0.0)
-        collab = collab_scores.get(course_id, 0.0)
-        combined_scores[course_id] = 0.7 * content + 0.3 * collab
-
+    content_raw, collab_scores = _interest_signals(candidate, cleaned_interests, dataset, exclude_student)
     return _build_recommendation_payload(
-        combined_scores,
-        content_scores,
+        candidate,
+        content_raw,
         collab_scores,
+        INTEREST_WEIGHTS,
         dataset,
         top_n=top_n,
     )
 
 
-def _build_recommendation_payload(
-    combined_scores: Dict[str, float],
-    content_scores: Dict[str, float],
-    collab_scores: Dict[str, float],
-    dataset: SyntheticDataset,
-    top_n: int,
-) -> List[Dict[str, object]]:
-    ranked = sorted(
-        combined_scores.items(),
-        key=lambda item: (-item[1], item[0]),
-    )[:top_n]
-
-    results: List[Dict[str, object]] = []
-    for course_id, score in ranked:
-        course = dataset.courses[course_id]
-        skills = sorted(dataset.course_skill_tags.get(course_id, []))
-        explanation = _build_explanation(
+def score_remaining_courses(
+    student_id: str,
+    dataset: Optional[SyntheticDataset] = None,
+) -> Dict[str, float]:
+    """Blended score for every course the student has not completed, ignoring prerequisites.
+
+    Students without completed history are scored from their stored interest tags.
+    """
+    dataset = dataset or get_dataset()
+    completed_courses = dataset.student_completed_courses.get(student_id, set())
+    candidate = _candidate_courses(completed_courses, dataset)
+    if not candidate:
+        return {}
+    if completed_courses:
+        return _history_scores(student_id, candidate, completed_courses, dataset)[0]
+    interests = set(dataset.student_interest_tags.get(student_id, set()))
+    return _interest_scores(candidate, interests, dataset)[0]
+
+
+def recommend_schedule(
+    term_code: str,
+    student_id: Optional[str] = None,
+    interest_tags: Sequence[str] = (),
+    top_n: int = 4,
+    dataset: Optional[SyntheticDataset] = None,
+    filters: Optional[CourseFilters] = None,
+) -> Tuple[List[Dict[str, object]], bool]:
+    """Best-scoring clash-free set of ``top_n`` courses offered in ``term_code``.
+
+    Students with completed history are scored from it (prerequisites
+    enforced); otherwise ``interest_tags`` drive interest-mode scoring.
+    Returns the entries, each with its chosen ``offering``, and whether the
+    set is provably optimal. A term with no published timetable returns
+    ``([], False)``, since nothing was searched.
+    """
+    dataset = dataset or get_dataset()
+    timetable = get_timetable(term_code, dataset)
+    if timetable is None:
+        return [], False
+
+    completed_courses = dataset.student_completed_courses.get(student_id or "", set())
+    allowed = filters.matching_courses(dataset) if filters is not None and filters.active else dataset.courses
+    with METRICS.timed(STAGE_SECONDS, stage="candidates"):
+        candidate = {
+            course_id
+            for course_id in timetable.offered_courses()
+            if course_id in allowed
+            and course_id not in completed_courses
+            and _prerequisites_met(course_id, completed_courses, dataset)
+        }
+    if not candidate:
+        return [], True
+
+    if completed_courses:
+        combined_scores, content_scores, collab_scores = _history_scores(
+            str(student_id), candidate, completed_courses, dataset
+        )
+    else:
+        combined_scores, content_scores, collab_scores = _interest_scores(
+            candidate, {tag for tag in interest_tags if tag}, dataset
+        )
+
+    with METRICS.timed(STAGE_SECONDS, stage="schedule_search"):
+        chosen, exhaustive = timetable.best_conflict_free(combined_scores, top_n)
+
+    entries = []
+    for course_id, offering_idx in chosen:
+        entry = _recommendation_entry(
             course_id,
+            combined_scores[course_id],
             content_scores.get(course_id, 0.0),
             collab_scores.get(course_id, 0.0),
-            skills,
             dataset,
         )
-        results.append(
-            {
-                "course_id": course_id,
-                "course_code": course.get("course_code"),
-                "title": course.get("title"),
-                "category": course.get("category"),
-                "delivery_mode": course.get("delivery_mode"),
-                "combined_score": round(score, 3),
-                "content_score": round(content_scores.get(course_id, 0.0), 3),
-                "collab_score": round(collab_scores.get(course_id, 0.0), 3),
-                "skills": skills,
-                "description": course.get("description"),
-                "explanation": explanation,
+        entry["offering"] = timetable.meeting(offering_idx)
+        entries.append(entry)
+    return entries, exhaustive
+
+
+def recommend_rows(
+    rows: Iterable[Dict[str, object]],
+    top_n: int = 6,
+    chunk_size: int = 64,
+    dataset: Optional[SyntheticDataset] = None,
+    term: Optional[str] = None,
+    filters: Optional[CourseFilters] = None,
+    budget_ms: Optional[float] = None,
+) -> Iterator[Dict[str, object]]:
+    """Yield one result per bulk row, reading ``chunk_size`` rows at a time.
+
+    Each row carries a ``student_id`` and/or ``interests``. Explicit interests
+    are scored in interest mode; otherwise a student with completed history is
+    scored from that history and any other student falls back to their stored
+    interest tags. Rows that already hold an ``error`` are passed through
+    untouched, and rows naming an unknown student, or a student with neither
+    history nor stored interests, come back as an ``error`` row without
+    explicit interests. Every row is scored on its own by
+    ``recommend_for_student`` or ``recommend_for_interests``, all against the
+    same dataset snapshot; the only work saved is that identical requests
+    within a chunk share one result. Only ``chunk_size`` rows are held at
+    once. A ``term`` restricts every row to courses offered in that term, and
+    ``filters`` to courses matching those catalog facets. ``budget_ms``
+    bounds each history row's scoring and marks cut-short rows ``partial``.
+    """
+    dataset = dataset or get_dataset()
+    iterator = iter(rows)
+    row_number = 0
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+
+        computed: Dict[Tuple[str, object], List[Dict[str, object]]] = {}
+        for row in chunk:
+            row_number += 1
+            if "error" in row:
+                yield {"row": row_number, "error": row["error"]}
+                continue
+
+            try:
+                student_id, context, key, interests = _bulk_request_key(row, dataset)
+            except ValueError as exc:
+                yield {
+                    "row": row_number,
+                    "student_id": str(row.get("student_id") or "").strip().upper() or None,
+                    "error": str(exc),
+                }
+                continue
+            if (context, key) not in computed:
+                if context == "history":
+                    computed[(context, key)] = recommend_for_student(
+                        str(key), top_n=top_n, dataset=dataset, term=term, filters=filters,
+                        budget_ms=budget_ms,
+                    )
+                else:
+                    computed[(context, key)] = recommend_for_interests(
+                        interests, top_n=top_n, dataset=dataset, term=term, filters=filters
+                    )
+
+            result: Dict[str, object] = {
+                "row": row_number,
+                "student_id": student_id or None,
+                "context": context,
             }
-        )
-    return results
+            if context == "interests":
+                result["interests"] = interests
+            result["recommendations"] = computed[(context, key)]
+            if getattr(result["recommendations"], "partial", False):
+                result["partial"] = True
+            yield result
+
+
+def _bulk_request_key(
+    row: Dict[str, object],
+    dataset: SyntheticDataset,
+) -> Tuple[str, str, object, List[str]]:
+    """``(student_id, context, dedup key, interests)`` for a row; ``ValueError`` if it cannot be scored."""
+    student_id = str(row.get("student_id") or "").strip().upper()
+    interests = sorted({str(tag).strip() for tag in row.get("interests") or [] if str(tag).strip()})
+    if not interests:
+        if not student_id:
+            raise ValueError("Row needs a student_id or interests.")
+        if student_id not in dataset.students:
+            raise ValueError("Unknown student ID.")
+        if dataset.student_completed_courses.get(student_id):
+            return student_id, "history", student_id, []
+        interests = sorted(dataset.student_interest_tags.get(student_id, set()))
+        if not interests:
+            raise ValueError("Student has no completed courses or stored interests.")
+    return student_id, "interests", tuple(interests), interests
+
+
+@METRICS.timed_stage("build_payload")
+def _build_recommendation_payload(
+    candidate: Set[str],
+    content_raw: Dict[str, float],
+    collab_scores: Dict[str, float],
+    weights: Tuple[float, float],
+    dataset: SyntheticDataset,
+    top_n: int,
+    boosts: Optional[Dict[str, float]] = None,
+) -> List[Dict[str, object]]:
+    # Heap selection over the scored courses; only the top N are ever materialized
+    ranked = top_k(candidate, content_raw, collab_scores, *weights, top_n=top_n, boosts=boosts)
+    return [
+        _recommendation_entry(course_id, score, content, collab, dataset)
+        for course_id, score, content, collab in ranked
+    ]
+
+
+def recommendations_from_snapshot(
+    ranked_scores: Sequence[Tuple[str, float, float, float]],
+    dataset: SyntheticDataset,
+) -> List[Dict[str, object]]:
+    """Rebuild a payload from stored ``(course_id, combined, content, collab)`` rows without scoring."""
+    return [
+        _recommendation_entry(course_id, combined, content, collab, dataset)
+        for course_id, combined, content, collab in ranked_scores
+    ]
+
+
+def _recommendation_entry(
+    course_id: str,
+    score: float,
+    content_score: float,
+    collab_score: float,
+    dataset: SyntheticDataset,
+) -> Dict[str, object]:
+    course = dataset.courses[course_id]
+    skills = sorted(dataset.course_skill_tags.get(course_id, []))
+    explanation = _build_explanation(
+        course_id,
+        content_score,
+        collab_score,
+        skills,
+        dataset,
+    )
+    return {
+        "course_id": course_id,
+        "course_code": course.get("course_code"),
+        "title": course.get("title"),
+        "category": course.get("category"),
+        "delivery_mode": course.get("delivery_mode"),
+        "combined_score": round(score, 3),
+        "content_score": round(content_score, 3),
+        "collab_score": round(collab_score, 3),
+        "skills": skills,
+        "description": course.get("description"),
+        "explanation": explanation,
+    }
 
 
 def _build_explanation(
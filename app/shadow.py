@@ -0,0 +1,166 @@
+"""
+Shadow-mode execution of candidate recommender engines.
+
+A shadow engine is any callable with the same signature as the function it
+shadows (``recommend_for_student`` or ``recommend_for_interests``), named
+as ``package.module:function`` in ``SHADOW_ENGINE_STUDENT`` or
+``SHADOW_ENGINE_INTERESTS``. On a ``SHADOW_SAMPLE_RATE`` fraction of
+requests the primary result is returned as usual and the shadow engine is
+then called with the same arguments on a background thread. Both latencies,
+the share of the primary top-N the shadow also returned, and the Spearman
+correlation of the ranks of the courses both returned are recorded as
+metrics and logged. Runs are dropped, never queued, once
+``SHADOW_MAX_PENDING`` are in flight, and a failing shadow engine is only
+counted and logged.
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .metrics import METRICS, SHADOW_OVERLAP, SHADOW_RANK_CORRELATION, SHADOW_RUNS, SHADOW_SECONDS
+
+KINDS = ("student", "interests")
+
+logger = logging.getLogger(__name__)
+
+
+def load_engine(spec: str) -> Callable:
+    """Resolve ``package.module:function``."""
+    module_name, _, attribute = spec.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(f"Shadow engine must look like 'package.module:function', got {spec!r}")
+    engine = getattr(importlib.import_module(module_name), attribute)
+    if not callable(engine):
+        raise ValueError(f"Shadow engine {spec!r} is not callable")
+    return engine
+
+
+def _course_ids(recommendations: Sequence[Dict[str, object]]) -> List[str]:
+    return [str(item["course_id"]) for item in recommendations]
+
+
+def topn_overlap(primary: Sequence[str], shadow: Sequence[str]) -> float:
+    """Share of the primary top-N that the shadow also returned (1.0 when both are empty)."""
+    if not primary:
+        return 1.0 if not shadow else 0.0
+    return len(set(primary) & set(shadow)) / len(primary)
+
+
+def rank_correlation(primary: Sequence[str], shadow: Sequence[str]) -> Optional[float]:
+    """Spearman correlation of the courses both lists hold, ``None`` with fewer than two in common."""
+    shadow_rank = {course_id: rank for rank, course_id in enumerate(shadow)}
+    common = [course_id for course_id in primary if course_id in shadow_rank]
+    count = len(common)
+    if count < 2:
+        return None
+    # Re-rank within the common courses so both sides are permutations of 0..count-1
+    shadow_order = {course_id: rank for rank, course_id in enumerate(sorted(common, key=shadow_rank.__getitem__))}
+    squared = sum((rank - shadow_order[course_id]) ** 2 for rank, course_id in enumerate(common))
+    return 1.0 - 6.0 * squared / (count * (count * count - 1))
+
+
+class ShadowRunner:
+    def __init__(
+        self,
+        engines: Dict[str, Tuple[str, Callable]],
+        sample_rate: float = 0.0,
+        max_pending: int = 16,
+        max_workers: int = 1,
+    ) -> None:
+        self.engines = engines
+        self.sample_rate = sample_rate
+        self.max_pending = max_pending
+        self.max_workers = max_workers
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created lazily so each gunicorn worker starts its own threads after forking.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="shadow")
+        return self._executor
+
+    def enabled(self, kind: str) -> bool:
+        return kind in self.engines and self.sample_rate > 0
+
+    def run(self, kind: str, primary: Callable, *args, **kwargs):
+        """Return ``primary(*args, **kwargs)``; on sampled calls, shadow it in the background."""
+        started = time.perf_counter()
+        result = primary(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        if self.enabled(kind) and random.random() < self.sample_rate:
+            self._submit(kind, result, elapsed, args, kwargs)
+        return result
+
+    def _submit(self, kind: str, result, elapsed: float, args: tuple, kwargs: dict) -> None:
+        name, _ = self.engines[kind]
+        with self._lock:
+            if self._pending >= self.max_pending:
+                METRICS.inc(SHADOW_RUNS, kind=kind, engine=name, result="dropped")
+                return
+            self._pending += 1
+        try:
+            self._get_executor().submit(self._compare, kind, _course_ids(result), elapsed, args, kwargs)
+        except RuntimeError:
+            # Executor shut down at interpreter exit
+            self._done()
+
+    def _done(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _compare(self, kind: str, primary_ids: List[str], primary_seconds: float, args: tuple, kwargs: dict) -> None:
+        name, engine = self.engines[kind]
+        try:
+            started = time.perf_counter()
+            try:
+                shadow_ids = _course_ids(engine(*args, **kwargs))
+            except Exception:
+                METRICS.inc(SHADOW_RUNS, kind=kind, engine=name, result="error")
+                logger.exception("Shadow engine %s failed for %s request", name, kind)
+                return
+            shadow_seconds = time.perf_counter() - started
+
+            overlap = topn_overlap(primary_ids, shadow_ids)
+            correlation = rank_correlation(primary_ids, shadow_ids)
+            METRICS.inc(SHADOW_RUNS, kind=kind, engine=name, result="ok")
+            METRICS.observe(SHADOW_SECONDS, primary_seconds, kind=kind, engine="primary")
+            METRICS.observe(SHADOW_SECONDS, shadow_seconds, kind=kind, engine=name)
+            METRICS.observe(SHADOW_OVERLAP, overlap, kind=kind, engine=name)
+            if correlation is not None:
+                METRICS.observe(SHADOW_RANK_CORRELATION, correlation, kind=kind, engine=name)
+            logger.info(
+                "shadow kind=%s engine=%s primary_ms=%.2f shadow_ms=%.2f delta_ms=%+.2f overlap=%.3f rank_corr=%s",
+                kind,
+                name,
+                primary_seconds * 1000.0,
+                shadow_seconds * 1000.0,
+                (shadow_seconds - primary_seconds) * 1000.0,
+                overlap,
+                "n/a" if correlation is None else f"{correlation:.3f}",
+            )
+        finally:
+            self._done()
+
+
+def shadow_from_env() -> ShadowRunner:
+    engines = {}
+    for kind in KINDS:
+        spec = os.environ.get(f"SHADOW_ENGINE_{kind.upper()}")
+        if spec:
+            engines[kind] = (spec, load_engine(spec))
+    return ShadowRunner(
+        engines,
+        sample_rate=float(os.environ.get("SHADOW_SAMPLE_RATE", "0")),
+        max_pending=int(os.environ.get("SHADOW_MAX_PENDING", "16")),
+        max_workers=int(os.environ.get("SHADOW_WORKERS", "1")),
+    )
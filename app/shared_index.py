@@ -0,0 +1,209 @@
+"""
+Refcount-free enrollment and interest indexes for preforked workers.
+
+The collaborative scorers walk every student's course set on each request.
+For Python sets that means bumping the refcount of every set and string
+touched, which dirties the copy-on-write pages a preloading gunicorn master
+shares with its workers. This module stores the same relations as CSR
+(offsets + values) int32 arrays in one anonymous shared ``mmap``. Reading
+them never writes to the shared pages, so N workers keep one physical copy.
+
+Student positions follow the order of ``student_completed_courses`` so that
+scorers iterating peers in ascending position add floats in exactly the same
+order as the dict-based path and produce identical scores.
+"""
+
+from __future__ import annotations
+
+import mmap
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Set
+from typing import AbstractSet, Dict, Iterator, List, Sequence, Tuple
+
+ITEM_FORMAT = "i"
+
+
+class _CSR:
+    __slots__ = ("offsets", "values")
+
+    def __init__(self, offsets: memoryview, values: memoryview) -> None:
+        self.offsets = offsets
+        self.values = values
+
+    def row(self, index: int) -> memoryview:
+        return self.values[self.offsets[index]:self.offsets[index + 1]]
+
+    def row_length(self, index: int) -> int:
+        return self.offsets[index + 1] - self.offsets[index]
+
+
+def _csr_arrays(rows: Sequence[Sequence[int]]) -> Tuple[array, array]:
+    offsets = array(ITEM_FORMAT, [0])
+    values = array(ITEM_FORMAT)
+    for row in rows:
+        values.extend(row)
+        offsets.append(len(values))
+    return offsets, values
+
+
+class SharedIndex:
+    """Integer-encoded relations backed by a single anonymous shared mapping.
+
+    ``student_courses`` and ``course_students`` mirror
+    ``student_completed_courses`` and ``collaborative_matrix``.
+    ``tag_students`` lists the students (in ``students.csv`` order) holding
+    each interest tag, and ``interest_to_history`` maps those positions to
+    ``student_courses`` rows (-1 when the student has no completions).
+    """
+
+    def __init__(
+        self,
+        student_completed_courses: Mapping,
+        student_interest_tags: Mapping,
+        course_ids: Sequence[str],
+        interest_catalog: Sequence[str],
+    ) -> None:
+        self.course_ids: Tuple[str, ...] = tuple(course_ids)
+        self.course_position: Dict[str, int] = {cid: pos for pos, cid in enumerate(self.course_ids)}
+        self.history_students: Tuple[str, ...] = tuple(student_completed_courses)
+        self.history_position: Dict[str, int] = {sid: pos for pos, sid in enumerate(self.history_students)}
+        self.interest_students: Tuple[str, ...] = tuple(student_interest_tags)
+        self.tag_ids: Tuple[str, ...] = tuple(interest_catalog)
+        self.tag_position: Dict[str, int] = {tag: pos for pos, tag in enumerate(self.tag_ids)}
+        self.interest_position: Dict[str, int] = {sid: pos for pos, sid in enumerate(self.interest_students)}
+
+        student_rows = [
+            sorted(self.course_position[cid] for cid in student_completed_courses[sid])
+            for sid in self.history_students
+        ]
+        course_rows: List[List[int]] = [[] for _ in self.course_ids]
+        for student_pos, course_row in enumerate(student_rows):
+            for course_pos in course_row:
+                course_rows[course_pos].append(student_pos)
+
+        tag_rows: List[List[int]] = [[] for _ in self.tag_ids]
+        interest_rows: List[List[int]] = []
+        for student_pos, sid in enumerate(self.interest_students):
+            row = sorted(self.tag_position[tag] for tag in student_interest_tags[sid] if tag in self.tag_position)
+            interest_rows.append(row)
+            for tag_pos in row:
+                tag_rows[tag_pos].append(student_pos)
+
+        to_history = array(
+            ITEM_FORMAT,
+            (self.history_position.get(sid, -1) for sid in self.interest_students),
+        )
+
+        arrays = [
+            *_csr_arrays(student_rows),
+            *_csr_arrays(course_rows),
+            *_csr_arrays(tag_rows),
+            *_csr_arrays(interest_rows),
+            to_history,
+        ]
+        self.nbytes = sum(len(item) * item.itemsize for item in arrays)
+        # Anonymous mappings are MAP_SHARED, so forked workers see the same pages
+        self._buffer = mmap.mmap(-1, max(self.nbytes, 1))
+        views: List[memoryview] = []
+        cursor = 0
+        for item in arrays:
+            size = len(item) * item.itemsize
+            self._buffer[cursor:cursor + size] = item.tobytes()
+            views.append(memoryview(self._buffer)[cursor:cursor + size].cast(ITEM_FORMAT))
+            cursor += size
+
+        self.student_courses = _CSR(views[0], views[1])
+        self.course_students = _CSR(views[2], views[3])
+        self.tag_students = _CSR(views[4], views[5])
+        self.student_tags = _CSR(views[6], views[7])
+        self.interest_to_history = views[8]
+
+
+class _LabelSet(Set):
+    """Read-only set of labels over one sorted CSR row.
+
+    ``len`` and membership never touch the label strings, so asking for a
+    course's popularity does not dirty the shared heap.
+    """
+
+    __slots__ = ("_row", "_labels", "_positions")
+
+    def __init__(self, row: memoryview, labels: Tuple[str, ...], positions: Dict[str, int]) -> None:
+        self._row = row
+        self._labels = labels
+        self._positions = positions
+
+    @classmethod
+    def _from_iterable(cls, iterable) -> Set:
+        # Results of set algebra are plain sets; the Set default would call cls(iterable)
+        return set(iterable)
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def __iter__(self) -> Iterator[str]:
+        labels = self._labels
+        return (labels[value] for value in self._row)
+
+    def __contains__(self, label: object) -> bool:
+        position = self._positions.get(label)  # type: ignore[arg-type]
+        if position is None:
+            return False
+        row = self._row
+        slot = bisect_left(row, position)
+        return slot < len(row) and row[slot] == position
+
+
+class _LabelSetView(Mapping):
+    """Read-only ``Dict[str, Set[str]]`` facade over one CSR relation."""
+
+    def __init__(
+        self,
+        keys: Tuple[str, ...],
+        positions: Dict[str, int],
+        csr: _CSR,
+        labels: Tuple[str, ...],
+        label_positions: Dict[str, int],
+    ) -> None:
+        self._keys = keys
+        self._positions = positions
+        self._csr = csr
+        self._labels = labels
+        self._label_positions = label_positions
+
+    def __getitem__(self, key: str) -> AbstractSet[str]:
+        return _LabelSet(self._csr.row(self._positions[key]), self._labels, self._label_positions)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+def student_courses_view(index: SharedIndex) -> Mapping:
+    return _LabelSetView(
+        index.history_students, index.history_position,
+        index.student_courses, index.course_ids, index.course_position,
+    )
+
+
+def course_students_view(index: SharedIndex) -> Mapping:
+    # Only courses somebody completed appear, as in the dict-based matrix
+    present = tuple(cid for pos, cid in enumerate(index.course_ids) if index.course_students.row_length(pos))
+    positions = {cid: index.course_position[cid] for cid in present}
+    return _LabelSetView(
+        present, positions,
+        index.course_students, index.history_students, index.history_position,
+    )
+
+
+def student_tags_view(index: SharedIndex) -> Mapping:
+    return _LabelSetView(
+        index.interest_students, index.interest_position,
+        index.student_tags, index.tag_ids, index.tag_position,
+    )
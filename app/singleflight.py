@@ -0,0 +1,70 @@
+"""
+In-process single-flight coalescing of identical concurrent computations.
+
+The first caller for a key (the leader) runs the function; callers arriving
+with the same key while it runs wait for it and receive the same result, or
+the same exception. The key is forgotten as soon as the leader finishes, so
+nothing is cached. Groups are per process and thread-safe, so under gunicorn
+they coalesce across a threaded worker's request threads (``--threads``).
+Results are shared between callers and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, Hashable, Optional, TypeVar
+
+from .metrics import METRICS, SINGLEFLIGHT_CALLS
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: object = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[..., T], *args, **kwargs) -> T:
+        """Return ``func(*args, **kwargs)``, sharing one execution among concurrent callers with ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            METRICS.inc(SINGLEFLIGHT_CALLS, group=self.name, role="follower")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore[return-value]
+
+        METRICS.inc(SINGLEFLIGHT_CALLS, group=self.name, role="leader")
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result  # type: ignore[return-value]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+INTEREST_FLIGHTS = SingleFlight("interests")
+PDF_FLIGHTS = SingleFlight("pdf")
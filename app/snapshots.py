@@ -0,0 +1,62 @@
+"""Signed recommendation snapshots so PDF export can skip re-scoring."""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from itsdangerous import BadSignature, URLSafeSerializer
+
+from .data_loader import SyntheticDataset
+from .recommender import recommendations_from_snapshot
+
+
+_SALT = "recommendation-snapshot"
+
+
+def issue_snapshot_token(
+    secret_key: str,
+    dataset: SyntheticDataset,
+    context: str,
+    student_id: str,
+    selected_interests: Optional[Sequence[str]],
+    recommendations: Sequence[Dict[str, object]],
+) -> str:
+    payload = {
+        "v": dataset.version,
+        "c": context,
+        "s": student_id,
+        "i": list(selected_interests or []),
+        "r": [
+            [rec["course_id"], rec["combined_score"], rec["content_score"], rec["collab_score"]]
+            for rec in recommendations
+        ],
+    }
+    return URLSafeSerializer(secret_key, salt=_SALT).dumps(payload)
+
+
+def load_snapshot(
+    secret_key: str,
+    token: str,
+    dataset: SyntheticDataset,
+    context: str,
+    student_id: str,
+) -> Optional[Tuple[List[Dict[str, object]], List[str]]]:
+    """Return ``(recommendations, selected_interests)`` or ``None`` if the token can't be trusted."""
+    try:
+        payload = URLSafeSerializer(secret_key, salt=_SALT).loads(token)
+        if (
+            payload["v"] != dataset.version
+            or payload["c"] != context
+            or payload["s"] != student_id
+        ):
+            return None
+        ranked = [
+            (str(course_id), float(combined), float(content), float(collab))
+            for course_id, combined, content, collab in payload["r"]
+        ]
+        if any(course_id not in dataset.courses for course_id, *_ in ranked):
+            return None
+        interests = [str(tag) for tag in payload["i"]]
+    except (BadSignature, KeyError, TypeError, ValueError):
+        return None
+    return recommendations_from_snapshot(ranked, dataset), interests
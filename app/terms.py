@@ -0,0 +1,38 @@
+"""Academic term codes: ``YYYY`` plus ``W`` (winter), ``S`` (summer) or ``F`` (fall)."""
+
+from __future__ import annotations
+
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+SEASONS = ("W", "S", "F")
+SEASON_NAMES = {"W": "winter", "S": "summer", "F": "fall"}
+TERM_PATTERN = re.compile(r"^\d{4}[WSF]$")
+
+
+def next_term(term_code: str) -> str:
+    year, season = int(term_code[:4]), SEASONS.index(term_code[4])
+    if season == len(SEASONS) - 1:
+        return f"{year + 1}{SEASONS[0]}"
+    return f"{year}{SEASONS[season + 1]}"
+
+
+def current_term(today: Optional[date] = None) -> str:
+    today = today or date.today()
+    season = "W" if today.month <= 4 else "S" if today.month <= 8 else "F"
+    return f"{today.year}{season}"
+
+
+def term_sort_key(term_code: str) -> Tuple[str, int]:
+    """Chronological order for valid codes; anything else sorts last."""
+    if not TERM_PATTERN.match(term_code):
+        return ("9999", len(SEASONS))
+    return (term_code[:4], SEASONS.index(term_code[4]))
+
+
+def term_sequence(start_term: str, count: int) -> List[str]:
+    terms = [start_term]
+    while len(terms) < count:
+        terms.append(next_term(terms[-1]))
+    return terms
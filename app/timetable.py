@@ -0,0 +1,132 @@
+"""
+Per-term, per-day interval index over ``course_offerings.csv``.
+
+Each term's meetings are swept once per weekday in start-time order to
+build a conflict bitset for every offering, so checking a candidate against
+a partly built schedule is a single AND instead of a pairwise time
+comparison. ``best_conflict_free`` then picks the highest-scoring set of
+courses with at most one clash-free section each, using branch and bound
+over the conflict bitsets.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .data_loader import SyntheticDataset, dataset_cache
+
+MAX_SEARCH_NODES = 50000
+
+
+def _minutes(value: str) -> Optional[int]:
+    hours, _, minutes = (value or "").partition(":")
+    try:
+        return int(hours) * 60 + int(minutes)
+    except ValueError:
+        return None
+
+
+class TermTimetable:
+    def __init__(self, term_code: str, offerings: Sequence[Dict[str, str]]) -> None:
+        self.term_code = term_code
+        self.offerings: List[Dict[str, str]] = list(offerings)
+        self.sections: Dict[str, List[int]] = {}
+        # day -> [(start, end, offering index)] sorted by start
+        self.by_day: Dict[str, List[Tuple[int, int, int]]] = {}
+        for idx, offering in enumerate(self.offerings):
+            self.sections.setdefault(offering["course_id"], []).append(idx)
+            start, end = _minutes(offering.get("start_time", "")), _minutes(offering.get("end_time", ""))
+            if start is None or end is None or end <= start:
+                continue  # no fixed meeting time, so it cannot clash
+            for day in offering.get("meeting_days", "").split("|"):
+                if day.strip():
+                    self.by_day.setdefault(day.strip(), []).append((start, end, idx))
+
+        self.conflicts: List[int] = [0] * len(self.offerings)
+        for meetings in self.by_day.values():
+            meetings.sort()
+            active: List[Tuple[int, int]] = []  # heap of (end, offering index)
+            for start, end, idx in meetings:
+                while active and active[0][0] <= start:
+                    heapq.heappop(active)
+                for _, other in active:
+                    if other != idx:
+                        self.conflicts[idx] |= 1 << other
+                        self.conflicts[other] |= 1 << idx
+                heapq.heappush(active, (end, idx))
+
+    def offered_courses(self) -> List[str]:
+        return list(self.sections)
+
+    def best_conflict_free(
+        self, scores: Dict[str, float], top_n: int
+    ) -> Tuple[List[Tuple[str, int]], bool]:
+        """Return ``[(course_id, offering index)]`` maximizing the summed score, and whether the search was exhaustive.
+
+        Among schedules with the same score the one with more courses wins,
+        so zero-score courses still fill free slots up to ``top_n``.
+        """
+        ranked = sorted(
+            (course_id for course_id in scores if course_id in self.sections),
+            key=lambda course_id: (-scores[course_id], course_id),
+        )
+        values = [scores[course_id] for course_id in ranked]
+        # Compared as (score, course count), so ties go to the fuller schedule
+        best: Tuple[Tuple[float, int], List[Tuple[str, int]]] = ((-1.0, 0), [])
+        nodes = 0
+        exhaustive = True
+
+        def search(start: int, taken: int, score: float, chosen: List[Tuple[str, int]]) -> None:
+            nonlocal best, nodes, exhaustive
+            if (score, len(chosen)) > best[0]:
+                best = ((score, len(chosen)), list(chosen))
+            remaining = top_n - len(chosen)
+            if remaining == 0:
+                return
+            for position in range(start, len(ranked)):
+                # Scores are sorted, so the next ``remaining`` values bound any completion
+                bound = (
+                    score + sum(values[position:position + remaining]),
+                    len(chosen) + min(remaining, len(ranked) - position),
+                )
+                if bound <= best[0]:
+                    return
+                nodes += 1
+                if nodes > MAX_SEARCH_NODES:
+                    exhaustive = False
+                    return
+                course_id = ranked[position]
+                for idx in self.sections[course_id]:
+                    if not self.conflicts[idx] & taken:
+                        chosen.append((course_id, idx))
+                        search(position + 1, taken | (1 << idx), score + values[position], chosen)
+                        chosen.pop()
+
+        search(0, 0, 0.0, [])
+        return best[1], exhaustive
+
+    def meeting(self, idx: int) -> Dict[str, str]:
+        offering = self.offerings[idx]
+        return {
+            "offering_id": offering.get("offering_id", ""),
+            "term_code": offering.get("term_code", ""),
+            "meeting_days": offering.get("meeting_days", ""),
+            "start_time": offering.get("start_time", ""),
+            "end_time": offering.get("end_time", ""),
+            "location": offering.get("location", ""),
+            "instructor": offering.get("instructor", ""),
+        }
+
+
+@dataset_cache
+def _timetables(dataset: SyntheticDataset) -> Dict[str, TermTimetable]:
+    by_term: Dict[str, List[Dict[str, str]]] = {}
+    for offerings in dataset.course_offerings.values():
+        for offering in offerings:
+            by_term.setdefault(offering.get("term_code", ""), []).append(offering)
+    return {term_code: TermTimetable(term_code, rows) for term_code, rows in by_term.items()}
+
+
+def get_timetable(term_code: str, dataset: SyntheticDataset) -> Optional[TermTimetable]:
+    return _timetables(dataset).get(term_code)
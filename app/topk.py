@@ -0,0 +1,149 @@
+"""
+Sparse content scoring and heap-based top-K selection.
+
+A course's content score is a sum of profile weights over its features
+(skills, ``category::``, ``delivery::`` and ``term::`` keys), so a course
+sharing no feature with the profile scores exactly 0. ``ContentIndex``
+keeps each course's features, in the order ``_score_content`` adds them,
+plus a feature -> courses posting list. Only courses reached from the
+profile's postings are scored; replaying their features in the original
+order keeps every sum bit-identical.
+
+``top_k`` applies the min-max normalization exactly: implicit zeros take
+part in the content min/max, and every course that is neither scored nor
+collaboratively recommended shares one known combined score, which is an
+upper bound on all of them. Only scored courses go through the size-K heap,
+and the unscored remainder is consulted (smallest IDs first) only when that
+bound can still reach the top K.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import AbstractSet, Dict, List, Mapping, Optional, Set, Tuple
+
+from .data_loader import SyntheticDataset, dataset_cache
+
+
+def _split_to_set(value: str) -> Set[str]:
+    return {item.strip() for item in value.split("|") if item.strip()}
+
+
+class ContentIndex:
+    """Per-course ``(profile key, is_term)`` features and feature -> course postings."""
+
+    def __init__(self, dataset: SyntheticDataset) -> None:
+        self.features: Dict[str, Tuple[Tuple[str, bool], ...]] = {}
+        self.postings: Dict[str, Set[str]] = {}
+        course_skill_tags = dataset.course_skill_tags
+        for course_id, course in dataset.courses.items():
+            features = [(skill, False) for skill in course_skill_tags.get(course_id, set())]
+            features.append((f"category::{course['category']}", False))
+            features.append((f"delivery::{course.get('delivery_mode', '')}", False))
+            features.extend(
+                (f"term::{term.lower()}", True)
+                for term in _split_to_set(course.get("term_patterns", ""))
+            )
+            self.features[course_id] = tuple(features)
+            for key, _ in features:
+                self.postings.setdefault(key, set()).add(course_id)
+
+
+@dataset_cache
+def content_index(dataset: SyntheticDataset) -> ContentIndex:
+    return ContentIndex(dataset)
+
+
+def sparse_content_scores(
+    candidate_courses: AbstractSet[str],
+    profile: Mapping[str, float],
+    dataset: SyntheticDataset,
+) -> Dict[str, float]:
+    """Content scores for the candidates sharing a feature with ``profile``; every other candidate scores 0.0."""
+    index = content_index(dataset)
+    touched: Set[str] = set()
+    for key in profile:
+        posting = index.postings.get(key)
+        if posting:
+            touched |= posting
+    touched &= candidate_courses
+
+    scores: Dict[str, float] = {}
+    for course_id in touched:
+        score = 0.0
+        for key, is_term in index.features[course_id]:
+            weight = profile.get(key)
+            if weight is None:
+                continue  # _score_content adds 0.0 here, which never changes the sum
+            score += 0.1 * weight if is_term else weight
+        scores[course_id] = score
+    return scores
+
+
+def _normalize_with_zero(scores: Dict[str, float], implicit_zero: bool) -> Tuple[Dict[str, float], float]:
+    """``_normalize`` over ``scores`` plus (when ``implicit_zero``) unlisted 0.0 entries; returns the zero's value too."""
+    if not scores and not implicit_zero:
+        return {}, 0.0
+    min_score = min(scores.values(), default=0.0)
+    max_score = max(scores.values(), default=0.0)
+    if implicit_zero:
+        min_score = min(min_score, 0.0)
+        max_score = max(max_score, 0.0)
+    if max_score == min_score:
+        return {key: 1.0 for key in scores}, 1.0
+    spread = max_score - min_score
+    return (
+        {key: (value - min_score) / spread for key, value in scores.items()},
+        (0.0 - min_score) / spread,
+    )
+
+
+def top_k(
+    candidate_courses: AbstractSet[str],
+    content_raw: Dict[str, float],
+    collab_scores: Dict[str, float],
+    content_weight: float,
+    collab_weight: float,
+    top_n: int,
+    boosts: Optional[Dict[str, float]] = None,
+) -> List[Tuple[str, float, float, float]]:
+    """``(course_id, combined, content, collab)`` for the ``top_n`` best candidates.
+
+    ``content_raw`` comes from ``sparse_content_scores`` and
+    ``collab_scores`` is already normalized. Ranking and tie-breaking match a
+    full sort by ``(-combined, course_id)``.
+    """
+    if not candidate_courses or top_n <= 0:
+        return []
+    boosts = boosts or {}
+    content_scores, zero_content = _normalize_with_zero(
+        content_raw, implicit_zero=len(content_raw) < len(candidate_courses)
+    )
+
+    scored = content_scores.keys() | collab_scores.keys() | boosts.keys()
+    heap: List[Tuple[float, str]] = []
+    for course_id in scored:
+        combined = (
+            content_weight * content_scores.get(course_id, zero_content)
+            + collab_weight * collab_scores.get(course_id, 0.0)
+        )
+        if course_id in boosts:
+            combined += boosts[course_id]
+        heap.append((-combined, course_id))
+    ranked = heapq.nsmallest(top_n, heap)
+
+    # Every other candidate has the same combined score, which bounds them all
+    bound = content_weight * zero_content + collab_weight * 0.0
+    if len(scored) < len(candidate_courses) and (len(ranked) < top_n or -ranked[-1][0] <= bound):
+        rest = heapq.nsmallest(top_n, candidate_courses - scored)
+        ranked = heapq.nsmallest(top_n, ranked + [(-bound, course_id) for course_id in rest])
+
+    return [
+        (
+            course_id,
+            -negated,
+            content_scores.get(course_id, zero_content),
+            collab_scores.get(course_id, 0.0),
+        )
+        for negated, course_id in ranked
+    ]
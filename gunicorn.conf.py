@@ -0,0 +1,53 @@
+"""
+Gunicorn settings, picked up automatically from the working directory.
+
+By default the app and dataset are loaded once in the master, then the
+workers fork from it. Hot indexes are stored in a shared mmap (see
+``app/shared_index.py``) and the heap is frozen out of the GC, so workers
+share one physical copy instead of each building and dirtying their own.
+Set ``GUNICORN_PRELOAD=0`` to go back to per-worker loading.
+
+Async PDF export jobs and ``/metrics`` snapshots are shared between workers
+through ``PDF_JOBS_DIR`` and ``METRICS_DIR``; unless set, a temporary
+directory is created here for each and removed when the master exits.
+"""
+
+import os
+import shutil
+import tempfile
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+
+if preload_app:
+    # Must be set before main imports app.data_loader
+    os.environ.setdefault("MAC_SHARED_DATASET", "1")
+
+_created_dirs = []
+if not os.environ.get("PDF_JOBS_DIR"):
+    # Set before forking so every worker inherits the same directory
+    os.environ["PDF_JOBS_DIR"] = tempfile.mkdtemp(prefix="mac-pdf-jobs-")
+    _created_dirs.append(os.environ["PDF_JOBS_DIR"])
+if not (os.environ.get("METRICS_DIR") or os.environ.get("PROMETHEUS_MULTIPROC_DIR")):
+    # Also before main imports app.metrics, which reads it once
+    os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="mac-metrics-")
+    _created_dirs.append(os.environ["METRICS_DIR"])
+
+
+def when_ready(server):
+    if preload_app:
+        from app.data_loader import preload_dataset
+
+        dataset = preload_dataset()
+        server.log.info("Preloaded dataset %s into the master", dataset.version)
+
+
+def child_exit(server, worker):
+    # A replacement worker has a new pid, so the dead one's snapshot would never be updated again
+    from app.metrics import METRICS
+
+    METRICS.forget_process(worker.pid)
+
+
+def on_exit(server):
+    for directory in _created_dirs:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -1,14 +1,202 @@
 from __future__ import annotations
 
-from flask import Flask, render_template, request, make_response, send_file
+import csv
+import json
+import os
+import secrets
+import time
+from io import BytesIO, StringIO
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from flask import (
+    Flask,
+    Response,
+    before_render_template,
+    g,
+    jsonify,
+    render_template,
+    request,
+    make_response,
+    send_file,
+    stream_with_context,
+    template_rendered,
+    url_for,
+)
 from collections import Counter
 
-from app.data_loader import get_dataset
-from app.recommender import recommend_for_interests, recommend_for_student
+from app.audit import audit_population, audit_student
+from app.data_loader import DEFAULT_DATASET, REGISTRY, get_dataset, select_dataset
+from app.filters import CourseFilters
+from app.metrics import CACHE_LOOKUPS, METRICS, PARTIAL_RESULTS, REQUEST_SECONDS, STAGE_SECONDS
+from app.recommender import (
+    recommend_for_interests,
+    recommend_for_student,
+    recommend_rows,
+    recommend_schedule,
+)
 from app.pdf_export import generate_recommendations_pdf
+from app.pdf_jobs import JobQueueFull, get_pdf_jobs
+from app.planner import (
+    DEFAULT_BUDGET_MS,
+    DEFAULT_COURSES_PER_TERM,
+    DEFAULT_MAX_PLANS,
+    DEFAULT_MAX_TERMS,
+    plan_pathways,
+)
+from app.profiling import profiler_from_env
+from app.shadow import shadow_from_env
+from app.singleflight import INTEREST_FLIGHTS
+from app.snapshots import issue_snapshot_token, load_snapshot
+from app.terms import TERM_PATTERN, current_term, next_term
+from app.timetable import get_timetable
 
 
 app = Flask(__name__)
+# Set SECRET_KEY in production so snapshot tokens verify across workers and restarts.
+app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY") or secrets.token_hex(32)
+profiler = profiler_from_env()
+shadow = shadow_from_env()
+
+DATASET_HEADER = "X-Dataset"
+DATASET_PREFIX = "/d/"
+
+
+class DatasetPrefixMiddleware:
+    """Serve ``/d/<name>/...`` as ``/...`` with dataset ``<name>`` selected.
+
+    The prefix moves into ``SCRIPT_NAME``, so ``url_for`` keeps links and
+    form actions inside the same dataset.
+    """
+
+    def __init__(self, wsgi_app) -> None:
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        if path.startswith(DATASET_PREFIX):
+            name, _, rest = path[len(DATASET_PREFIX):].partition("/")
+            if name:
+                environ["mac.dataset"] = name
+                environ["SCRIPT_NAME"] = environ.get("SCRIPT_NAME", "") + DATASET_PREFIX + name
+                environ["PATH_INFO"] = "/" + rest
+        return self.wsgi_app(environ, start_response)
+
+
+app.wsgi_app = DatasetPrefixMiddleware(app.wsgi_app)
+
+
+def _route_budget(route: str) -> Optional[float]:
+    """Latency budget for history scoring from ``RECOMMEND_BUDGET_MS_<ROUTE>`` or ``RECOMMEND_BUDGET_MS``; unset means unbounded."""
+    value = os.environ.get(f"RECOMMEND_BUDGET_MS_{route.upper()}") or os.environ.get("RECOMMEND_BUDGET_MS")
+    return float(value) if value else None
+
+
+ROUTE_BUDGETS_MS = {route: _route_budget(route) for route in ("index", "export_pdf", "cohort", "bulk")}
+
+
+def _count_partial(recommendations: List[Dict[str, object]], route: str) -> List[Dict[str, object]]:
+    if getattr(recommendations, "partial", False):
+        METRICS.inc(PARTIAL_RESULTS, route=route)
+    return recommendations
+
+
+def _interest_recommendations(
+    interest_tags: List[str], dataset, filters: Optional[CourseFilters] = None
+) -> List[Dict[str, object]]:
+    """``recommend_for_interests``, with identical concurrent requests sharing one computation."""
+    key = (
+        str(dataset.data_dir),
+        dataset.version,
+        tuple(sorted({tag for tag in interest_tags if tag})),
+        tuple(filters.as_params()) if filters else (),
+    )
+    return INTEREST_FLIGHTS.do(key, recommend_for_interests, interest_tags, dataset=dataset, filters=filters)
+
+
+def _render_home(dataset, filters: Optional[CourseFilters] = None, **context):
+    """Render the landing page with filter controls built from the catalog facets."""
+    return render_template(
+        "home.html",
+        facet_options={
+            field: dataset.facet_values(field)
+            for field in ("category", "delivery_mode", "credits", "difficulty_level")
+        },
+        selected_filters=(filters or CourseFilters()).as_dict(),
+        **context,
+    )
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_request_latency(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        METRICS.observe(
+            REQUEST_SECONDS,
+            time.perf_counter() - started,
+            route=request.url_rule.rule if request.url_rule else "unmatched",
+            method=request.method,
+            status=response.status_code,
+        )
+    return response
+
+
+@app.before_request
+def _select_dataset():
+    name = request.environ.get("mac.dataset") or request.headers.get(DATASET_HEADER, "").strip()
+    if name and name != DEFAULT_DATASET and name not in REGISTRY:
+        select_dataset(None)
+        return jsonify({"error": f"Unknown dataset: {name}"}), 404
+    # Set on every request so a pooled thread never keeps the previous request's choice
+    select_dataset(name or None)
+
+
+@app.teardown_request
+def _trim_datasets(exc):
+    REGISTRY.trim()
+
+
+@app.before_request
+def _start_profiling():
+    if profiler.requested(request):
+        g.profile = profiler.start()
+        g.profile_busy = g.profile is None
+
+
+@app.after_request
+def _finish_profiling(response):
+    profile = g.pop("profile", None)
+    if profile is not None:
+        return profiler.finish(profile, request, response)
+    if g.pop("profile_busy", False):
+        response.headers["X-Profile-Status"] = "busy"
+    return response
+
+
+@app.teardown_request
+def _release_profiler(exc):
+    # after_request is skipped when a view raises, so free the slot here
+    profile = g.pop("profile", None)
+    if profile is not None:
+        profiler.stop(profile)
+
+
+def _start_template_timer(sender, template, context, **extra):
+    g.setdefault("template_timers", []).append(time.perf_counter())
+
+
+def _record_template_latency(sender, template, context, **extra):
+    timers = g.get("template_timers")
+    if timers:
+        METRICS.observe(STAGE_SECONDS, time.perf_counter() - timers.pop(), stage="render_template")
+
+
+before_render_template.connect(_start_template_timer, app)
+template_rendered.connect(_record_template_latency, app)
 
 
 @app.route("/", methods=["GET", "POST"])
@@ -18,22 +206,38 @@ def index():
     if request.method == "POST":
         student_id = request.form.get("student_id", "").strip().upper()
         if not student_id:
-            return render_template(
-                "home.html",
+            return _render_home(
+                dataset,
+                CourseFilters.from_params(request.values),
                 error="Please enter a student ID.",
             )
 
         student = dataset.students.get(student_id)
         completed_history = dataset.student_completed_courses.get(student_id, set())
+        filters = CourseFilters.from_params(request.values)
 
         if student and completed_history:
-            recommendations = recommend_for_student(student_id)
+            recommendations = _count_partial(
+                shadow.run(
+                    "student",
+                    recommend_for_student,
+                    student_id,
+                    dataset=dataset,
+                    filters=filters,
+                    budget_ms=ROUTE_BUDGETS_MS["index"],
+                ),
+                "index",
+            )
             return render_template(
                 "recommendations.html",
                 student=student,
                 performance=dataset.performance.get(student_id),
                 recommendations=recommendations,
                 context="history",
+                filter_params=filters.as_params() if filters else [],
+                snapshot_token=issue_snapshot_token(
+                    app.secret_key, dataset, "history", student_id, None, recommendations
+                ),
             )
 
         preset_interests = sorted(dataset.student_interest_tags.get(student_id, set()))
@@ -45,9 +249,10 @@ def index():
             preset_interests=preset_interests,
             missing_student=student is None,
             missing_history=not completed_history,
+            filter_params=filters.as_params() if filters else [],
         )
 
-    return render_template("home.html")
+    return _render_home(dataset)
 
 
 @app.post("/interests")
@@ -55,8 +260,11 @@ def collect_interests():
     dataset = get_dataset()
     student_id = request.form.get("student_id", "").strip().upper()
     selected_interests = request.form.getlist("interests")
+    filters = CourseFilters.from_params(request.values)
 
-    recommendations = recommend_for_interests(selected_interests)
+    recommendations = shadow.run(
+        "interests", _interest_recommendations, selected_interests, dataset=dataset, filters=filters
+    )
     student = dataset.students.get(student_id)
 
     return render_template(
@@ -66,6 +274,15 @@ def collect_interests():
         recommendations=recommendations,
         context="interests",
         selected_interests=selected_interests,
+        filter_params=filters.as_params() if filters else [],
+        snapshot_token=issue_snapshot_token(
+            app.secret_key,
+            dataset,
+            "interests",
+            student["student_id"] if student else "",
+            selected_interests,
+            recommendations,
+        ),
     )
 
 
@@ -79,13 +296,27 @@ def browse_courses():
     delivery_filter = request.args.get("delivery", "")
     difficulty_filter = request.args.get("difficulty", "")
     credits_filter = request.args.get("credits", "")
+    term_filter = request.args.get("term", "").strip()
     sort_by = request.args.get("sort", "relevance")
+
+    # Term filter uses the same term -> offered-course index as the recommender
+    upcoming_term = next_term(current_term())
+    offered = None
+    if term_filter == "next":
+        offered = dataset.offered_courses(upcoming_term)
+    elif TERM_PATTERN.match(term_filter.upper()):
+        offered = dataset.offered_courses(term_filter.upper())
+    else:
+        term_filter = ""
     
     # Get all courses
     all_courses = []
+    course_popularity = dataset.course_popularity
     for course_id, course_data in dataset.courses.items():
+        if offered is not None and course_id not in offered:
+            continue
         skills = list(dataset.course_skill_tags.get(course_id, []))
-        popularity = len(dataset.collaborative_matrix.get(course_id, set()))
+        popularity = course_popularity.get(course_id, 0)
         
         all_courses.append({
             "course_id": course_id,
@@ -161,7 +392,10 @@ def browse_courses():
             "delivery": delivery_filter,
             "difficulty": difficulty_filter,
             "credits": credits_filter,
+            "term": term_filter if term_filter == "next" else term_filter.upper(),
         },
+        term_options=dataset.published_terms,
+        next_term=upcoming_term,
         sort_by=sort_by,
     )
 
@@ -179,14 +413,59 @@ def export_pdf():
     student = dataset.students.get(student_id) if student_id else None
     performance = dataset.performance.get(student_id) if student_id else None
     
-    # Get recommendations based on context
-    if context == "history" and student_id:
-        recommendations = recommend_for_student(student_id)
+    # Reuse the ranking the user saw when the snapshot token checks out
+    snapshot = load_snapshot(
+        app.secret_key,
+        request.form.get("snapshot", ""),
+        dataset,
+        context,
+        student_id,
+    )
+    METRICS.inc(CACHE_LOOKUPS, cache="snapshot", result="miss" if snapshot is None else "hit")
+    if snapshot is not None:
+        recommendations, selected_interests = snapshot
+        if context == "history":
+            selected_interests = None
+    # Otherwise recompute recommendations based on context
+    elif context == "history" and student_id:
+        recommendations = _count_partial(
+            recommend_for_student(
+                student_id,
+                dataset=dataset,
+                filters=CourseFilters.from_params(request.form),
+                budget_ms=ROUTE_BUDGETS_MS["export_pdf"],
+            ),
+            "export_pdf",
+        )
         selected_interests = None
     else:
         selected_interests = [i.strip() for i in selected_interests_str.split(",") if i.strip()]
-        recommendations = recommend_for_interests(selected_interests)
+        recommendations = _interest_recommendations(
+            selected_interests, dataset=dataset, filters=CourseFilters.from_params(request.form)
+        )
     
+    # Create filename
+    filename = f"MAC_Recommendations_{student_id if student_id else 'Guest'}_{context}.pdf"
+
+    # Opt-in async mode hands rendering to the background pool
+    if request.form.get("mode") == "async" or request.args.get("async") == "1":
+        try:
+            job_id = get_pdf_jobs().submit(
+                student,
+                performance,
+                recommendations,
+                context,
+                selected_interests,
+                filename,
+            )
+        except JobQueueFull as exc:
+            return jsonify({"error": str(exc)}), 503
+        return jsonify({
+            "job_id": job_id,
+            "status_url": url_for("export_pdf_status", job_id=job_id),
+            "download_url": url_for("export_pdf_download", job_id=job_id),
+        }), 202
+
     # Generate PDF
     pdf_buffer = generate_recommendations_pdf(
         student,
@@ -196,9 +475,6 @@ def export_pdf():
         selected_interests
     )
     
-    # Create filename
-    filename = f"MAC_Recommendations_{student_id if student_id else 'Guest'}_{context}.pdf"
-    
     return send_file(
         pdf_buffer,
         as_attachment=True,
@@ -207,6 +483,340 @@ def export_pdf():
     )
 
 
+@app.post("/export-pdf/cohort")
+def export_pdf_cohort():
+    """Stream a ZIP with one recommendations PDF per requested student."""
+    dataset = get_dataset()
+    raw_ids = " ".join(request.form.getlist("student_ids")).replace(",", " ")
+    student_ids = list(dict.fromkeys(item.strip().upper() for item in raw_ids.split() if item.strip()))
+    if not student_ids:
+        return jsonify({"error": "Provide one or more student_ids."}), 400
+
+    def documents() -> Iterator[Dict[str, object]]:
+        for student_id in student_ids:
+            student = dataset.students.get(student_id)
+            if student is None:
+                yield {"student_id": student_id, "filename": None, "error": "Unknown student ID."}
+                continue
+            if dataset.student_completed_courses.get(student_id):
+                context = "history"
+                selected_interests = None
+                recommendations = _count_partial(
+                    recommend_for_student(student_id, dataset=dataset, budget_ms=ROUTE_BUDGETS_MS["cohort"]),
+                    "cohort",
+                )
+            else:
+                context = "interests"
+                selected_interests = sorted(dataset.student_interest_tags.get(student_id, set()))
+                recommendations = _interest_recommendations(selected_interests, dataset=dataset)
+            yield {
+                "student_id": student_id,
+                "filename": f"MAC_Recommendations_{student_id}_{context}.pdf",
+                "args": (
+                    student,
+                    dataset.performance.get(student_id),
+                    recommendations,
+                    context,
+                    selected_interests,
+                ),
+            }
+
+    return Response(
+        stream_with_context(get_pdf_jobs().stream_zip(documents())),
+        mimetype="application/zip",
+        headers={"Content-Disposition": "attachment; filename=MAC_Recommendations_Cohort.zip"},
+    )
+
+
+def _missing_export_job(jobs, job_id: str):
+    if jobs.owned_elsewhere(job_id):
+        # 421 Misdirected Request: only the worker that accepted the job can answer
+        return jsonify({
+            "error": "Export job is held by another server worker; set PDF_JOBS_DIR to share jobs between workers.",
+        }), 421
+    return jsonify({"error": "Unknown export job."}), 404
+
+
+@app.get("/export-pdf/jobs/<job_id>")
+def export_pdf_status(job_id: str):
+    """Report the state of an async PDF export job."""
+    jobs = get_pdf_jobs()
+    job = jobs.status(job_id)
+    if job is None:
+        return _missing_export_job(jobs, job_id)
+    if job["status"] == "done":
+        job["download_url"] = url_for("export_pdf_download", job_id=job_id)
+    return jsonify(job)
+
+
+@app.get("/export-pdf/jobs/<job_id>/download")
+def export_pdf_download(job_id: str):
+    """Download the PDF produced by an async export job."""
+    jobs = get_pdf_jobs()
+    job = jobs.status(job_id)
+    if job is None:
+        return _missing_export_job(jobs, job_id)
+    if job["status"] != "done":
+        return jsonify(job), 404 if job["status"] == "expired" else 409
+    pdf_bytes = jobs.result(job_id)
+    if pdf_bytes is None:
+        return jsonify({"error": "Export expired; please request it again."}), 404
+
+    return send_file(
+        BytesIO(pdf_bytes),
+        as_attachment=True,
+        download_name=job["filename"],
+        mimetype='application/pdf'
+    )
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition of route/stage latencies and cache counters."""
+    return Response(METRICS.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.get("/datasets")
+def list_datasets():
+    """Configured datasets, which sections each has loaded and their measured footprint."""
+    default = get_dataset(DEFAULT_DATASET)
+    return jsonify({
+        "selected": request.environ.get("mac.dataset") or request.headers.get(DATASET_HEADER) or DEFAULT_DATASET,
+        "memory_limit_bytes": REGISTRY.memory_limit,
+        "default": {
+            "name": DEFAULT_DATASET,
+            "data_dir": str(default.data_dir),
+            "loaded": True,
+            "sections": default.loaded_sections(),
+            "footprint_bytes": default.footprint_bytes(),
+        },
+        "datasets": REGISTRY.status(),
+    })
+
+
+def _split_interest_field(value: object) -> List[str]:
+    if isinstance(value, str):
+        return [item.strip() for item in value.split("|") if item.strip()]
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return []
+
+
+def _bulk_json_row(row: object) -> Dict[str, object]:
+    if isinstance(row, str):
+        row = {"student_id": row}
+    if not isinstance(row, dict):
+        return {"error": "Row must be a JSON object or a student ID string."}
+    return {
+        "student_id": str(row.get("student_id") or ""),
+        "interests": _split_interest_field(row.get("interests")),
+    }
+
+
+def _iter_bulk_rows(lines: Iterable[bytes], mimetype: str) -> Iterator[Dict[str, object]]:
+    """Parse a CSV or NDJSON upload lazily, one row at a time.
+
+    An ``application/json`` body is a single array of rows and is parsed in
+    one go, so large uploads should use CSV or NDJSON instead.
+    """
+    decoded = (line.decode("utf-8-sig") for line in lines)
+
+    if mimetype == "text/csv":
+        for row in csv.DictReader(decoded):
+            yield {
+                "student_id": row.get("student_id") or "",
+                "interests": _split_interest_field(row.get("interests") or ""),
+            }
+        return
+
+    if mimetype == "application/json":
+        try:
+            body = json.loads("".join(decoded))
+        except ValueError:
+            yield {"error": "Body is not valid JSON."}
+            return
+        for row in body if isinstance(body, list) else [body]:
+            yield _bulk_json_row(row)
+        return
+
+    for line in decoded:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield {"error": "Row is not valid JSON."}
+            continue
+        yield _bulk_json_row(row)
+
+
+@app.post("/bulk-recommendations")
+def bulk_recommendations():
+    """Stream NDJSON recommendations for a CSV, NDJSON or JSON list of students/interest sets."""
+    if request.mimetype not in {"text/csv", "application/x-ndjson", "application/json"}:
+        return Response(
+            json.dumps({"error": "Upload text/csv, application/x-ndjson or application/json."}) + "\n",
+            status=415,
+            mimetype="application/x-ndjson",
+        )
+
+    dataset = get_dataset()
+    top_n = max(1, min(request.args.get("top_n", 6, type=int), 50))
+    term = request.args.get("term", "").strip().upper() or None
+    if term and not TERM_PATTERN.match(term):
+        return Response(
+            json.dumps({"error": "term must look like 2025F, 2026W or 2026S."}) + "\n",
+            status=400,
+            mimetype="application/x-ndjson",
+        )
+    filters = CourseFilters.from_params(request.args)
+    rows = _iter_bulk_rows(request.stream, request.mimetype)
+
+    def generate() -> Iterator[str]:
+        for result in recommend_rows(
+            rows,
+            top_n=top_n,
+            dataset=dataset,
+            term=term,
+            filters=filters,
+            budget_ms=ROUTE_BUDGETS_MS["bulk"],
+        ):
+            if result.get("partial"):
+                METRICS.inc(PARTIAL_RESULTS, route="bulk")
+            yield json.dumps(result) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@app.get("/pathway")
+def degree_pathway():
+    """Return ranked term-by-term plans that take a student to graduation."""
+    dataset = get_dataset()
+    student_id = request.args.get("student_id", "").strip().upper()
+    if student_id not in dataset.students:
+        return jsonify({"error": "Unknown student_id."}), 404
+
+    start_term = request.args.get("start_term", "").strip().upper() or None
+    if start_term and not TERM_PATTERN.match(start_term):
+        return jsonify({"error": "start_term must look like 2025F, 2026W or 2026S."}), 400
+
+    plan = plan_pathways(
+        student_id,
+        start_term=start_term,
+        max_terms=max(1, min(request.args.get("max_terms", DEFAULT_MAX_TERMS, type=int), 12)),
+        courses_per_term=max(1, min(request.args.get("per_term", DEFAULT_COURSES_PER_TERM, type=int), 5)),
+        budget_ms=max(10.0, min(request.args.get("budget_ms", DEFAULT_BUDGET_MS, type=float), 2000.0)),
+        max_plans=max(1, min(request.args.get("plans", DEFAULT_MAX_PLANS, type=int), 10)),
+        dataset=dataset,
+    )
+    return jsonify(plan)
+
+
+@app.get("/schedule")
+def build_schedule():
+    """Return the best clash-free set of courses for one term ("build my schedule")."""
+    dataset = get_dataset()
+    term_code = request.args.get("term", "").strip().upper()
+    if not TERM_PATTERN.match(term_code):
+        return jsonify({"error": "term must look like 2025F, 2026W or 2026S."}), 400
+    if get_timetable(term_code, dataset) is None:
+        # Season patterns say which courses may run, but not when they meet
+        return jsonify({
+            "error": f"No timetable has been published for {term_code}.",
+            "term": term_code,
+            "published_terms": list(dataset.published_terms),
+        }), 404
+
+    student_id = request.args.get("student_id", "").strip().upper()
+    interests = sorted({
+        tag
+        for value in request.args.getlist("interests")
+        for tag in _split_interest_field(value)
+    })
+    if student_id and student_id not in dataset.students:
+        return jsonify({"error": "Unknown student_id."}), 404
+    if student_id and not interests and not dataset.student_completed_courses.get(student_id):
+        interests = sorted(dataset.student_interest_tags.get(student_id, set()))
+    if not student_id and not interests:
+        return jsonify({"error": "Provide a student_id or interests."}), 400
+
+    top_n = max(1, min(request.args.get("top_n", 4, type=int), 8))
+    filters = CourseFilters.from_params(request.args)
+    recommendations, exhaustive = recommend_schedule(
+        term_code,
+        student_id=student_id or None,
+        interest_tags=interests,
+        top_n=top_n,
+        dataset=dataset,
+        filters=filters,
+    )
+    context = "history" if dataset.student_completed_courses.get(student_id) else "interests"
+    return jsonify({
+        "term": term_code,
+        "student_id": student_id or None,
+        "context": context,
+        "optimal": exhaustive,
+        "filters": filters.as_dict() if filters else None,
+        "recommendations": recommendations,
+    })
+
+
+@app.get("/audit")
+def degree_audit():
+    """Return one student's degree audit: per-requirement status and remaining credits."""
+    dataset = get_dataset()
+    student_id = request.args.get("student_id", "").strip().upper()
+    if student_id not in dataset.students:
+        return jsonify({"error": "Unknown student_id."}), 404
+    return jsonify(audit_student(student_id, dataset=dataset))
+
+
+@app.get("/audit/population")
+def degree_audit_population():
+    """Stream every student's audit as NDJSON, or one row per student with ``?format=csv``."""
+    dataset = get_dataset()
+    audits = audit_population(dataset=dataset)
+
+    if request.args.get("format") != "csv":
+        def generate_ndjson() -> Iterator[str]:
+            for audit in audits:
+                yield json.dumps(audit) + "\n"
+
+        return Response(stream_with_context(generate_ndjson()), mimetype="application/x-ndjson")
+
+    requirement_ids = list(dataset.degree_requirements)
+
+    def generate_csv() -> Iterator[str]:
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["student_id", "satisfied", "remaining_credits", *requirement_ids])
+        for audit in audits:
+            status = {item["requirement_id"]: item for item in audit["requirements"]}
+            writer.writerow([
+                audit["student_id"],
+                audit["satisfied"],
+                audit["remaining_credits"],
+                *(_audit_cell(status[requirement_id]) for requirement_id in requirement_ids),
+            ])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    return Response(
+        stream_with_context(generate_csv()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment; filename=degree_audit.csv"},
+    )
+
+
+def _audit_cell(item: Dict[str, object]) -> str:
+    if item["satisfied"] is None:
+        return "review"
+    if "remaining_credits" in item and not item["satisfied"]:
+        return f"{item['remaining_credits']:g} remaining"
+    return "met" if item["satisfied"] else "not met"
+
+
 if __name__ == "__main__":
     app.run(debug=True)
 
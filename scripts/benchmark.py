@@ -0,0 +1,280 @@
+"""
+Benchmark suite for the recommender, the browse route and PDF export.
+
+Synthetic datasets are generated at multiples of the stock 120-student cohort
+(optionally with a replicated course catalogue) and each scale is measured in
+a fresh subprocess so peak RSS is attributable to that scale alone. Results
+are written as JSON; ``--compare`` checks them against a saved baseline and
+exits non-zero on regressions.
+
+Examples:
+    python scripts/benchmark.py --scales 1 10 100 --output bench.json
+    python scripts/benchmark.py --scales 1 10:4 --compare bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = Path(__file__).resolve().parent
+BASE_STUDENTS = 120
+DEFAULT_SEED = 8760
+
+BROWSE_QUERIES = (
+    "/browse",
+    "/browse?q=data",
+    "/browse?q=learning&sort=relevance",
+    "/browse?category=core&sort=popularity",
+    "/browse?delivery=online&difficulty=3&sort=title",
+)
+
+
+def parse_scale(spec: str) -> Tuple[int, int]:
+    """``"10"`` means 10x students; ``"10:4"`` also replicates the catalogue 4x."""
+    students, _, catalog = spec.partition(":")
+    return int(students), int(catalog or 1)
+
+
+def generate_dataset(output_dir: Path, student_factor: int, catalog_factor: int, seed: int) -> Dict[str, int]:
+    marker = output_dir / "benchmark.json"
+    if marker.exists():
+        return json.loads(marker.read_text())
+
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    import generate_mac_synthetic_data as generator
+
+    counts = generator.generate(
+        output_dir=output_dir,
+        n_students=BASE_STUDENTS * student_factor,
+        catalog_scale=catalog_factor,
+        seed=seed,
+        workers=os.cpu_count(),
+    )
+    sizes = {
+        "students": counts["students.csv"],
+        "courses": counts["courses.csv"],
+        "enrollments": counts["enrollments.csv"],
+    }
+    marker.write_text(json.dumps(sizes))
+    return sizes
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples_s: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples_s)
+    total = sum(ordered)
+    return {
+        "n": len(ordered),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "mean_ms": round(total / len(ordered) * 1000, 3),
+        "throughput_per_s": round(len(ordered) / total, 2) if total else None,
+    }
+
+
+def time_each(calls: Sequence[Callable[[], object]]) -> List[float]:
+    samples = []
+    for call in calls:
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def run_worker(data_dir: Path, samples: int, build_repeats: int, pdf_samples: int, seed: int) -> Dict[str, object]:
+    """Measure every operation against ``data_dir``; runs inside the per-scale subprocess."""
+    sys.path.insert(0, str(BASE_DIR))
+    from app import pdf_export
+    from app.data_loader import _build_dataset, get_dataset
+    from app.recommender import recommend_for_interests, recommend_for_student
+
+    rng = random.Random(seed)
+    operations: Dict[str, List[float]] = {}
+
+    operations["load_catalog"] = time_each([lambda: _build_dataset(data_dir).courses] * build_repeats)
+    operations["build_dataset"] = time_each([lambda: _build_dataset(data_dir).load_all()] * build_repeats)
+    dataset = get_dataset()
+    rss_after_load = peak_rss_mb()
+
+    with_history = sorted(dataset.student_completed_courses)
+    student_ids = rng.sample(with_history, min(samples, len(with_history)))
+    operations["recommend_for_student"] = time_each(
+        [lambda sid=sid: recommend_for_student(sid, dataset=dataset) for sid in student_ids]
+    )
+
+    catalog = list(dataset.interest_catalog)
+    interest_sets = [rng.sample(catalog, k=min(len(catalog), rng.randint(1, 4))) for _ in range(samples)]
+    operations["recommend_for_interests"] = time_each(
+        [lambda tags=tags: recommend_for_interests(tags, dataset=dataset) for tags in interest_sets]
+    )
+
+    from main import app
+
+    client = app.test_client()
+    browse_urls = [BROWSE_QUERIES[idx % len(BROWSE_QUERIES)] for idx in range(samples)]
+    operations["browse"] = time_each([lambda url=url: client.get(url) for url in browse_urls])
+
+    # Measure real renders, not content-cache hits
+    pdf_export.PDF_CACHE.max_size = 0
+    pdf_inputs = [
+        (
+            dataset.students.get(sid),
+            dataset.performance.get(sid),
+            recommend_for_student(sid, dataset=dataset),
+            "history",
+            None,
+        )
+        for sid in student_ids[:pdf_samples]
+    ]
+    operations["generate_recommendations_pdf"] = time_each(
+        [lambda args=args: pdf_export.generate_recommendations_pdf(*args) for args in pdf_inputs]
+    )
+
+    return {
+        "operations": {name: summarize(values) for name, values in operations.items() if values},
+        "rss_after_load_mb": rss_after_load,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_scale(args: argparse.Namespace, spec: str) -> Dict[str, object]:
+    student_factor, catalog_factor = parse_scale(spec)
+    data_dir = Path(args.workdir) / f"students-x{student_factor}-catalog-x{catalog_factor}-seed-{args.seed}"
+
+    started = time.perf_counter()
+    sizes = generate_dataset(data_dir, student_factor, catalog_factor, args.seed)
+    generate_seconds = time.perf_counter() - started
+
+    env = dict(os.environ, MAC_DATA_DIR=str(data_dir))
+    env.pop("METRICS_DIR", None)
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    completed = subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            "--worker",
+            str(data_dir),
+            "--samples",
+            str(args.samples),
+            "--build-repeats",
+            str(args.build_repeats),
+            "--pdf-samples",
+            str(args.pdf_samples),
+            "--seed",
+            str(args.seed),
+        ],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {
+        "scale": spec,
+        "student_factor": student_factor,
+        "catalog_factor": catalog_factor,
+        **sizes,
+        "generate_seconds": round(generate_seconds, 3),
+        **result,
+    }
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object], tolerance: float) -> List[str]:
+    """Return human-readable regressions where p50/p95 grew by more than ``tolerance``."""
+    baseline_scales = {entry["scale"]: entry for entry in baseline.get("scales", [])}
+    regressions: List[str] = []
+    for entry in current["scales"]:
+        reference = baseline_scales.get(entry["scale"])
+        if reference is None:
+            continue
+        for name, stats in entry["operations"].items():
+            ref_stats = reference["operations"].get(name)
+            if not ref_stats:
+                continue
+            for metric in ("p50_ms", "p95_ms"):
+                before, after = ref_stats[metric], stats[metric]
+                if before and after > before * (1 + tolerance):
+                    regressions.append(
+                        f"scale {entry['scale']} {name} {metric}: {before:.3f} -> {after:.3f} "
+                        f"(+{(after / before - 1) * 100:.1f}%)"
+                    )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", default=["1", "10", "100"],
+                        help="student multipliers, optionally STUDENTS:CATALOG (e.g. 1000:10)")
+    parser.add_argument("--samples", type=int, default=100, help="timed calls per recommendation/browse operation")
+    parser.add_argument("--build-repeats", type=int, default=3, help="timed full dataset builds per scale")
+    parser.add_argument("--pdf-samples", type=int, default=20, help="timed PDF renders per scale")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--workdir", default=str(Path(tempfile.gettempdir()) / "mac-benchmark"),
+                        help="where generated datasets are cached between runs")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.20, help="allowed slowdown before flagging (0.20 = 20%%)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(Path(args.worker), args.samples, args.build_repeats, args.pdf_samples, args.seed)
+        print(json.dumps(result))
+        return 0
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "scales": [],
+    }
+    for spec in args.scales:
+        print(f"Benchmarking scale {spec}...", file=sys.stderr)
+        report["scales"].append(run_scale(args, spec))
+
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(encoded + "\n", encoding="utf-8")
+        print(f"Wrote benchmark report to {args.output}", file=sys.stderr)
+    else:
+        print(encoded)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("No regressions against baseline.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
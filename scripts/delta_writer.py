@@ -0,0 +1,312 @@
+"""
+Idempotent, append-only delta writer for the synthetic CSV tables.
+
+Appending rows writes only the new rows instead of re-reading and
+rewriting the whole file. A fixed-size sidecar index
+(``<table>.csv.index.json``) holds the committed CSV size, the largest
+numeric ID and the delta sequence number. The natural keys already present
+live in an append-only ``<table>.csv.keys`` file (one JSON string per line),
+which is read once when the writer opens, so duplicate rows are rejected
+without rescanning the CSV. Every accepted batch is also written as a
+standalone delta file under ``data/synthetic/deltas/``.
+
+Appends are journaled. The sidecar is first marked ``pending`` with the
+pre-append CSV and keys sizes and the delta file about to be written. The
+delta file, CSV rows and keys are then written and fsync'd, and finally the
+sidecar is committed with the new sizes and sequence number. If a crash
+interrupts the append, the next run truncates the CSV and keys file back to
+their committed sizes and deletes the uncommitted delta file.
+
+Opening a writer and each append hold an exclusive ``flock`` on
+``<table>.csv.lock``, and an append first re-reads the sidecar if another
+run committed since, so concurrent updater runs queue up instead of
+interleaving their writes. The lock is advisory and POSIX-only; on
+platforms without ``fcntl`` runs must not overlap.
+
+The web app does not read delta files. It sees appended rows in the CSVs
+when it next builds the dataset (on restart); ``iter_deltas`` is for
+external consumers that want only the new rows.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data" / "synthetic"
+DELTA_DIR = DATA_DIR / "deltas"
+KEY_SEPARATOR = "\x1f"
+
+
+@dataclass
+class DeltaResult:
+    appended: List[Dict[str, str]]
+    skipped: int
+    delta_path: Optional[Path]
+
+
+def _fsync_append(path: Path, offset: int, data: bytes) -> None:
+    """Write ``data`` at ``offset``, dropping anything after it."""
+    with path.open("r+b") as handle:
+        handle.seek(offset)
+        handle.write(data)
+        handle.truncate()
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def _fsync_truncate(path: Path, size: int) -> None:
+    with path.open("r+b") as handle:
+        handle.truncate(size)
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def _fsync_write(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("wb") as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+    directory_fd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(directory_fd)
+    finally:
+        os.close(directory_fd)
+
+
+class DeltaWriter:
+    def __init__(
+        self,
+        csv_path: Path,
+        key_fields: Sequence[str],
+        id_field: Optional[str] = None,
+        id_prefix: str = "",
+        id_width: int = 5,
+        delta_dir: Path = DELTA_DIR,
+    ) -> None:
+        self.csv_path = csv_path
+        self.key_fields = tuple(key_fields)
+        self.id_field = id_field
+        self.id_prefix = id_prefix
+        self.id_width = id_width
+        self.delta_dir = delta_dir
+        self.index_path = csv_path.with_name(csv_path.name + ".index.json")
+        self.keys_path = csv_path.with_name(csv_path.name + ".keys")
+        self.lock_path = csv_path.with_name(csv_path.name + ".lock")
+        self._keys: Set[str] = set()
+        with self._locked():
+            self._index = self._load_index()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the table's exclusive lock; blocks while another run is appending."""
+        if fcntl is None:
+            yield
+            return
+        with self.lock_path.open("a") as handle:
+            # Released when the handle closes
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def _read_index(self) -> Optional[Dict[str, object]]:
+        if not self.index_path.exists():
+            return None
+        try:
+            return json.loads(self.index_path.read_text(encoding="utf-8"))
+        except ValueError:
+            return None
+
+    def _row_key(self, row: Dict[str, object]) -> str:
+        return KEY_SEPARATOR.join(str(row.get(field, "")) for field in self.key_fields)
+
+    def _parse_id(self, value: str) -> int:
+        digits = value[len(self.id_prefix):] if value.startswith(self.id_prefix) else value
+        try:
+            return int(digits)
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def _encode_keys(keys: Iterable[str]) -> bytes:
+        return "".join(json.dumps(key) + "\n" for key in keys).encode("utf-8")
+
+    def _read_keys(self, size: int) -> Optional[Set[str]]:
+        """Keys in the first ``size`` bytes of the keys file, or ``None`` if it is missing or short."""
+        if not self.keys_path.exists() or self.keys_path.stat().st_size < size:
+            return None
+        with self.keys_path.open("rb") as handle:
+            data = handle.read(size)
+        return {json.loads(line) for line in data.splitlines() if line}
+
+    def _scan(self) -> Dict[str, object]:
+        """Rebuild the index and keys file from the CSV; only needed once or after external edits."""
+        keys: Set[str] = set()
+        max_id = 0
+        with self.csv_path.open("r", newline="", encoding="utf-8-sig") as handle:
+            reader = csv.DictReader(handle)
+            fieldnames = list(reader.fieldnames or [])
+            for row in reader:
+                keys.add(self._row_key(row))
+                if self.id_field:
+                    max_id = max(max_id, self._parse_id(row.get(self.id_field, "")))
+        encoded = self._encode_keys(sorted(keys))
+        _fsync_write(self.keys_path, encoded)
+        self._keys = keys
+        return {
+            "fieldnames": fieldnames,
+            "key_fields": list(self.key_fields),
+            "size": self.csv_path.stat().st_size,
+            "keys_size": len(encoded),
+            "max_id": max_id,
+            "delta_seq": 0,
+            "pending": None,
+        }
+
+    def _load_index(self) -> Dict[str, object]:
+        index = self._read_index()
+        if index is not None and index.get("pending"):
+            self._rollback(index)
+
+        previous_seq = index.get("delta_seq", 0) if index else 0
+        if index is not None and (index.get("key_fields") != list(self.key_fields) or "keys_size" not in index):
+            index = None
+
+        keys = None
+        if index is not None and index.get("size") == self.csv_path.stat().st_size:
+            keys = self._read_keys(int(index["keys_size"]))
+        if keys is None:
+            index = self._scan()
+            index["delta_seq"] = previous_seq
+            self._write_index(index)
+        else:
+            self._keys = keys
+        return index
+
+    def _rollback(self, index: Dict[str, object]) -> None:
+        """Undo an append that never committed."""
+        pending = index["pending"]
+        _fsync_truncate(self.csv_path, pending["size"])
+        keys_size = pending.get("keys_size")
+        if keys_size is not None and self.keys_path.exists() and self.keys_path.stat().st_size > keys_size:
+            _fsync_truncate(self.keys_path, keys_size)
+        if pending.get("delta_path"):
+            Path(pending["delta_path"]).unlink(missing_ok=True)
+        index["pending"] = None
+        self._write_index(index)
+
+    def _write_index(self, index: Dict[str, object]) -> None:
+        _fsync_write(self.index_path, json.dumps(index).encode("utf-8"))
+
+    @property
+    def max_id(self) -> int:
+        return int(self._index["max_id"])
+
+    @property
+    def delta_seq(self) -> int:
+        return int(self._index["delta_seq"])
+
+    def contains(self, row: Dict[str, object]) -> bool:
+        return self._row_key(row) in self._keys
+
+    def append(self, rows: Iterable[Dict[str, object]]) -> DeltaResult:
+        """Append rows whose key is new; assign IDs when ``id_field`` is set."""
+        with self._locked():
+            if self._read_index() != self._index:
+                # Another run appended since this writer last looked
+                self._index = self._load_index()
+            return self._append_locked(rows)
+
+    def _append_locked(self, rows: Iterable[Dict[str, object]]) -> DeltaResult:
+        index = self._index
+        fieldnames: List[str] = list(index["fieldnames"])
+        key_set = self._keys
+        next_id = int(index["max_id"]) + 1
+
+        accepted: List[Dict[str, str]] = []
+        batch_keys: Set[str] = set()
+        skipped = 0
+        for row in rows:
+            key = self._row_key(row)
+            if key in key_set or key in batch_keys:
+                skipped += 1
+                continue
+            batch_keys.add(key)
+            record = {field: "" if row.get(field) is None else str(row.get(field)) for field in fieldnames}
+            if self.id_field:
+                record[self.id_field] = f"{self.id_prefix}{next_id:0{self.id_width}d}"
+                next_id += 1
+            accepted.append(record)
+
+        if not accepted:
+            return DeltaResult(appended=[], skipped=skipped, delta_path=None)
+
+        body = io.StringIO()
+        csv.DictWriter(body, fieldnames=fieldnames).writerows(accepted)
+        payload = body.getvalue().encode("utf-8")
+        new_keys = self._encode_keys(sorted(batch_keys))
+        seq = int(index["delta_seq"]) + 1
+        delta_path = self.delta_dir / f"{self.csv_path.stem}-{seq:06d}.csv"
+        committed_size = int(index["size"])
+        keys_size = int(index["keys_size"])
+
+        # 1. Journal the pre-append sizes and the delta file about to be written
+        index["pending"] = {"size": committed_size, "keys_size": keys_size, "delta_path": str(delta_path)}
+        self._write_index(index)
+
+        # 2. Standalone delta file, 3. CSV rows, 4. keys
+        self.delta_dir.mkdir(parents=True, exist_ok=True)
+        header = io.StringIO()
+        csv.DictWriter(header, fieldnames=fieldnames).writeheader()
+        _fsync_write(delta_path, header.getvalue().encode("utf-8") + payload)
+
+        if committed_size:
+            with self.csv_path.open("rb") as handle:
+                handle.seek(committed_size - 1)
+                if handle.read(1) != b"\n":
+                    payload = b"\r\n" + payload
+        _fsync_append(self.csv_path, committed_size, payload)
+        _fsync_append(self.keys_path, keys_size, new_keys)
+
+        # 5. Commit
+        key_set.update(batch_keys)
+        index["max_id"] = next_id - 1
+        index["size"] = committed_size + len(payload)
+        index["keys_size"] = keys_size + len(new_keys)
+        index["delta_seq"] = seq
+        index["pending"] = None
+        self._write_index(index)
+        return DeltaResult(appended=accepted, skipped=skipped, delta_path=delta_path)
+
+
+def iter_csv(path: Path) -> Iterable[Dict[str, str]]:
+    """Stream rows without materializing the whole table."""
+    with path.open("r", newline="", encoding="utf-8-sig") as handle:
+        yield from csv.DictReader(handle)
+
+
+def split_csv_arg(values: Optional[Sequence[str]]) -> Tuple[str, ...]:
+    return tuple(item.strip() for value in values or [] for item in value.split(",") if item.strip())
+
+
+def iter_deltas(table: str, after_seq: int = 0, delta_dir: Path = DELTA_DIR) -> Iterable[Tuple[int, Dict[str, str]]]:
+    """Yield ``(seq, row)`` from delta files newer than ``after_seq``, oldest first."""
+    if not delta_dir.exists():
+        return
+    for path in sorted(delta_dir.glob(f"{table}-*.csv")):
+        seq = int(path.stem.rsplit("-", 1)[1])
+        if seq > after_seq:
+            for row in iter_csv(path):
+                yield seq, row
@@ -0,0 +1,246 @@
+"""
+Offline leave-one-out evaluation of the recommender.
+
+For every student, the most recent completed enrollment (by ``term_code``)
+is hidden, the remaining history is scored, and the hidden course is looked
+up in the top K. History mode scores the truncated history; interest mode
+scores the student's stored interest tags with the student left out of the
+collaborative peers. Hit rate, precision, recall and NDCG are reported at
+each K. ``--holdout term`` hides every completion from the student's latest
+term instead of a single course.
+
+The dataset is built once in the parent and frozen out of the GC, then a
+forked process pool scores student chunks against that one read-only copy.
+
+Examples:
+    python scripts/evaluate_recommender.py --k 5 10 --output eval.json
+    python scripts/evaluate_recommender.py --data-dir /tmp/mac-large --workers 8 --limit 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Sequence, Set, Tuple
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+MODES = ("history", "interests")
+METRIC_NAMES = ("hit_rate", "precision", "recall", "ndcg")
+
+# Set in the parent before the pool forks so workers inherit them
+_HOLDOUTS: Dict[str, Set[str]] = {}
+_OPTIONS: Dict[str, object] = {}
+
+
+def build_holdouts(enrollments: Sequence[Dict[str, str]], whole_term: bool) -> Dict[str, Set[str]]:
+    """Held-out courses per student: the latest completion, or all of the latest term's.
+
+    Ties within a term go to the later ``enrollments.csv`` row.
+    """
+    from app.terms import term_sort_key
+
+    latest: Dict[str, Tuple[Tuple[str, int], int]] = {}
+    completions: Dict[str, List[Tuple[Tuple[str, int], int, str]]] = {}
+    for row_number, row in enumerate(enrollments):
+        if row.get("completion_status") != "completed":
+            continue
+        student_id = row["student_id"]
+        key = (term_sort_key(row.get("term_code", "")), row_number)
+        completions.setdefault(student_id, []).append((key[0], row_number, row["course_id"]))
+        if student_id not in latest or key > latest[student_id]:
+            latest[student_id] = key
+
+    holdouts: Dict[str, Set[str]] = {}
+    for student_id, rows in completions.items():
+        last_term, last_row = latest[student_id]
+        if whole_term:
+            holdouts[student_id] = {course_id for term, _, course_id in rows if term == last_term}
+        else:
+            holdouts[student_id] = {course_id for _, row_number, course_id in rows if row_number == last_row}
+    return holdouts
+
+
+def rank_metrics(ranked: Sequence[str], relevant: Set[str], k_values: Sequence[int]) -> Dict[int, Tuple[float, ...]]:
+    """``(hit, precision, recall, ndcg)`` of ``ranked`` against ``relevant`` at each K."""
+    results: Dict[int, Tuple[float, ...]] = {}
+    for k in k_values:
+        gains = [1.0 / math.log2(rank + 2) for rank, course_id in enumerate(ranked[:k]) if course_id in relevant]
+        ideal = sum(1.0 / math.log2(rank + 2) for rank in range(min(len(relevant), k)))
+        hits = len(gains)
+        results[k] = (
+            1.0 if hits else 0.0,
+            hits / k,
+            hits / len(relevant),
+            sum(gains) / ideal if ideal else 0.0,
+        )
+    return results
+
+
+def _empty_totals(k_values: Sequence[int]) -> Dict[str, object]:
+    return {"evaluated": 0, "skipped": 0, "sums": {k: [0.0] * len(METRIC_NAMES) for k in k_values}}
+
+
+def _add(totals: Dict[str, object], metrics: Dict[int, Tuple[float, ...]]) -> None:
+    totals["evaluated"] += 1
+    for k, values in metrics.items():
+        sums = totals["sums"][k]
+        for pos, value in enumerate(values):
+            sums[pos] += value
+
+
+def evaluate_chunk(student_ids: Sequence[str]) -> Dict[str, Dict[str, object]]:
+    from app.data_loader import get_dataset
+    from app.recommender import recommend_for_interests, recommend_for_student
+
+    dataset = get_dataset()
+    k_values: Sequence[int] = _OPTIONS["k"]
+    modes: Sequence[str] = _OPTIONS["modes"]
+    top_n = max(k_values)
+    totals = {mode: _empty_totals(k_values) for mode in modes}
+
+    for student_id in student_ids:
+        hidden = _HOLDOUTS.get(student_id, set())
+        completed = dataset.student_completed_courses.get(student_id, set())
+        history = set(completed) - hidden
+        # A course retaken earlier stays in the history and can never be recommended
+        relevant = hidden - history
+
+        if "history" in modes:
+            if not relevant or not history:
+                totals["history"]["skipped"] += 1
+            else:
+                recommendations = recommend_for_student(
+                    student_id, top_n=top_n, dataset=dataset, completed_courses=history
+                )
+                ranked = [str(item["course_id"]) for item in recommendations]
+                _add(totals["history"], rank_metrics(ranked, relevant, k_values))
+
+        if "interests" in modes:
+            tags = dataset.student_interest_tags.get(student_id, set())
+            if not relevant or not tags:
+                totals["interests"]["skipped"] += 1
+            else:
+                recommendations = recommend_for_interests(
+                    sorted(tags), top_n=top_n + len(history), dataset=dataset, exclude_student=student_id
+                )
+                ranked = [
+                    str(item["course_id"]) for item in recommendations if item["course_id"] not in history
+                ][:top_n]
+                _add(totals["interests"], rank_metrics(ranked, relevant, k_values))
+    return totals
+
+
+def _merge(into: Dict[str, Dict[str, object]], chunk: Dict[str, Dict[str, object]]) -> None:
+    for mode, totals in chunk.items():
+        target = into[mode]
+        target["evaluated"] += totals["evaluated"]
+        target["skipped"] += totals["skipped"]
+        for k, sums in totals["sums"].items():
+            target["sums"][k] = [a + b for a, b in zip(target["sums"][k], sums)]
+
+
+def _summary(totals: Dict[str, object]) -> Dict[str, object]:
+    evaluated = totals["evaluated"]
+    return {
+        "evaluated": evaluated,
+        "skipped": totals["skipped"],
+        "metrics": {
+            str(k): {
+                name: round(value / evaluated, 6) if evaluated else None
+                for name, value in zip(METRIC_NAMES, sums)
+            }
+            for k, sums in totals["sums"].items()
+        },
+    }
+
+
+def evaluate(
+    student_ids: Sequence[str],
+    k_values: Sequence[int],
+    modes: Sequence[str],
+    workers: int,
+    chunk_size: int,
+) -> Dict[str, Dict[str, object]]:
+    _OPTIONS.update(k=tuple(k_values), modes=tuple(modes))
+    totals = {mode: _empty_totals(k_values) for mode in modes}
+    chunks = [student_ids[pos:pos + chunk_size] for pos in range(0, len(student_ids), chunk_size)]
+    if workers <= 1:
+        for chunk in chunks:
+            _merge(totals, evaluate_chunk(chunk))
+        return totals
+
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for result in pool.map(evaluate_chunk, chunks):
+            _merge(totals, result)
+    return totals
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, nargs="+", default=[5, 10], help="cutoffs to report metrics at")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--holdout", choices=("course", "term"), default="course",
+                        help="hide the latest completed course, or every completion in the latest term")
+    parser.add_argument("--data-dir", help="dataset directory (defaults to MAC_DATA_DIR or data/synthetic)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (1 = in-process)")
+    parser.add_argument("--chunk-size", type=int, default=200, help="students per pool task")
+    parser.add_argument("--limit", type=int, help="evaluate only the first N students")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    if any(k <= 0 for k in args.k):
+        parser.error("--k values must be positive")
+    if args.data_dir:
+        os.environ["MAC_DATA_DIR"] = str(Path(args.data_dir).resolve())
+    # Flat SharedIndex arrays keep refcount writes off the pages the workers inherit
+    os.environ.setdefault("MAC_SHARED_DATASET", "1")
+    sys.path.insert(0, str(BASE_DIR))
+    from app.data_loader import preload_dataset
+
+    started = time.perf_counter()
+    dataset = preload_dataset()
+    _HOLDOUTS.update(build_holdouts(dataset.enrollments, whole_term=args.holdout == "term"))
+    student_ids = list(dataset.students)[:args.limit] if args.limit else list(dataset.students)
+    load_seconds = time.perf_counter() - started
+
+    print(f"Evaluating {len(student_ids)} students with {args.workers} worker(s)...", file=sys.stderr)
+    started = time.perf_counter()
+    totals = evaluate(
+        student_ids, sorted(set(args.k)), args.modes, max(1, args.workers), max(1, args.chunk_size)
+    )
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "data_dir": str(dataset.data_dir),
+        "dataset_version": dataset.version,
+        "holdout": args.holdout,
+        "k": sorted(set(args.k)),
+        "students": len(student_ids),
+        "workers": max(1, args.workers),
+        "load_seconds": round(load_seconds, 3),
+        "evaluate_seconds": round(elapsed, 3),
+        "modes": {mode: _summary(totals[mode]) for mode in args.modes},
+    }
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(encoded + "\n", encoding="utf-8")
+        print(f"Wrote evaluation report to {args.output}", file=sys.stderr)
+    else:
+        print(encoded)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,23 +3,81 @@ Synthetic dataset generator for the University of Windsor MAC program.
 
 The script materializes the CSV files described in `docs/data_schema.md`.
 It purposely avoids external dependencies to keep execution portable.
+
+Students are generated in fixed-size shards, each with its own RNG derived
+from ``--seed`` and the shard number, so the output is identical no matter
+how many ``--workers`` run the shards. Rows are streamed straight to CSV
+writers, keeping memory flat for multi-million-row enrollment tables.
+
+Examples:
+    python scripts/generate_mac_synthetic_data.py
+    python scripts/generate_mac_synthetic_data.py --students 120000 --catalog-scale 10 \\
+        --output-dir /tmp/mac-large --workers 8
 """
 
 from __future__ import annotations
 
+import argparse
 import csv
+import os
 import random
+import tempfile
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_DIR = BASE_DIR / "data" / "synthetic"
-RNG = random.Random(8760)
-
-
-def ensure_data_dir() -> None:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
+DEFAULT_SEED = 8760
+DEFAULT_STUDENTS = 120
+DEFAULT_SHARD_SIZE = 5000
+
+STUDENT_FIELDS = [
+    "student_id",
+    "admit_term",
+    "program_stream",
+    "undergrad_major",
+    "gpa_entry",
+    "co_op_status",
+    "demographic_group",
+    "citizenship_status",
+    "interests",
+    "learning_style",
+    "work_experience_years",
+]
+ENROLLMENT_FIELDS = [
+    "enrollment_id",
+    "student_id",
+    "course_id",
+    "term_code",
+    "grade_point",
+    "grade_letter",
+    "completion_status",
+    "feedback_rating",
+    "hours_per_week",
+    "engagement_score",
+]
+PERFORMANCE_FIELDS = [
+    "student_id",
+    "cumulative_gpa",
+    "last_term_gpa",
+    "technical_strength",
+    "analytical_strength",
+    "communication_strength",
+    "risk_flag",
+]
+PREFERENCE_FIELDS = ["student_id", "preference_type", "preference_value", "weight", "source"]
+STUDENT_TABLES = (
+    ("students.csv", STUDENT_FIELDS),
+    ("enrollments.csv", ENROLLMENT_FIELDS),
+    ("student_performance.csv", PERFORMANCE_FIELDS),
+    ("student_preferences.csv", PREFERENCE_FIELDS),
+)
+
+
+def ensure_data_dir(output_dir: Path = DATA_DIR) -> None:
+    output_dir.mkdir(parents=True, exist_ok=True)
 
 
 def join_tags(values: Iterable[str]) -> str:
@@ -27,7 +85,11 @@ def join_tags(values: Iterable[str]) -> str:
     return "|".join(sorted(set(cleaned)))
 
 
-def build_courses() -> List[Dict[str, str]]:
+def replica_course_id(course_id: str, replica: int) -> str:
+    return course_id if replica == 0 else f"{course_id}-R{replica}"
+
+
+def build_base_courses() -> List[Dict[str, str]]:
     courses: List[Dict[str, str]] = [
         {
             "course_id": "MAC-COMP-8110",
@@ -240,7 +302,26 @@ def build_courses() -> List[Dict[str, str]]:
     return courses
 
 
-def build_course_offerings(courses: List[Dict[str, str]]) -> List[Dict[str, str]]:
+def build_courses(catalog_scale: int = 1) -> List[Dict[str, str]]:
+    """Base catalogue, cloned ``catalog_scale`` times with ``-R<n>`` suffixed IDs."""
+    base_courses = build_base_courses()
+    courses: List[Dict[str, str]] = []
+    for replica in range(max(1, catalog_scale)):
+        for course in base_courses:
+            clone = dict(course)
+            if replica:
+                clone["course_id"] = replica_course_id(course["course_id"], replica)
+                clone["course_code"] = f"{course['course_code']}-R{replica}"
+                clone["prerequisites"] = join_tags(
+                    replica_course_id(prereq, replica)
+                    for prereq in course["prerequisites"].split("|")
+                    if prereq
+                )
+            courses.append(clone)
+    return courses
+
+
+def build_course_offerings(courses: List[Dict[str, str]], rng: random.Random) -> List[Dict[str, str]]:
     term_sequence = [
         ("2024F", {"Mon|Wed": ("10:00", "11:20"), "Tue|Thu": ("14:30", "15:50")}),
         ("2025W", {"Mon|Wed": ("13:00", "14:20"), "Tue|Thu": ("09:00", "10:20")}),
@@ -253,19 +334,19 @@ def build_course_offerings(courses: List[Dict[str, str]]) -> List[Dict[str, str]
     offerings: List[Dict[str, str]] = []
     for course in courses:
         meetings = list(term_sequence)
-        RNG.shuffle(meetings)
+        rng.shuffle(meetings)
         for term_code, slot_options in meetings[:3]:
-            meeting_days, (start_time, end_time) = random.choice(list(slot_options.items()))
+            meeting_days, (start_time, end_time) = rng.choice(list(slot_options.items()))
             offerings.append(
                 {
                     "offering_id": f"{term_code}-{course['course_code']}-A",
                     "course_id": course["course_id"],
                     "term_code": term_code,
-                    "instructor": f"Faculty-{RNG.randint(1, 20)}",
+                    "instructor": f"Faculty-{rng.randint(1, 20)}",
                     "meeting_days": meeting_days,
                     "start_time": start_time,
                     "end_time": end_time,
-                    "location": random.choice(rooms),
+                    "location": rng.choice(rooms),
                     "delivery_mode": course["delivery_mode"],
                 }
             )
@@ -311,7 +392,7 @@ def build_degree_requirements(courses: List[Dict[str, str]]) -> List[Dict[str, s
             "category": "project",
             "credit_min": "6.0",
             "credit_max": "6.0",
-            "eligible_courses": "MAC-COMP-8890",
+            "eligible_courses": join_tags(course_ids_by_category["project"]),
             "notes": "Prerequisites must be satisfied before enrolling.",
         },
         {
@@ -327,9 +408,9 @@ def build_degree_requirements(courses: List[Dict[str, str]]) -> List[Dict[str, s
     return requirements
 
 
-def random_choice_weighted(choices: List[Tuple[str, float]]) -> str:
+def random_choice_weighted(choices: List[Tuple[str, float]], rng: random.Random) -> str:
     total = sum(weight for _, weight in choices)
-    r = RNG.random() * total
+    r = rng.random() * total
     upto = 0.0
     for value, weight in choices:
         upto += weight
@@ -338,7 +419,7 @@ def random_choice_weighted(choices: List[Tuple[str, float]]) -> str:
     return choices[-1][0]
 
 
-def build_student_population(n_students: int = 120) -> List[Dict[str, str]]:
+def build_student(idx: int, rng: random.Random) -> Dict[str, str]:
     admit_terms = ["2024F", "2025W", "2025F"]
     majors = [
         "Computer Science",
@@ -362,37 +443,32 @@ def build_student_population(n_students: int = 120) -> List[Dict[str, str]]:
     citizenship_choices = [("domestic", 0.35), ("international", 0.65)]
     demographic_clusters = ["Group-A", "Group-B", "Group-C", "Group-D"]
 
-    students: List[Dict[str, str]] = []
-    for idx in range(1, n_students + 1):
-        student_id = f"STU-{idx:04d}"
-        admit_term = random.choice(admit_terms)
-        program_stream = "MAC-AI" if RNG.random() < 0.35 else "MAC-General"
-        undergrad_major = random.choice(majors)
-        gpa_entry = round(RNG.normalvariate(3.25, 0.25), 2)
-        gpa_entry = max(2.7, min(gpa_entry, 3.9))
-        co_op_status = random.choice(["seeking", "placed", "not-applicable"])
-        demographic_group = random.choice(demographic_clusters)
-        citizenship_status = random_choice_weighted(citizenship_choices)
-        interests = RNG.sample(interests_pool, k=random.randint(2, 4))
-        learning_style = random.choice(learning_styles)
-        work_exp = max(0.0, round(random.random() * 8, 1))
-
-        students.append(
-            {
-                "student_id": student_id,
-                "admit_term": admit_term,
-                "program_stream": program_stream,
-                "undergrad_major": undergrad_major,
-                "gpa_entry": f"{gpa_entry:.2f}",
-                "co_op_status": co_op_status,
-                "demographic_group": demographic_group,
-                "citizenship_status": citizenship_status,
-                "interests": join_tags(interests),
-                "learning_style": learning_style,
-                "work_experience_years": f"{work_exp:.1f}",
-            }
-        )
-    return students
+    student_id = f"STU-{idx:04d}"
+    admit_term = rng.choice(admit_terms)
+    program_stream = "MAC-AI" if rng.random() < 0.35 else "MAC-General"
+    undergrad_major = rng.choice(majors)
+    gpa_entry = round(rng.normalvariate(3.25, 0.25), 2)
+    gpa_entry = max(2.7, min(gpa_entry, 3.9))
+    co_op_status = rng.choice(["seeking", "placed", "not-applicable"])
+    demographic_group = rng.choice(demographic_clusters)
+    citizenship_status = random_choice_weighted(citizenship_choices, rng)
+    interests = rng.sample(interests_pool, k=rng.randint(2, 4))
+    learning_style = rng.choice(learning_styles)
+    work_exp = max(0.0, round(rng.random() * 8, 1))
+
+    return {
+        "student_id": student_id,
+        "admit_term": admit_term,
+        "program_stream": program_stream,
+        "undergrad_major": undergrad_major,
+        "gpa_entry": f"{gpa_entry:.2f}",
+        "co_op_status": co_op_status,
+        "demographic_group": demographic_group,
+        "citizenship_status": citizenship_status,
+        "interests": join_tags(interests),
+        "learning_style": learning_style,
+        "work_experience_years": f"{work_exp:.1f}",
+    }
 
 
 def next_term(term_code: str) -> str:
@@ -419,6 +495,8 @@ def choose_courses_for_term(
     completed_course_ids: set,
     all_courses: Dict[str, Dict[str, str]],
     term_idx: int,
+    rng: random.Random,
+    replica: int = 0,
 ) -> List[str]:
     """Assign 3–4 courses per term following basic prerequisite logic."""
     required_core = [
@@ -440,12 +518,15 @@ def choose_courses_for_term(
         "MAC-COMP-8780",
         "MAC-COMP-8830",
     ]
+    required_core = [replica_course_id(c, replica) for c in required_core]
+    business_courses = [replica_course_id(c, replica) for c in business_courses]
+    technical_electives = [replica_course_id(c, replica) for c in technical_electives]
     course_load = 4 if term_idx < 2 else 3
     planned: List[str] = []
 
     # Prioritize outstanding core courses.
     outstanding_core = [c for c in required_core if c not in completed_course_ids]
-    RNG.shuffle(outstanding_core)
+    rng.shuffle(outstanding_core)
     while outstanding_core and len(planned) < course_load:
         candidate = outstanding_core.pop()
         prereqs = all_courses[candidate]["prerequisites"].split("|") if all_courses[candidate]["prerequisites"] else []
@@ -455,17 +536,14 @@ def choose_courses_for_term(
     # Add business courses after first term.
     if len(planned) < course_load and term_idx >= 1:
         available_business = [c for c in business_courses if c not in completed_course_ids and c not in planned]
-        RNG.shuffle(available_business)
+        rng.shuffle(available_business)
         while available_business and len(planned) < course_load:
             planned.append(available_business.pop())
 
     # Technical electives for AI stream or later terms.
     if len(planned) < course_load:
         available_tech = [c for c in technical_electives if c not in planned]
-        if program_stream == "MAC-AI":
-            RNG.shuffle(available_tech)
-        else:
-            RNG.shuffle(available_tech)
+        rng.shuffle(available_tech)
         while available_tech and len(planned) < course_load:
             candidate = available_tech.pop()
             prereqs = all_courses[candidate]["prerequisites"].split("|") if all_courses[candidate]["prerequisites"] else []
@@ -499,47 +577,46 @@ def grade_from_point(point: float) -> str:
     return "F"
 
 
-def build_enrollments(
-    students: List[Dict[str, str]], courses: List[Dict[str, str]]
-) -> Tuple[List[Dict[str, str]], Dict[str, List[Dict[str, str]]]]:
-    course_map = {course["course_id"]: course for course in courses}
+def build_student_enrollments(
+    student: Dict[str, str],
+    course_map: Dict[str, Dict[str, str]],
+    rng: random.Random,
+    replica: int = 0,
+) -> List[Dict[str, str]]:
+    """One student's enrollment history; ``enrollment_id`` is assigned when shards are merged."""
+    project_id = replica_course_id("MAC-COMP-8890", replica)
     enrollments: List[Dict[str, str]] = []
-    enrollments_by_student: Dict[str, List[Dict[str, str]]] = defaultdict(list)
-    enrollment_counter = 1
-
-    for student in students:
-        start_term = student["admit_term"]
-        num_terms = random.randint(2, 4)
-        terms = build_term_sequence(start_term, num_terms)
-        completed_courses: set = set()
-        for term_idx, term_code in enumerate(terms):
-            planned_courses = choose_courses_for_term(
-                student["program_stream"], completed_courses, course_map, term_idx
-            )
-            if term_idx == len(terms) - 1 and "MAC-COMP-8890" not in completed_courses:
-                # Reserve project for final term if prerequisites mostly met.
-                if "MAC-COMP-8890" not in planned_courses and len(planned_courses) < 4:
-                    planned_courses.append("MAC-COMP-8890")
-
-            for course_id in planned_courses:
-                course = course_map[course_id]
-                completion_status = "completed"
-                grade_point = random.gauss(3.3, 0.4)
-                if term_idx == len(terms) - 1 and RNG.random() < 0.45:
-                    completion_status = "in-progress"
-                    grade_point = None
-                elif RNG.random() < 0.05:
-                    completion_status = "withdrawn"
-                    grade_point = None
-
-                grade_point_str = "" if grade_point is None else f"{max(1.0, min(4.0, grade_point)):.2f}"
-                grade_letter = "" if grade_point is None else grade_from_point(float(grade_point_str))
-                feedback_rating = "" if completion_status != "completed" else str(random.randint(3, 5))
-                hours_per_week = random.uniform(6, 14)
-                engagement_score = random.uniform(0.45, 0.95)
-
-                enrollment = {
-                    "enrollment_id": f"ENR-{enrollment_counter:05d}",
+    num_terms = rng.randint(2, 4)
+    terms = build_term_sequence(student["admit_term"], num_terms)
+    completed_courses: set = set()
+    for term_idx, term_code in enumerate(terms):
+        planned_courses = choose_courses_for_term(
+            student["program_stream"], completed_courses, course_map, term_idx, rng, replica
+        )
+        if term_idx == len(terms) - 1 and project_id not in completed_courses:
+            # Reserve project for final term if prerequisites mostly met.
+            if project_id not in planned_courses and len(planned_courses) < 4:
+                planned_courses.append(project_id)
+
+        for course_id in planned_courses:
+            completion_status = "completed"
+            grade_point = rng.gauss(3.3, 0.4)
+            if term_idx == len(terms) - 1 and rng.random() < 0.45:
+                completion_status = "in-progress"
+                grade_point = None
+            elif rng.random() < 0.05:
+                completion_status = "withdrawn"
+                grade_point = None
+
+            grade_point_str = "" if grade_point is None else f"{max(1.0, min(4.0, grade_point)):.2f}"
+            grade_letter = "" if grade_point is None else grade_from_point(float(grade_point_str))
+            feedback_rating = "" if completion_status != "completed" else str(rng.randint(3, 5))
+            hours_per_week = rng.uniform(6, 14)
+            engagement_score = rng.uniform(0.45, 0.95)
+
+            enrollments.append(
+                {
+                    "enrollment_id": "",
                     "student_id": student["student_id"],
                     "course_id": course_id,
                     "term_code": term_code,
@@ -550,14 +627,12 @@ def build_enrollments(
                     "hours_per_week": f"{hours_per_week:.1f}",
                     "engagement_score": f"{engagement_score:.2f}",
                 }
-                enrollments.append(enrollment)
-                enrollments_by_student[student["student_id"]].append(enrollment)
-                enrollment_counter += 1
+            )
 
-                if completion_status == "completed":
-                    completed_courses.add(course_id)
+            if completion_status == "completed":
+                completed_courses.add(course_id)
 
-    return enrollments, enrollments_by_student
+    return enrollments
 
 
 def term_sort_key(term_code: str) -> Tuple[int, int]:
@@ -565,92 +640,84 @@ def term_sort_key(term_code: str) -> Tuple[int, int]:
     return int(term_code[:4]), season_rank.get(term_code[4], 0)
 
 
-def compute_performance_profiles(
-    students: List[Dict[str, str]],
-    enrollments_by_student: Dict[str, List[Dict[str, str]]],
-    courses: List[Dict[str, str]],
-) -> List[Dict[str, str]]:
-    course_lookup = {course["course_id"]: course for course in courses}
-    results: List[Dict[str, str]] = []
-
-    for student in students:
-        student_id = student["student_id"]
-        interactions = enrollments_by_student.get(student_id, [])
-        completed = [
-            enr
-            for enr in interactions
-            if enr["completion_status"] == "completed" and enr["grade_point"]
-        ]
-
-        if completed:
-            cumulative = sum(float(enr["grade_point"]) for enr in completed) / len(completed)
-            # Determine last term GPA
-            completed.sort(key=lambda e: term_sort_key(e["term_code"]))
-            last_term = completed[-1]["term_code"]
-            last_term_grades = [
-                float(enr["grade_point"])
-                for enr in completed
-                if enr["term_code"] == last_term
-            ]
-            last_term_gpa = sum(last_term_grades) / len(last_term_grades)
-        else:
-            cumulative = student.get("gpa_entry", 3.0)
-            last_term_gpa = float(student.get("gpa_entry", 3.0))
-
-        def strength_metric(filter_fn) -> int:
-            relevant = [
-                float(enr["grade_point"])
-                for enr in completed
-                if filter_fn(course_lookup[enr["course_id"]])
-            ]
-            if not relevant:
-                relevant = [float(student.get("gpa_entry", 3.0))]
-            avg = sum(relevant) / len(relevant)
-            if avg >= 3.8:
-                return 5
-            if avg >= 3.5:
-                return 4
-            if avg >= 3.0:
-                return 3
-            if avg >= 2.5:
-                return 2
-            return 1
-
-        technical_strength = strength_metric(
-            lambda course: course["category"] in {"core", "technical-elective", "project"}
-        )
-        analytical_strength = strength_metric(
-            lambda course: "data-analytics" in course["skills"]
-            or "machine-learning" in course["skills"]
-        )
-        communication_strength = strength_metric(
-            lambda course: course["category"] == "business"
-            or "project-delivery" in course["skills"]
-        )
+def build_performance_profile(
+    student: Dict[str, str],
+    interactions: List[Dict[str, str]],
+    course_lookup: Dict[str, Dict[str, str]],
+) -> Dict[str, str]:
+    completed = [
+        enr
+        for enr in interactions
+        if enr["completion_status"] == "completed" and enr["grade_point"]
+    ]
 
-        drop = cumulative - last_term_gpa
-        risk_flag = "none"
-        if last_term_gpa < 2.7 or drop >= 0.6:
-            risk_flag = "performance-drop"
-        elif student["co_op_status"] == "seeking" and cumulative < 3.0:
-            risk_flag = "co-op-risk"
-
-        results.append(
-            {
-                "student_id": student_id,
-                "cumulative_gpa": f"{cumulative:.2f}",
-                "last_term_gpa": f"{last_term_gpa:.2f}",
-                "technical_strength": str(technical_strength),
-                "analytical_strength": str(analytical_strength),
-                "communication_strength": str(communication_strength),
-                "risk_flag": risk_flag,
-            }
-        )
-    return results
+    if completed:
+        cumulative = sum(float(enr["grade_point"]) for enr in completed) / len(completed)
+        # Determine last term GPA
+        completed.sort(key=lambda e: term_sort_key(e["term_code"]))
+        last_term = completed[-1]["term_code"]
+        last_term_grades = [
+            float(enr["grade_point"])
+            for enr in completed
+            if enr["term_code"] == last_term
+        ]
+        last_term_gpa = sum(last_term_grades) / len(last_term_grades)
+    else:
+        cumulative = float(student.get("gpa_entry", 3.0))
+        last_term_gpa = float(student.get("gpa_entry", 3.0))
+
+    def strength_metric(filter_fn) -> int:
+        relevant = [
+            float(enr["grade_point"])
+            for enr in completed
+            if filter_fn(course_lookup[enr["course_id"]])
+        ]
+        if not relevant:
+            relevant = [float(student.get("gpa_entry", 3.0))]
+        avg = sum(relevant) / len(relevant)
+        if avg >= 3.8:
+            return 5
+        if avg >= 3.5:
+            return 4
+        if avg >= 3.0:
+            return 3
+        if avg >= 2.5:
+            return 2
+        return 1
+
+    technical_strength = strength_metric(
+        lambda course: course["category"] in {"core", "technical-elective", "project"}
+    )
+    analytical_strength = strength_metric(
+        lambda course: "data-analytics" in course["skills"]
+        or "machine-learning" in course["skills"]
+    )
+    communication_strength = strength_metric(
+        lambda course: course["category"] == "business"
+        or "project-delivery" in course["skills"]
+    )
+
+    drop = cumulative - last_term_gpa
+    risk_flag = "none"
+    if last_term_gpa < 2.7 or drop >= 0.6:
+        risk_flag = "performance-drop"
+    elif student["co_op_status"] == "seeking" and cumulative < 3.0:
+        risk_flag = "co-op-risk"
+
+    return {
+        "student_id": student["student_id"],
+        "cumulative_gpa": f"{cumulative:.2f}",
+        "last_term_gpa": f"{last_term_gpa:.2f}",
+        "technical_strength": str(technical_strength),
+        "analytical_strength": str(analytical_strength),
+        "communication_strength": str(communication_strength),
+        "risk_flag": risk_flag,
+    }
 
 
 def build_student_preferences(
-    students: List[Dict[str, str]]
+    student: Dict[str, str],
+    rng: random.Random,
 ) -> List[Dict[str, str]]:
     career_options = [
         "ai-specialist",
@@ -670,47 +737,87 @@ def build_student_preferences(
         "leadership|communication",
     ]
 
-    preferences: List[Dict[str, str]] = []
-    for student in students:
-        student_id = student["student_id"]
-        career_goal = random.choice(career_options)
-        delivery = random.choice(delivery_pref)
-        time_pref = random.choice(time_of_day_options)
-        skill_focus = random.choice(skill_focus_options)
+    student_id = student["student_id"]
+    career_goal = rng.choice(career_options)
+    delivery = rng.choice(delivery_pref)
+    time_pref = rng.choice(time_of_day_options)
+    skill_focus = rng.choice(skill_focus_options)
 
-        preferences.extend(
-            [
-                {
-                    "student_id": student_id,
-                    "preference_type": "career_goal",
-                    "preference_value": career_goal,
-                    "weight": f"{random.uniform(0.6, 1.0):.2f}",
-                    "source": "survey",
-                },
-                {
-                    "student_id": student_id,
-                    "preference_type": "delivery_mode",
-                    "preference_value": delivery,
-                    "weight": f"{random.uniform(0.3, 0.8):.2f}",
-                    "source": "survey",
-                },
-                {
-                    "student_id": student_id,
-                    "preference_type": "time_of_day",
-                    "preference_value": time_pref,
-                    "weight": f"{random.uniform(0.2, 0.6):.2f}",
-                    "source": "survey",
-                },
-                {
-                    "student_id": student_id,
-                    "preference_type": "skills_to_build",
-                    "preference_value": skill_focus,
-                    "weight": f"{random.uniform(0.4, 0.9):.2f}",
-                    "source": "advisor_note",
-                },
-            ]
-        )
-    return preferences
+    return [
+        {
+            "student_id": student_id,
+            "preference_type": "career_goal",
+            "preference_value": career_goal,
+            "weight": f"{rng.uniform(0.6, 1.0):.2f}",
+            "source": "survey",
+        },
+        {
+            "student_id": student_id,
+            "preference_type": "delivery_mode",
+            "preference_value": delivery,
+            "weight": f"{rng.uniform(0.3, 0.8):.2f}",
+            "source": "survey",
+        },
+        {
+            "student_id": student_id,
+            "preference_type": "time_of_day",
+            "preference_value": time_pref,
+            "weight": f"{rng.uniform(0.2, 0.6):.2f}",
+            "source": "survey",
+        },
+        {
+            "student_id": student_id,
+            "preference_type": "skills_to_build",
+            "preference_value": skill_focus,
+            "weight": f"{rng.uniform(0.4, 0.9):.2f}",
+            "source": "advisor_note",
+        },
+    ]
+
+
+def shard_rng(seed: int, shard_index: int) -> random.Random:
+    # Independent, reproducible stream per shard regardless of worker count
+    return random.Random(f"{seed}:shard:{shard_index}")
+
+
+def generate_shard(
+    shard_index: int,
+    first_student: int,
+    n_students: int,
+    seed: int,
+    catalog_scale: int,
+    part_dir: str,
+) -> Dict[str, int]:
+    """Stream one shard of students and their rows into per-shard part files."""
+    rng = shard_rng(seed, shard_index)
+    course_map = {course["course_id"]: course for course in build_courses(catalog_scale)}
+    counts = {filename: 0 for filename, _ in STUDENT_TABLES}
+    handles = {
+        filename: (Path(part_dir) / f"{filename}.{shard_index:06d}").open("w", newline="", encoding="utf-8")
+        for filename, _ in STUDENT_TABLES
+    }
+    try:
+        writers = {
+            filename: csv.DictWriter(handles[filename], fieldnames=fields)
+            for filename, fields in STUDENT_TABLES
+        }
+        for idx in range(first_student, first_student + n_students):
+            student = build_student(idx, rng)
+            replica = rng.randrange(catalog_scale) if catalog_scale > 1 else 0
+            enrollments = build_student_enrollments(student, course_map, rng, replica)
+            rows_by_table = {
+                "students.csv": [student],
+                "enrollments.csv": enrollments,
+                "student_performance.csv": [build_performance_profile(student, enrollments, course_map)],
+                "student_preferences.csv": build_student_preferences(student, rng),
+            }
+            for filename, rows in rows_by_table.items():
+                writers[filename].writerows(rows)
+                counts[filename] += len(rows)
+    finally:
+        for handle in handles.values():
+            handle.close()
+    return counts
 
 
 def write_csv(path: Path, rows: List[Dict[str, str]]) -> None:
@@ -722,28 +829,83 @@ def write_csv(path: Path, rows: List[Dict[str, str]]) -> None:
         writer.writerows(rows)
 
 
-def main() -> None:
-    ensure_data_dir()
-
-    courses = build_courses()
-    course_offerings = build_course_offerings(courses)
-    degree_requirements = build_degree_requirements(courses)
-    students = build_student_population()
-    enrollments, enrollments_by_student = build_enrollments(students, courses)
-    performance = compute_performance_profiles(students, enrollments_by_student, courses)
-    preferences = build_student_preferences(students)
-
-    write_csv(DATA_DIR / "courses.csv", courses)
-    write_csv(DATA_DIR / "course_offerings.csv", course_offerings)
-    write_csv(DATA_DIR / "degree_requirements.csv", degree_requirements)
-    write_csv(DATA_DIR / "students.csv", students)
-    write_csv(DATA_DIR / "student_performance.csv", performance)
-    write_csv(DATA_DIR / "enrollments.csv", enrollments)
-    write_csv(DATA_DIR / "student_preferences.csv", preferences)
-
-    print(f"Wrote synthetic dataset to {DATA_DIR}")
+def merge_parts(output_dir: Path, part_dir: Path, n_shards: int) -> None:
+    """Concatenate shard part files in order, numbering enrollments globally."""
+    enrollment_counter = 1
+    for filename, fields in STUDENT_TABLES:
+        with (output_dir / filename).open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=fields)
+            writer.writeheader()
+            for shard_index in range(n_shards):
+                part_path = part_dir / f"{filename}.{shard_index:06d}"
+                with part_path.open("r", newline="", encoding="utf-8") as part:
+                    for row in csv.DictReader(part, fieldnames=fields):
+                        if filename == "enrollments.csv":
+                            row["enrollment_id"] = f"ENR-{enrollment_counter:05d}"
+                            enrollment_counter += 1
+                        writer.writerow(row)
+                part_path.unlink()
+
+
+def shard_plan(n_students: int, shard_size: int) -> Iterator[Tuple[int, int, int]]:
+    for shard_index, first in enumerate(range(1, n_students + 1, shard_size)):
+        yield shard_index, first, min(shard_size, n_students - first + 1)
+
+
+def generate(
+    output_dir: Path = DATA_DIR,
+    n_students: int = DEFAULT_STUDENTS,
+    catalog_scale: int = 1,
+    seed: int = DEFAULT_SEED,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    workers: Optional[int] = None,
+) -> Dict[str, int]:
+    """Write a complete dataset to ``output_dir`` and return row counts per file."""
+    ensure_data_dir(output_dir)
+    catalog_rng = random.Random(f"{seed}:catalog")
+    courses = build_courses(catalog_scale)
+    write_csv(output_dir / "courses.csv", courses)
+    write_csv(output_dir / "course_offerings.csv", build_course_offerings(courses, catalog_rng))
+    write_csv(output_dir / "degree_requirements.csv", build_degree_requirements(courses))
+
+    plan = list(shard_plan(n_students, shard_size))
+    counts = {"courses.csv": len(courses)}
+    with tempfile.TemporaryDirectory(dir=output_dir, prefix=".shards-") as part_dir:
+        jobs = [(index, first, size, seed, catalog_scale, part_dir) for index, first, size in plan]
+        if (workers or 1) > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                shard_counts = list(pool.map(generate_shard, *zip(*jobs)))
+        else:
+            shard_counts = [generate_shard(*job) for job in jobs]
+        merge_parts(output_dir, Path(part_dir), len(plan))
+
+    for shard in shard_counts:
+        for filename, count in shard.items():
+            counts[filename] = counts.get(filename, 0) + count
+    return counts
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=DEFAULT_STUDENTS, help="number of students to generate")
+    parser.add_argument("--catalog-scale", type=int, default=1, help="replicate the course catalogue this many times")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="master seed; output is reproducible per seed")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="students per independently seeded shard")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes used to generate shards")
+    parser.add_argument("--output-dir", type=Path, default=DATA_DIR, help="directory that receives the CSV files")
+    args = parser.parse_args(argv)
+
+    counts = generate(
+        output_dir=args.output_dir,
+        n_students=args.students,
+        catalog_scale=args.catalog_scale,
+        seed=args.seed,
+        shard_size=args.shard_size,
+        workers=args.workers,
+    )
+    summary = ", ".join(f"{filename}={count}" for filename, count in sorted(counts.items()))
+    print(f"Wrote synthetic dataset to {args.output_dir} ({summary})")
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,461 @@
+"""
+Closed-loop load generator for the Flask routes.
+
+Drives ``/``, ``/interests``, ``/browse`` and ``/export-pdf`` with a
+weighted route mix and a Zipf (or uniform) student-ID distribution drawn
+from the synthetic CSVs, at each requested concurrency level. By default it
+starts gunicorn (``gunicorn.conf.py``, so the preloaded shared dataset) on a
+free local port. ``--url`` targets a server that is already running, and
+``--client`` runs in-process through the Flask test client, which is
+GIL-bound and so only useful for smoke runs. Each level reports throughput,
+latency percentiles overall and per route, error rates and status counts.
+Server runs also report the RSS/PSS of the gunicorn master and each worker
+(peak and final, sampled from ``/proc``). Everything runs offline.
+
+Examples:
+    python scripts/load_test.py --workers 4 --concurrency 1 8 32 --duration 20 --output load.json
+    python scripts/load_test.py --client --concurrency 2 --duration 5
+    python scripts/load_test.py --url http://127.0.0.1:8000 --mix index=70,browse=30
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode, urlsplit
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_MIX = "index=45,interests=15,browse=35,export_pdf=5"
+ROUTES = ("index", "interests", "browse", "export_pdf")
+DEFAULT_SEED = 8760
+
+# (route, method, path, form fields)
+Request = Tuple[str, str, str, Optional[Dict[str, object]]]
+# (route, status, seconds); status 0 means the request raised
+Sample = Tuple[str, int, float]
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ROUTES:
+            raise ValueError(f"Unknown route {name!r}; expected one of {', '.join(ROUTES)}")
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("The route mix needs at least one positive weight")
+    return mix
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_summary(samples_s: List[float]) -> Dict[str, Optional[float]]:
+    if not samples_s:
+        return {"p50": None, "p90": None, "p95": None, "p99": None, "max": None, "mean": None}
+    ordered = sorted(samples_s)
+    return {
+        "p50": round(percentile(ordered, 0.50) * 1000, 3),
+        "p90": round(percentile(ordered, 0.90) * 1000, 3),
+        "p95": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99": round(percentile(ordered, 0.99) * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+    }
+
+
+class Workload:
+    """Builds requests from the synthetic data: route mix, student distribution and payloads."""
+
+    def __init__(self, dataset, mix: Dict[str, float], distribution: str, zipf_s: float, seed: int) -> None:
+        self.routes = list(mix)
+        self.route_weights = [mix[name] for name in self.routes]
+        students = sorted(dataset.students)
+        # Shuffle so the popular Zipf ranks are not simply the lowest IDs
+        random.Random(seed).shuffle(students)
+        self.students = students
+        if distribution == "zipf":
+            weights = [1.0 / (rank ** zipf_s) for rank in range(1, len(students) + 1)]
+        else:
+            weights = [1.0] * len(students)
+        self.cum_weights = [0.0] * len(weights)
+        running = 0.0
+        for pos, weight in enumerate(weights):
+            running += weight
+            self.cum_weights[pos] = running
+        self.history = {sid for sid in students if dataset.student_completed_courses.get(sid)}
+        self.interest_tags = {sid: sorted(dataset.student_interest_tags.get(sid, ())) for sid in students}
+        self.interest_catalog = list(dataset.interest_catalog)
+        self.browse_queries = self._browse_queries(dataset)
+
+    @staticmethod
+    def _browse_queries(dataset) -> List[str]:
+        queries = ["/browse", "/browse?sort=popularity", "/browse?term=next"]
+        skills = sorted({skill for tags in dataset.course_skill_tags.values() for skill in tags})
+        queries += [f"/browse?{urlencode({'q': skill.replace('-', ' ')})}" for skill in skills[:20]]
+        queries += [f"/browse?{urlencode({'category': value})}" for value in dataset.facet_values("category")]
+        queries += [f"/browse?{urlencode({'delivery': value})}" for value in dataset.facet_values("delivery_mode")]
+        return queries
+
+    def student(self, rng: random.Random) -> str:
+        return rng.choices(self.students, cum_weights=self.cum_weights)[0]
+
+    def interests(self, student_id: str, rng: random.Random) -> List[str]:
+        tags = self.interest_tags.get(student_id) or self.interest_catalog
+        return rng.sample(tags, min(len(tags), rng.randint(1, 3)))
+
+    def next_request(self, rng: random.Random) -> Request:
+        route = rng.choices(self.routes, weights=self.route_weights)[0]
+        if route == "browse":
+            return route, "GET", rng.choice(self.browse_queries), None
+        student_id = self.student(rng)
+        if route == "index":
+            return route, "POST", "/", {"student_id": student_id}
+        if route == "interests":
+            return route, "POST", "/interests", {"student_id": student_id, "interests": self.interests(student_id, rng)}
+        if student_id in self.history:
+            return route, "POST", "/export-pdf", {"student_id": student_id, "context": "history"}
+        return route, "POST", "/export-pdf", {
+            "student_id": student_id,
+            "context": "interests",
+            "selected_interests": ",".join(self.interests(student_id, rng)),
+        }
+
+
+def http_sender(base_url: str, timeout: float) -> Callable[[Request], int]:
+    parts = urlsplit(base_url)
+    prefix = parts.path.rstrip("/")
+
+    def send(request: Request) -> int:
+        _, method, path, form = request
+        body = urlencode(form, doseq=True) if form is not None else None
+        headers = {"Content-Type": "application/x-www-form-urlencoded"} if body is not None else {}
+        connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+        try:
+            connection.request(method, prefix + path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        finally:
+            connection.close()
+
+    return send
+
+
+def client_sender() -> Callable[[], Callable[[Request], int]]:
+    sys.path.insert(0, str(BASE_DIR))
+    from main import app
+
+    def make() -> Callable[[Request], int]:
+        client = app.test_client()
+
+        def send(request: Request) -> int:
+            _, method, path, form = request
+            response = client.open(path, method=method, data=form)
+            response.get_data()
+            return response.status_code
+
+        return send
+
+    return make
+
+
+def _read_memory_kb(pid: int) -> Dict[str, int]:
+    memory = {}
+    for filename, fields in (("status", ("VmRSS",)), ("smaps_rollup", ("Pss",))):
+        try:
+            with open(f"/proc/{pid}/{filename}", encoding="utf-8") as handle:
+                for line in handle:
+                    key, _, value = line.partition(":")
+                    if key in fields:
+                        memory[key] = int(value.split()[0])
+        except OSError:
+            continue
+    return memory
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as handle:
+                # The command name may hold spaces, so split after its closing parenthesis
+                fields = handle.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+class MemorySampler(threading.Thread):
+    """Polls RSS/PSS of the master and its workers (or this process) until stopped."""
+
+    def __init__(self, master_pid: Optional[int], interval: float = 0.5) -> None:
+        super().__init__(daemon=True)
+        self.master_pid = master_pid
+        self.interval = interval
+        self.peaks: Dict[int, Dict[str, int]] = {}
+        self.latest: Dict[int, Dict[str, int]] = {}
+        self._stop_event = threading.Event()
+
+    def _pids(self) -> Dict[int, str]:
+        if self.master_pid is None:
+            return {os.getpid(): "client"}
+        pids = {self.master_pid: "master"}
+        pids.update({pid: "worker" for pid in _children(self.master_pid)})
+        return pids
+
+    def sample(self) -> None:
+        for pid in self._pids():
+            memory = _read_memory_kb(pid)
+            if not memory:
+                continue
+            self.latest[pid] = memory
+            peak = self.peaks.setdefault(pid, {})
+            for key, value in memory.items():
+                peak[key] = max(peak.get(key, 0), value)
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            self.sample()
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> Dict[str, Dict[str, object]]:
+        self._stop_event.set()
+        self.join()
+        self.sample()
+        roles = self._pids()
+        report = {}
+        for pid, memory in sorted(self.latest.items()):
+            if pid not in roles:
+                continue  # worker exited (e.g. recycled) during the level
+            peak = self.peaks.get(pid, {})
+            report[str(pid)] = {
+                "role": roles[pid],
+                "rss_mb": round(memory.get("VmRSS", 0) / 1024, 1),
+                "peak_rss_mb": round(peak.get("VmRSS", 0) / 1024, 1),
+                "pss_mb": round(memory["Pss"] / 1024, 1) if "Pss" in memory else None,
+            }
+        return report
+
+
+def run_level(
+    workload: Workload,
+    make_sender: Callable[[], Callable[[Request], int]],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    seed: int,
+    master_pid: Optional[int],
+) -> Dict[str, object]:
+    samples: List[Sample] = []
+    lock = threading.Lock()
+    started = time.perf_counter()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+    sampler = MemorySampler(master_pid)
+
+    def worker(index: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        send = make_sender()
+        local: List[Sample] = []
+        while True:
+            request = workload.next_request(rng)
+            request_started = time.perf_counter()
+            if request_started >= deadline:
+                break
+            try:
+                status = send(request)
+            except Exception:
+                status = 0
+            if request_started >= measure_from:
+                local.append((request[0], status, time.perf_counter() - request_started))
+        with lock:
+            samples.extend(local)
+
+    sampler.start()
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = max(time.perf_counter() - measure_from, 1e-9)
+    memory = sampler.stop()
+
+    statuses: Dict[str, int] = {}
+    for _, status, _ in samples:
+        key = str(status) if status else "exception"
+        statuses[key] = statuses.get(key, 0) + 1
+    errors = sum(1 for _, status, _ in samples if not 200 <= status < 400)
+    routes = {}
+    for name in workload.routes:
+        route_samples = [sample for sample in samples if sample[0] == name]
+        route_errors = sum(1 for _, status, _ in route_samples if not 200 <= status < 400)
+        routes[name] = {
+            "requests": len(route_samples),
+            "errors": route_errors,
+            "error_rate": round(route_errors / len(route_samples), 4) if route_samples else None,
+            "latency_ms": latency_summary([seconds for _, _, seconds in route_samples]),
+        }
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 2),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else None,
+        "statuses": statuses,
+        "latency_ms": latency_summary([seconds for _, _, seconds in samples]),
+        "routes": routes,
+        "memory": memory,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(workers: int, env: Dict[str, str], ready_timeout: float) -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    command = [
+        sys.executable, "-m", "gunicorn", "main:app",
+        "--config", "gunicorn.conf.py",
+        "--bind", f"127.0.0.1:{port}",
+        "--workers", str(workers),
+    ]
+    # A file rather than a pipe, so a chatty server can never block on a full buffer
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(command, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=log)
+    base_url = f"http://127.0.0.1:{port}"
+    probe = http_sender(base_url, timeout=5.0)
+    give_up = time.monotonic() + ready_timeout
+    while time.monotonic() < give_up:
+        if process.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f"gunicorn exited early:\n{log.read().decode(errors='replace')}")
+        try:
+            if probe(("probe", "GET", "/metrics", None)) == 200 and len(_children(process.pid)) >= workers:
+                return process, base_url
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"gunicorn did not answer within {ready_timeout:.0f}s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="concurrent clients per level")
+    parser.add_argument("--duration", type=float, default=15.0, help="measured seconds per level")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before each level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="route weights, e.g. index=45,browse=35")
+    parser.add_argument("--distribution", choices=("zipf", "uniform"), default="zipf", help="how student IDs are drawn")
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Zipf exponent (higher = hotter head)")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers to start")
+    parser.add_argument("--url", help="load an already running server instead of starting gunicorn")
+    parser.add_argument("--client", action="store_true", help="run in-process through the Flask test client")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--ready-timeout", type=float, default=120.0, help="seconds to wait for gunicorn to start")
+    parser.add_argument("--data-dir", help="dataset directory (defaults to MAC_DATA_DIR or data/synthetic)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.url and args.client:
+        parser.error("--url and --client are mutually exclusive")
+    if any(level <= 0 for level in args.concurrency):
+        parser.error("--concurrency levels must be positive")
+    env = dict(os.environ)
+    if args.data_dir:
+        env["MAC_DATA_DIR"] = os.environ["MAC_DATA_DIR"] = str(Path(args.data_dir).resolve())
+
+    sys.path.insert(0, str(BASE_DIR))
+    from app.data_loader import DATA_DIR, _build_dataset
+
+    dataset = _build_dataset(DATA_DIR)
+    workload = Workload(dataset, mix, args.distribution, args.zipf_s, args.seed)
+
+    process: Optional[subprocess.Popen] = None
+    master_pid: Optional[int] = None
+    if args.client:
+        target = "client"
+        make_sender = client_sender()
+    else:
+        if args.url:
+            target, base_url = "url", args.url
+        else:
+            print(f"Starting gunicorn with {args.workers} worker(s)...", file=sys.stderr)
+            process, base_url = start_gunicorn(args.workers, env, args.ready_timeout)
+            target, master_pid = "gunicorn", process.pid
+
+        def make_sender() -> Callable[[Request], int]:
+            return http_sender(base_url, args.timeout)
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "target": target,
+        "workers": args.workers if target == "gunicorn" else None,
+        "data_dir": str(dataset.data_dir),
+        "dataset_version": dataset.version,
+        "mix": mix,
+        "distribution": args.distribution,
+        "zipf_s": args.zipf_s if args.distribution == "zipf" else None,
+        "seed": args.seed,
+        "levels": [],
+    }
+    try:
+        for level in args.concurrency:
+            print(f"Concurrency {level}: {args.warmup:g}s warmup + {args.duration:g}s...", file=sys.stderr)
+            result = run_level(workload, make_sender, level, args.duration, args.warmup, args.seed, master_pid)
+            report["levels"].append(result)
+            print(
+                f"  {result['throughput_rps']} req/s, p50 {result['latency_ms']['p50']} ms, "
+                f"p99 {result['latency_ms']['p99']} ms, errors {result['errors']}/{result['requests']}",
+                file=sys.stderr,
+            )
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(encoded + "\n", encoding="utf-8")
+        print(f"Wrote load test report to {args.output}", file=sys.stderr)
+    else:
+        print(encoded)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
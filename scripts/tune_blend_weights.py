@@ -0,0 +1,322 @@
+"""
+Blend-weight and normalization sweep over leave-one-out holdouts.
+
+The raw content and collaborative score vectors do not depend on the blend
+weights, so they are computed once per student (same holdouts as
+``evaluate_recommender.py``) and stacked into student x course matrices.
+Every normalization pair and content weight (collaborative weight is
+``1 - content``) is then scored with broadcast NumPy operations, and the
+hit-rate/precision/recall/NDCG surface is written as JSON.
+
+Normalizations, applied per student over their candidate courses:
+    minmax  the recommender's ``_normalize`` (collaborative scores over the
+            courses some peer scored, everything else 0)
+    max     divide by the largest score
+    zscore  subtract the mean, divide by the standard deviation
+    l2      divide by the Euclidean norm
+
+Ranking ties break by course ID as in the recommender; the audit boost is
+not applied. Requires NumPy (``pip install -r requirements-dev.txt``), which
+the app itself does not depend on.
+
+Examples:
+    python scripts/tune_blend_weights.py --steps 21 --output sweep.json
+    python scripts/tune_blend_weights.py --data-dir /tmp/mac-large --limit 2000 --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Sequence, Set, Tuple
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = Path(__file__).resolve().parent
+MODES = ("history", "interests")
+NORMALIZATIONS = ("minmax", "max", "zscore", "l2")
+METRIC_NAMES = ("hit_rate", "precision", "recall", "ndcg")
+# Upper bound on weights x students x courses scores held at once
+MAX_BLOCK_ELEMENTS = 8_000_000
+
+# Set in the parent before the pool forks so workers inherit them
+_HOLDOUTS: Dict[str, Set[str]] = {}
+_MODES: List[str] = []
+
+# (student_id, relevant, candidate, excluded, content_raw, collab_raw)
+Signals = Tuple[str, Set[str], Set[str], Set[str], Dict[str, float], Dict[str, float]]
+
+
+def collect_chunk(student_ids: Sequence[str]) -> Dict[str, List[Signals]]:
+    """Raw (un-normalized) scores for each student in ``student_ids``, per mode."""
+    from app.data_loader import get_dataset
+    from app.recommender import (
+        _candidate_courses,
+        _content_profile_from_courses,
+        _content_profile_from_interests,
+        _prerequisites_met,
+        _score_collaborative_history,
+        _score_collaborative_interests,
+        _score_content,
+    )
+
+    dataset = get_dataset()
+    signals: Dict[str, List[Signals]] = {mode: [] for mode in _MODES}
+    for student_id in student_ids:
+        hidden = _HOLDOUTS.get(student_id, set())
+        history = set(dataset.student_completed_courses.get(student_id, set())) - hidden
+        relevant = {course_id for course_id in hidden - history if course_id in dataset.courses}
+        if not relevant:
+            continue
+
+        if "history" in _MODES and history:
+            candidate = {
+                course_id
+                for course_id in _candidate_courses(history, dataset)
+                if _prerequisites_met(course_id, history, dataset)
+            }
+            if candidate:
+                signals["history"].append((
+                    student_id,
+                    relevant,
+                    candidate,
+                    set(),
+                    _score_content(candidate, _content_profile_from_courses(history, dataset), dataset),
+                    _score_collaborative_history(student_id, candidate, history, dataset),
+                ))
+
+        tags = dataset.student_interest_tags.get(student_id, set())
+        if "interests" in _MODES and tags:
+            candidate = _candidate_courses(set(), dataset)
+            # Completed courses are normalized with the rest, then dropped from the ranking
+            signals["interests"].append((
+                student_id,
+                relevant,
+                candidate,
+                history,
+                _score_content(candidate, _content_profile_from_interests(tuple(tags)), dataset),
+                _score_collaborative_interests(candidate, set(tags), dataset, student_id),
+            ))
+    return signals
+
+
+def collect_signals(student_ids: Sequence[str], workers: int, chunk_size: int) -> Dict[str, List[Signals]]:
+    chunks = [student_ids[pos:pos + chunk_size] for pos in range(0, len(student_ids), chunk_size)]
+    signals: Dict[str, List[Signals]] = {mode: [] for mode in _MODES}
+    if workers <= 1:
+        results = map(collect_chunk, chunks)
+        for result in results:
+            for mode, rows in result.items():
+                signals[mode].extend(rows)
+        return signals
+
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for result in pool.map(collect_chunk, chunks):
+            for mode, rows in result.items():
+                signals[mode].extend(rows)
+    return signals
+
+
+def build_matrices(rows: Sequence[Signals], course_ids: Sequence[str]):
+    """Dense raw content/collaborative matrices plus candidate, scored, rankable and relevant masks."""
+    import numpy as np
+
+    column = {course_id: pos for pos, course_id in enumerate(course_ids)}
+    shape = (len(rows), len(course_ids))
+    content = np.zeros(shape)
+    collab = np.zeros(shape)
+    candidate = np.zeros(shape, dtype=bool)
+    scored = np.zeros(shape, dtype=bool)
+    rankable = np.zeros(shape, dtype=bool)
+    relevant = np.zeros(shape, dtype=bool)
+    for row, (_, relevant_ids, candidate_ids, excluded, content_raw, collab_raw) in enumerate(rows):
+        candidate[row, [column[cid] for cid in candidate_ids]] = True
+        rankable[row, [column[cid] for cid in candidate_ids - excluded]] = True
+        relevant[row, [column[cid] for cid in relevant_ids]] = True
+        for course_id, value in content_raw.items():
+            content[row, column[course_id]] = value
+        for course_id, value in collab_raw.items():
+            collab[row, column[course_id]] = value
+            scored[row, column[course_id]] = True
+    return content, collab, candidate, scored, rankable, relevant
+
+
+def normalize(values, present, method: str):
+    """Row-wise normalization over the ``present`` entries; everything else becomes 0."""
+    import numpy as np
+
+    counts = present.sum(axis=1, keepdims=True)
+    if method == "minmax":
+        low = np.where(present, values, np.inf).min(axis=1, keepdims=True)
+        high = np.where(present, values, -np.inf).max(axis=1, keepdims=True)
+        spread = high - low
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = np.where(spread > 0, (values - low) / spread, 1.0)
+    elif method == "max":
+        high = np.where(present, values, -np.inf).max(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = np.where(high > 0, values / high, 0.0)
+    elif method == "zscore":
+        masked = np.where(present, values, 0.0)
+        mean = masked.sum(axis=1, keepdims=True) / np.maximum(counts, 1)
+        deviation = np.where(present, values - mean, 0.0)
+        std = np.sqrt((deviation ** 2).sum(axis=1, keepdims=True) / np.maximum(counts, 1))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = np.where(std > 0, deviation / std, 0.0)
+    elif method == "l2":
+        norm = np.sqrt((np.where(present, values, 0.0) ** 2).sum(axis=1, keepdims=True))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = np.where(norm > 0, values / norm, 0.0)
+    else:
+        raise ValueError(f"Unknown normalization: {method}")
+    return np.where(present, result, 0.0)
+
+
+def sweep(content, collab, rankable, relevant, content_weights, k_values: Sequence[int]):
+    """Mean ``(hit, precision, recall, ndcg)`` per content weight and K, shape (weights, len(k), 4)."""
+    import numpy as np
+
+    students, courses = content.shape
+    top_n = min(max(k_values), courses)
+    discount = 1.0 / np.log2(np.arange(top_n) + 2.0)
+    relevant_count = relevant.sum(axis=1)
+    weights = np.asarray(content_weights, dtype=float)
+    block = max(1, MAX_BLOCK_ELEMENTS // max(students * courses, 1))
+
+    results = np.zeros((len(weights), len(k_values), len(METRIC_NAMES)))
+    for start in range(0, len(weights), block):
+        content_weight = weights[start:start + block, None, None]
+        collab_weight = np.round(1.0 - content_weight, 6)
+        # Same operation order as the recommender, so scores (and ties) match it
+        combined = content_weight * content[None] + collab_weight * collab[None]
+        combined = np.where(rankable[None], combined, -np.inf)
+        # Stable sort on the negated score keeps equal scores in course-ID column order
+        top = np.argsort(-combined, axis=2, kind="stable")[:, :, :top_n]
+        hits = np.take_along_axis(np.broadcast_to(relevant, combined.shape), top, axis=2)
+        hits &= np.take_along_axis(np.broadcast_to(rankable, combined.shape), top, axis=2)
+        for pos, k in enumerate(k_values):
+            within = hits[:, :, :k]
+            found = within.sum(axis=2)
+            ideal = np.cumsum(discount)[np.minimum(relevant_count, min(k, top_n)) - 1]
+            dcg = (within * discount[:within.shape[2]]).sum(axis=2)
+            results[start:start + block, pos, 0] = (found > 0).mean(axis=1)
+            results[start:start + block, pos, 1] = (found / k).mean(axis=1)
+            results[start:start + block, pos, 2] = (found / relevant_count).mean(axis=1)
+            results[start:start + block, pos, 3] = (dcg / ideal).mean(axis=1)
+    return results
+
+
+def _metrics(values, k_values: Sequence[int]) -> Dict[str, Dict[str, float]]:
+    return {
+        str(k): {name: round(float(value), 6) for name, value in zip(METRIC_NAMES, values[pos])}
+        for pos, k in enumerate(k_values)
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, nargs="+", default=[5, 10], help="cutoffs to report metrics at")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--normalizations", nargs="+", choices=NORMALIZATIONS, default=list(NORMALIZATIONS))
+    parser.add_argument("--steps", type=int, default=21, help="content weights evenly spaced over [0, 1]")
+    parser.add_argument("--holdout", choices=("course", "term"), default="course",
+                        help="hide the latest completed course, or every completion in the latest term")
+    parser.add_argument("--data-dir", help="dataset directory (defaults to MAC_DATA_DIR or data/synthetic)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes computing raw scores")
+    parser.add_argument("--chunk-size", type=int, default=200, help="students per pool task")
+    parser.add_argument("--limit", type=int, help="use only the first N students")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    try:
+        import numpy as np
+    except ImportError:
+        parser.error("NumPy is required for the sweep (pip install -r requirements-dev.txt)")
+    if any(k <= 0 for k in args.k):
+        parser.error("--k values must be positive")
+    if args.data_dir:
+        os.environ["MAC_DATA_DIR"] = str(Path(args.data_dir).resolve())
+    os.environ.setdefault("MAC_SHARED_DATASET", "1")
+    sys.path.insert(0, str(BASE_DIR))
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    from app.data_loader import preload_dataset
+    from app.recommender import HISTORY_WEIGHTS, INTEREST_WEIGHTS
+    from evaluate_recommender import build_holdouts
+
+    started = time.perf_counter()
+    dataset = preload_dataset()
+    _HOLDOUTS.update(build_holdouts(dataset.enrollments, whole_term=args.holdout == "term"))
+    _MODES.extend(args.modes)
+    student_ids = list(dataset.students)[:args.limit] if args.limit else list(dataset.students)
+    signals = collect_signals(student_ids, max(1, args.workers), max(1, args.chunk_size))
+    signal_seconds = time.perf_counter() - started
+
+    k_values = sorted(set(args.k))
+    grid = np.round(np.linspace(0.0, 1.0, max(2, args.steps)), 6)
+    current = {"history": HISTORY_WEIGHTS, "interests": INTEREST_WEIGHTS}
+    course_ids = sorted(dataset.courses)
+
+    started = time.perf_counter()
+    modes: Dict[str, object] = {}
+    for mode in args.modes:
+        rows = signals[mode]
+        if not rows:
+            modes[mode] = {"students": 0, "surface": []}
+            continue
+        content_raw, collab_raw, candidate, scored, rankable, relevant = build_matrices(rows, course_ids)
+        weights = np.union1d(grid, [current[mode][0]])
+        surface = []
+        for content_norm in args.normalizations:
+            content = normalize(content_raw, candidate, content_norm)
+            for collab_norm in args.normalizations:
+                # minmax mirrors _normalize: only peer-scored courses take part
+                present = scored if collab_norm == "minmax" else candidate
+                collab = normalize(collab_raw, present, collab_norm)
+                results = sweep(content, collab, rankable, relevant, weights, k_values)
+                for pos, weight in enumerate(weights):
+                    surface.append({
+                        "content_normalization": content_norm,
+                        "collab_normalization": collab_norm,
+                        "content_weight": float(weight),
+                        "collab_weight": round(1.0 - float(weight), 6),
+                        "metrics": _metrics(results[pos], k_values),
+                    })
+        best_key = str(k_values[-1])
+        modes[mode] = {
+            "students": len(rows),
+            "current_weights": list(current[mode]),
+            "best": max(surface, key=lambda entry: entry["metrics"][best_key]["ndcg"]),
+            "surface": surface,
+        }
+    sweep_seconds = time.perf_counter() - started
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "data_dir": str(dataset.data_dir),
+        "dataset_version": dataset.version,
+        "holdout": args.holdout,
+        "k": k_values,
+        "signal_seconds": round(signal_seconds, 3),
+        "sweep_seconds": round(sweep_seconds, 3),
+        "modes": modes,
+    }
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(encoded + "\n", encoding="utf-8")
+        print(f"Wrote sweep report to {args.output}", file=sys.stderr)
+    else:
+        print(encoded)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,98 +1,119 @@
 """
 Script to add new interest preferences based on new courses.
-"""
-import csv
-import random
-from pathlib import Path
 
-random.seed(42)
+Enrollments are streamed rather than loaded whole, and rows are appended
+through ``DeltaWriter``. Reruns with the same seed add nothing. Duplicates are
+keyed on (student_id, preference_type, preference_value).
 
-DATA_DIR = Path(__file__).resolve().parents[1] / "data" / "synthetic"
+Examples:
+    python scripts/update_preferences.py
+    python scripts/update_preferences.py --course MAC-COMP-8900 --interest quantum-computing
+"""
+from __future__ import annotations
 
-def read_csv(filename):
-    with open(DATA_DIR / filename, 'r', encoding='utf-8-sig') as f:
-        return list(csv.DictReader(f))
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
 
-def write_csv(filename, rows, fieldnames):
-    with open(DATA_DIR / filename, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+from delta_writer import DATA_DIR, DeltaWriter, iter_csv, split_csv_arg
 
-# Read data
-preferences = read_csv('student_preferences.csv')
-students = read_csv('students.csv')
-enrollments = read_csv('enrollments.csv')
+# Courses whose enrollees pick up the new interests
+DEFAULT_COURSE_IDS = (
+    'MAC-COMP-8130', 'MAC-COMP-8207', 'MAC-COMP-8380', 'MAC-COMP-8390',
+    'MAC-COMP-8490', 'MAC-COMP-8500', 'MAC-COMP-8540', 'MAC-COMP-8570',
+    'MAC-COMP-8590', 'MAC-COMP-8610', 'MAC-COMP-8640', 'MAC-COMP-8700',
+    'MAC-COMP-8740', 'MAC-COMP-8790'
+)
 
 # New interests/skills from new courses
-new_interests = [
+DEFAULT_INTERESTS = (
     'deep-learning', 'neural-networks', 'ai-fundamentals', 'pattern-recognition',
     'statistical-learning', 'computational-geometry', 'algorithm-design',
     'virtual-reality', '3d-graphics', '3d-animation', 'data-visualization',
     'information-retrieval', 'search-algorithms', 'nosql', 'graph-databases',
     'functional-programming', 'privacy', 'cryptography'
-]
-
-# Map students who took new courses
-student_new_course_map = {}
-for enrollment in enrollments:
-    course_id = enrollment['course_id']
-    # Check if it's one of the new courses
-    if course_id in ['MAC-COMP-8130', 'MAC-COMP-8207', 'MAC-COMP-8380', 'MAC-COMP-8390',
-                     'MAC-COMP-8490', 'MAC-COMP-8500', 'MAC-COMP-8540', 'MAC-COMP-8570',
-                     'MAC-COMP-8590', 'MAC-COMP-8610', 'MAC-COMP-8640', 'MAC-COMP-8700',
-                     'MAC-COMP-8740', 'MAC-COMP-8790']:
-        student_id = enrollment['student_id']
-        if student_id not in student_new_course_map:
-            student_new_course_map[student_id] = []
-        student_new_course_map[student_id].append(course_id)
-
-# Add new preferences for students
-new_preferences = []
-for student_id, courses in student_new_course_map.items():
-    # Select 1-2 new interests for each student
-    num_interests = random.randint(1, 2)
-    selected_interests = random.sample(new_interests, num_interests)
-    
-    for interest in selected_interests:
-        pref = {
-            'student_id': student_id,
-            'preference_type': 'skills_to_build',
-            'preference_value': interest,
-            'weight': round(random.uniform(0.5, 0.9), 2),
-            'source': random.choice(['survey', 'advisor_note'])
-        }
-        new_preferences.append(pref)
-
-# Also add some new career goals
-career_goals = [
+)
+
+DEFAULT_CAREER_GOALS = (
     'ai-engineer', 'ml-engineer', 'data-scientist', 'vr-developer',
     'algorithms-researcher', 'security-analyst', 'database-architect'
-]
-
-# Add career goals for 30% of students
-sample_size = min(len(student_new_course_map), int(len(student_new_course_map) * 0.3))
-if sample_size > 0:
-    for student_id in random.sample(list(student_new_course_map.keys()), sample_size):
-        goal = random.choice(career_goals)
-        pref = {
-            'student_id': student_id,
-            'preference_type': 'career_goal',
-            'preference_value': goal,
-            'weight': round(random.uniform(0.7, 0.95), 2),
-            'source': 'survey'
-        }
-        new_preferences.append(pref)
-
-# Combine old and new
-all_preferences = preferences + new_preferences
-
-# Write updated preferences
-fieldnames = preferences[0].keys()
-write_csv('student_preferences.csv', all_preferences, fieldnames)
-
-print(f"[OK] Added {len(new_preferences)} new preferences")
-print(f"[OK] Total preferences: {len(all_preferences)}")
-print(f"[OK] Students updated: {len(student_new_course_map)}")
-print(f"[OK] File updated: {DATA_DIR / 'student_preferences.csv'}")
+)
+
+
+def students_in_courses(enrollments_path: Path, course_ids: Sequence[str]) -> Dict[str, List[str]]:
+    wanted = set(course_ids)
+    student_new_course_map: Dict[str, List[str]] = {}
+    for enrollment in iter_csv(enrollments_path):
+        if enrollment['course_id'] in wanted:
+            student_new_course_map.setdefault(enrollment['student_id'], []).append(enrollment['course_id'])
+    return student_new_course_map
+
+
+def build_preferences(
+    student_new_course_map: Dict[str, List[str]],
+    interests: Sequence[str],
+    career_goals: Sequence[str],
+    rng: random.Random,
+) -> Iterator[Dict[str, object]]:
+    for student_id in student_new_course_map:
+        # Select 1-2 new interests for each student
+        num_interests = min(rng.randint(1, 2), len(interests))
+        for interest in rng.sample(list(interests), num_interests):
+            yield {
+                'student_id': student_id,
+                'preference_type': 'skills_to_build',
+                'preference_value': interest,
+                'weight': round(rng.uniform(0.5, 0.9), 2),
+                'source': rng.choice(['survey', 'advisor_note'])
+            }
+
+    # Add career goals for 30% of students
+    sample_size = int(len(student_new_course_map) * 0.3)
+    if sample_size > 0 and career_goals:
+        for student_id in rng.sample(list(student_new_course_map), sample_size):
+            yield {
+                'student_id': student_id,
+                'preference_type': 'career_goal',
+                'preference_value': rng.choice(career_goals),
+                'weight': round(rng.uniform(0.7, 0.95), 2),
+                'source': 'survey'
+            }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--course", action="append",
+                        help="course IDs whose enrollees gain new interests (repeatable or comma-separated)")
+    parser.add_argument("--interest", action="append", help="interest tags to draw from")
+    parser.add_argument("--career-goal", action="append", help="career goals to draw from")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    args = parser.parse_args(argv)
+
+    course_ids = split_csv_arg(args.course) or DEFAULT_COURSE_IDS
+    interests = split_csv_arg(args.interest) or DEFAULT_INTERESTS
+    career_goals = split_csv_arg(args.career_goal) or DEFAULT_CAREER_GOALS
+
+    student_new_course_map = students_in_courses(args.data_dir / 'enrollments.csv', course_ids)
+    writer = DeltaWriter(
+        args.data_dir / 'student_preferences.csv',
+        key_fields=('student_id', 'preference_type', 'preference_value'),
+        delta_dir=args.data_dir / 'deltas',
+    )
+
+    rng = random.Random(args.seed)
+    result = writer.append(build_preferences(student_new_course_map, interests, career_goals, rng))
+
+    print(f"[OK] Added {len(result.appended)} new preferences")
+    print(f"[OK] Skipped {result.skipped} already present")
+    print(f"[OK] Students updated: {len(student_new_course_map)}")
+    if result.delta_path:
+        print(f"[OK] Delta written: {result.delta_path}")
+    print(f"[OK] File updated: {writer.csv_path}")
+    return 0
+
 
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import csv
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+# scripts/ is not a package; its modules import each other by bare name
+sys.path.insert(0, str(BASE_DIR / "scripts"))
+
+from app.data_loader import SyntheticDataset  # noqa: E402
+
+COURSES = [
+    {
+        "course_id": "C-CORE-1", "course_code": "CORE-1", "title": "Core One", "credits": "3.0",
+        "category": "core", "delivery_mode": "in-person", "skills": "python|databases",
+        "prerequisites": "", "term_patterns": "Fall|Winter", "difficulty_level": "2", "description": "",
+    },
+    {
+        "course_id": "C-CORE-2", "course_code": "CORE-2", "title": "Core Two", "credits": "3.0",
+        "category": "core", "delivery_mode": "online", "skills": "machine-learning|python",
+        "prerequisites": "C-CORE-1", "term_patterns": "Winter", "difficulty_level": "3", "description": "",
+    },
+    {
+        "course_id": "C-ELEC-1", "course_code": "ELEC-1", "title": "Elective One", "credits": "1.5",
+        "category": "technical-elective", "delivery_mode": "online", "skills": "cloud-computing",
+        "prerequisites": "", "term_patterns": "Summer", "difficulty_level": "4", "description": "",
+    },
+    {
+        "course_id": "C-ELEC-2", "course_code": "ELEC-2", "title": "Elective Two", "credits": "3.0",
+        "category": "technical-elective", "delivery_mode": "hybrid", "skills": "machine-learning",
+        "prerequisites": "", "term_patterns": "Fall", "difficulty_level": "5", "description": "",
+    },
+]
+
+STUDENTS = [
+    {"student_id": "S-1", "interests": "python|machine-learning"},
+    {"student_id": "S-2", "interests": "cloud-computing"},
+    {"student_id": "S-3", "interests": ""},
+]
+
+PERFORMANCE = [
+    {"student_id": "S-1", "cumulative_gpa": "3.40", "last_term_gpa": "3.60", "risk_flag": "no-risk"},
+    {"student_id": "S-2", "cumulative_gpa": "2.50", "last_term_gpa": "2.20", "risk_flag": "at-risk"},
+    {"student_id": "S-3", "cumulative_gpa": "", "last_term_gpa": "", "risk_flag": "no-risk"},
+]
+
+ENROLLMENTS = [
+    {"enrollment_id": "E-1", "student_id": "S-1", "course_id": "C-CORE-1", "term_code": "2025F", "completion_status": "completed"},
+    {"enrollment_id": "E-2", "student_id": "S-1", "course_id": "C-CORE-2", "term_code": "2026W", "completion_status": "completed"},
+    {"enrollment_id": "E-3", "student_id": "S-1", "course_id": "C-ELEC-1", "term_code": "2026W", "completion_status": "completed"},
+    {"enrollment_id": "E-4", "student_id": "S-1", "course_id": "C-ELEC-2", "term_code": "2026W", "completion_status": "completed"},
+    {"enrollment_id": "E-5", "student_id": "S-2", "course_id": "C-CORE-1", "term_code": "2025F", "completion_status": "completed"},
+    {"enrollment_id": "E-6", "student_id": "S-2", "course_id": "C-ELEC-1", "term_code": "2025F", "completion_status": "in-progress"},
+]
+
+PREFERENCES = [
+    {"student_id": "S-2", "preference_type": "career_goal", "preference_value": "cloud-architect"},
+]
+
+REQUIREMENTS = [
+    {
+        "requirement_id": "CORE", "label": "Complete the core", "category": "core",
+        "credit_min": "6.0", "credit_max": "", "eligible_courses": "C-CORE-1|C-CORE-2",
+    },
+    {
+        "requirement_id": "ELECTIVE", "label": "One technical elective", "category": "technical-elective",
+        "credit_min": "3.0", "credit_max": "3.0", "eligible_courses": "C-ELEC-1|C-ELEC-2",
+    },
+    {
+        "requirement_id": "GPA", "label": "Maintain a cumulative GPA of 3.0", "category": "minimum-gpa",
+        "credit_min": "", "credit_max": "", "eligible_courses": "",
+    },
+]
+
+
+def write_csv(path: Path, rows: List[Dict[str, str]]) -> None:
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def data_dir(tmp_path: Path) -> Path:
+    """A four-course, three-student dataset without ``course_offerings.csv``."""
+    write_csv(tmp_path / "courses.csv", COURSES)
+    write_csv(tmp_path / "students.csv", STUDENTS)
+    write_csv(tmp_path / "student_performance.csv", PERFORMANCE)
+    write_csv(tmp_path / "enrollments.csv", ENROLLMENTS)
+    write_csv(tmp_path / "student_preferences.csv", PREFERENCES)
+    write_csv(tmp_path / "degree_requirements.csv", REQUIREMENTS)
+    return tmp_path
+
+
+@pytest.fixture
+def dataset(data_dir: Path) -> SyntheticDataset:
+    return SyntheticDataset(data_dir)
@@ -0,0 +1,50 @@
+from app.audit import audit_population, audit_student
+
+
+def _by_id(audit):
+    return {item["requirement_id"]: item for item in audit["requirements"]}
+
+
+def test_completed_student_satisfies_every_requirement(dataset):
+    audit = audit_student("S-1", dataset=dataset)
+    requirements = _by_id(audit)
+
+    assert audit["satisfied"] is True
+    assert audit["remaining_credits"] == 0.0
+    assert requirements["CORE"]["credits_earned"] == 6.0
+    assert requirements["CORE"]["completed_courses"] == ["C-CORE-1", "C-CORE-2"]
+    assert requirements["GPA"]["satisfied"] is True
+    assert requirements["GPA"]["gpa_required"] == 3.0
+
+
+def test_credit_max_caps_counted_credits(dataset):
+    elective = _by_id(audit_student("S-1", dataset=dataset))["ELECTIVE"]
+
+    # 1.5 + 3.0 completed, but only 3.0 may count
+    assert elective["credits_earned"] == 3.0
+    assert elective["remaining_credits"] == 0.0
+
+
+def test_partial_progress_ignores_unfinished_enrollments(dataset):
+    audit = audit_student("S-2", dataset=dataset)
+    requirements = _by_id(audit)
+
+    assert audit["satisfied"] is False
+    assert requirements["CORE"]["remaining_credits"] == 3.0
+    assert requirements["ELECTIVE"]["credits_earned"] == 0.0
+    assert requirements["GPA"]["satisfied"] is False
+    assert audit["remaining_credits"] == 6.0
+
+
+def test_unknown_gpa_needs_review(dataset):
+    audit = audit_student("S-3", dataset=dataset)
+
+    assert _by_id(audit)["GPA"]["satisfied"] is None
+    assert audit["satisfied"] is False
+
+
+def test_population_matches_individual_audits(dataset):
+    population = list(audit_population(dataset=dataset))
+
+    assert [audit["student_id"] for audit in population] == ["S-1", "S-2", "S-3"]
+    assert population == [audit_student(student_id, dataset=dataset) for student_id in ("S-1", "S-2", "S-3")]
@@ -0,0 +1,39 @@
+from app.recommender import recommend_rows
+
+
+def _results(dataset, rows):
+    return list(recommend_rows(rows, top_n=2, chunk_size=2, dataset=dataset))
+
+
+def test_history_and_interest_rows(dataset):
+    history, interests = _results(dataset, [{"student_id": "s-2"}, {"interests": ["python", " "]}])
+
+    assert history["student_id"] == "S-2"
+    assert history["context"] == "history"
+    assert "C-CORE-1" not in [item["course_id"] for item in history["recommendations"]]
+    assert interests["context"] == "interests"
+    assert interests["interests"] == ["python"]
+    assert interests["recommendations"]
+
+
+def test_unscorable_rows_are_errors(dataset):
+    results = _results(dataset, [
+        {"student_id": "BOGUS"},
+        {"student_id": ""},
+        {"student_id": "S-3"},
+        {"error": "Row is not valid JSON."},
+    ])
+
+    assert [result["row"] for result in results] == [1, 2, 3, 4]
+    assert all("recommendations" not in result for result in results)
+    assert results[0] == {"row": 1, "student_id": "BOGUS", "error": "Unknown student ID."}
+    assert results[1]["error"] == "Row needs a student_id or interests."
+    assert results[2]["error"] == "Student has no completed courses or stored interests."
+    assert results[3] == {"row": 4, "error": "Row is not valid JSON."}
+
+
+def test_explicit_interests_score_unknown_students(dataset):
+    (result,) = _results(dataset, [{"student_id": "BOGUS", "interests": ["cloud-computing"]}])
+
+    assert result["context"] == "interests"
+    assert "error" not in result
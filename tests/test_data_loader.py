@@ -0,0 +1,159 @@
+import shutil
+import threading
+
+import pytest
+
+from app import data_loader
+from app.data_loader import DatasetRegistry, SyntheticDataset
+from app.topk import content_index
+
+from .conftest import write_csv
+
+
+def test_sections_load_on_first_use(dataset):
+    assert not dataset.is_loaded("catalog")
+
+    assert set(dataset.courses) == {"C-CORE-1", "C-CORE-2", "C-ELEC-1", "C-ELEC-2"}
+
+    assert dataset.is_loaded("catalog")
+    assert not dataset.is_loaded("students")
+    assert not dataset.is_loaded("enrollment_graph")
+
+
+def test_popularity_does_not_build_the_enrollment_graph(dataset):
+    popularity = dataset.course_popularity
+
+    assert popularity == {"C-CORE-1": 2, "C-CORE-2": 1, "C-ELEC-1": 1, "C-ELEC-2": 1}
+    assert not dataset.is_loaded("enrollment_graph")
+    assert dataset.collaborative_matrix["C-CORE-1"] == {"S-1", "S-2"}
+    assert dataset.course_popularity == popularity
+
+
+def test_concurrent_first_access_builds_a_section_once(data_dir, monkeypatch):
+    dataset = SyntheticDataset(data_dir)
+    builds = []
+    release = threading.Event()
+    real_build = data_loader._SECTION_BUILDERS["students"]
+
+    def slow_build(target):
+        builds.append(target)
+        release.wait(5)
+        return real_build(target)
+
+    monkeypatch.setitem(data_loader._SECTION_BUILDERS, "students", slow_build)
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(dataset.students)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(builds) == 1
+    assert len(seen) == 4 and all(students is seen[0] for students in seen)
+
+
+def test_optional_files_may_be_missing(dataset, data_dir):
+    assert not (data_dir / "course_offerings.csv").exists()
+
+    assert dataset.course_offerings == {}
+    assert dataset.published_terms == ()
+    assert dataset.offered_courses("2026W") == {"C-CORE-1", "C-CORE-2"}
+
+
+def test_required_files_may_not_be_missing(data_dir):
+    (data_dir / "enrollments.csv").unlink()
+
+    with pytest.raises(FileNotFoundError):
+        SyntheticDataset(data_dir)
+
+
+def test_adding_an_optional_file_changes_the_version(dataset, data_dir):
+    write_csv(data_dir / "course_offerings.csv", [{"course_id": "C-CORE-1", "term_code": "2026W"}])
+
+    assert SyntheticDataset(data_dir).version != dataset.version
+
+
+def test_footprint_includes_derived_indexes(dataset):
+    dataset.load_all()
+    sections_only = dataset.footprint_bytes()
+
+    index = content_index(dataset)
+
+    assert dataset.footprint_bytes() > sections_only
+    assert data_loader._deep_sizeof(index) > 0
+    assert dataset.loaded_sections() == sorted(
+        ["catalog", "facets", "students", "enrollment_graph", "preferences", "offerings", "term_index", "requirements"]
+    )
+
+
+def test_deep_sizeof_stops_at_the_dataset(dataset):
+    dataset.load_all()
+
+    class Holder:
+        def __init__(self):
+            self.dataset = dataset
+
+    assert data_loader._deep_sizeof(Holder()) < data_loader._deep_sizeof(dataset._sections)
+
+
+def _copies(data_dir, tmp_path, names):
+    directories = {}
+    for name in names:
+        target = tmp_path / name
+        shutil.copytree(data_dir, target)
+        directories[name] = target
+    return directories
+
+
+def _measure(registry, names):
+    return [registry.get(name).load_all().footprint_bytes() for name in names]
+
+
+def test_registry_shares_a_dataset_between_names_for_one_directory(data_dir):
+    registry = DatasetRegistry({"a": data_dir, "b": data_dir / "."})
+
+    assert registry.get("a") is registry.get("b")
+    assert "a" in registry and "c" not in registry
+    with pytest.raises(KeyError):
+        registry.get("c")
+
+
+def test_registry_evicts_least_recently_used_past_the_limit(data_dir, tmp_path):
+    directories = _copies(data_dir, tmp_path, ["a", "b", "c"])
+    registry = DatasetRegistry(directories)
+    sizes = _measure(registry, ["a", "b", "c"])
+    registry.memory_limit = sizes[1] + sizes[2]
+    content_index(registry.get("a"))
+    registry.get("b")
+    registry.get("c")
+
+    assert registry.trim() == [directories["a"].resolve()]
+    assert registry.trim() == []
+    status = {row["name"]: row for row in registry.status()}
+    assert not status["a"]["loaded"] and status["a"]["sections"] == []
+    assert status["c"]["loaded"] and status["c"]["footprint_bytes"] == sizes[2]
+    # A rebuilt dataset starts with no sections or indexes
+    assert registry.get("a").loaded_sections() == []
+
+
+def test_registry_always_keeps_the_most_recent_dataset(data_dir, tmp_path):
+    directories = _copies(data_dir, tmp_path, ["a", "b"])
+    registry = DatasetRegistry(directories, memory_limit=1)
+    _measure(registry, ["a", "b"])
+
+    assert registry.trim() == [directories["a"].resolve()]
+    assert registry.status()[1]["loaded"]
+
+
+def test_pinned_dataset_counts_against_the_limit(data_dir, tmp_path):
+    directories = _copies(data_dir, tmp_path, ["a", "b", "default"])
+    pinned = SyntheticDataset(directories.pop("default")).load_all()
+    registry = DatasetRegistry(directories, pinned=lambda: pinned)
+    sizes = _measure(registry, ["a", "b"])
+    registry.memory_limit = sum(sizes)
+
+    assert registry.trim() == [directories["a"].resolve()]
+    registry.pinned = lambda: None
+    registry.get("a").load_all()
+    assert registry.trim() == []
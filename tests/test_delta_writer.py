@@ -0,0 +1,135 @@
+import json
+import threading
+
+import pytest
+
+import delta_writer
+from delta_writer import DeltaWriter, iter_deltas
+
+from .conftest import ENROLLMENTS, write_csv
+
+KEY_FIELDS = ("student_id", "course_id", "term_code")
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "enrollments.csv"
+    write_csv(path, ENROLLMENTS)
+    return path
+
+
+def _writer(csv_path):
+    return DeltaWriter(csv_path, KEY_FIELDS, id_field="enrollment_id", id_prefix="E-", id_width=1,
+                       delta_dir=csv_path.parent / "deltas")
+
+
+def _row(course_id, student_id="S-3"):
+    return {"student_id": student_id, "course_id": course_id, "term_code": "2026S", "completion_status": "completed"}
+
+
+def _csv_rows(path):
+    return list(delta_writer.iter_csv(path))
+
+
+def test_append_assigns_ids_and_skips_duplicates(csv_path):
+    writer = _writer(csv_path)
+    result = writer.append([_row("C-CORE-1"), _row("C-CORE-1"), dict(ENROLLMENTS[0])])
+
+    assert [row["enrollment_id"] for row in result.appended] == ["E-7"]
+    assert result.skipped == 2
+    assert result.delta_path.name == "enrollments-000001.csv"
+    assert _csv_rows(csv_path)[-1]["course_id"] == "C-CORE-1"
+    assert writer.max_id == 7
+
+
+def test_reopened_writer_remembers_keys_without_rescanning(csv_path, monkeypatch):
+    _writer(csv_path).append([_row("C-CORE-1")])
+    monkeypatch.setattr(DeltaWriter, "_scan", lambda self: pytest.fail("index should not be rebuilt"))
+
+    writer = _writer(csv_path)
+    assert writer.contains(_row("C-CORE-1"))
+    assert writer.append([_row("C-CORE-1")]).appended == []
+    assert writer.delta_seq == 1
+
+
+def test_sidecar_stays_small(csv_path):
+    writer = _writer(csv_path)
+    size = writer.index_path.stat().st_size
+    writer.append([_row(f"C-NEW-{n}") for n in range(200)])
+
+    assert "keys" not in json.loads(writer.index_path.read_text())
+    assert writer.index_path.stat().st_size < size + 50
+
+
+def test_interrupted_append_is_rolled_back(csv_path, monkeypatch):
+    writer = _writer(csv_path)
+    before = csv_path.read_bytes()
+    keys_before = writer.keys_path.read_bytes()
+    real_append = delta_writer._fsync_append
+
+    def crash_after_keys(path, offset, data):
+        real_append(path, offset, data)
+        if path == writer.keys_path:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(delta_writer, "_fsync_append", crash_after_keys)
+    with pytest.raises(KeyboardInterrupt):
+        writer.append([_row("C-CORE-1")])
+    monkeypatch.setattr(delta_writer, "_fsync_append", real_append)
+    assert (csv_path.parent / "deltas" / "enrollments-000001.csv").exists()
+
+    recovered = _writer(csv_path)
+    assert csv_path.read_bytes() == before
+    assert recovered.keys_path.read_bytes() == keys_before
+    assert list((csv_path.parent / "deltas").iterdir()) == []
+    assert not recovered.contains(_row("C-CORE-1"))
+    assert recovered.delta_seq == 0
+    assert list(iter_deltas("enrollments", delta_dir=csv_path.parent / "deltas")) == []
+
+
+def test_external_edit_triggers_rescan(csv_path):
+    _writer(csv_path).append([_row("C-CORE-1")])
+    with csv_path.open("a", newline="", encoding="utf-8") as handle:
+        handle.write("E-99,S-2,C-ELEC-2,2026S,completed\r\n")
+
+    writer = _writer(csv_path)
+    assert writer.contains({"student_id": "S-2", "course_id": "C-ELEC-2", "term_code": "2026S"})
+    assert writer.max_id == 99
+    assert writer.delta_seq == 1
+
+
+def test_iter_deltas_replays_batches_in_order(csv_path):
+    writer = _writer(csv_path)
+    writer.append([_row("C-CORE-1")])
+    writer.append([_row("C-CORE-2"), _row("C-ELEC-1")])
+    delta_dir = csv_path.parent / "deltas"
+
+    replayed = [(seq, row["course_id"]) for seq, row in iter_deltas("enrollments", delta_dir=delta_dir)]
+    assert replayed == [(1, "C-CORE-1"), (2, "C-CORE-2"), (2, "C-ELEC-1")]
+    assert [seq for seq, _ in iter_deltas("enrollments", after_seq=1, delta_dir=delta_dir)] == [2, 2]
+
+
+def test_stale_writer_reloads_before_appending(csv_path):
+    first, second = _writer(csv_path), _writer(csv_path)
+    first.append([_row("C-CORE-1")])
+
+    result = second.append([_row("C-CORE-1"), _row("C-CORE-2")])
+
+    assert [row["enrollment_id"] for row in result.appended] == ["E-8"]
+    assert result.skipped == 1
+    assert second.delta_seq == 2
+    assert [row["enrollment_id"] for row in _csv_rows(csv_path)][-2:] == ["E-7", "E-8"]
+
+
+@pytest.mark.skipif(delta_writer.fcntl is None, reason="flock is POSIX-only")
+def test_append_waits_for_the_table_lock(csv_path):
+    writer = _writer(csv_path)
+    appended = threading.Event()
+    worker = threading.Thread(target=lambda: (_writer(csv_path).append([_row("C-CORE-1")]), appended.set()))
+
+    with writer._locked():
+        worker.start()
+        assert not appended.wait(0.2)
+    worker.join(5)
+
+    assert appended.is_set()
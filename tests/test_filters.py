@@ -0,0 +1,58 @@
+from werkzeug.datastructures import MultiDict
+
+from app.filters import CourseFilters
+
+
+def test_no_parameters_means_no_filter():
+    assert CourseFilters.from_params(MultiDict()) is None
+    assert CourseFilters.from_params(MultiDict({"min_difficulty": "hard"})) is None
+
+
+def test_repeated_and_pipe_separated_values():
+    filters = CourseFilters.from_params(MultiDict([("delivery", "online|hybrid"), ("delivery", " in-person ")]))
+
+    assert filters.delivery_modes == {"online", "hybrid", "in-person"}
+
+
+def test_as_params_round_trips():
+    filters = CourseFilters(categories=["core"], credits=["3"], min_difficulty=2, max_difficulty=4)
+    parsed = CourseFilters.from_params(MultiDict(filters.as_params()))
+
+    assert parsed.as_dict() == filters.as_dict()
+
+
+def test_facets_intersect(dataset):
+    filters = CourseFilters(delivery_modes=["online"], categories=["core"])
+
+    assert filters.matching_courses(dataset) == {"C-CORE-2"}
+
+
+def test_whole_credit_values_match_decimal_labels(dataset):
+    assert CourseFilters(credits=["3"]).matching_courses(dataset) == {"C-CORE-1", "C-CORE-2", "C-ELEC-2"}
+
+
+def test_difficulty_range_is_inclusive(dataset):
+    assert CourseFilters(min_difficulty=3, max_difficulty=4).matching_courses(dataset) == {"C-CORE-2", "C-ELEC-1"}
+    assert CourseFilters(min_difficulty=5).matching_courses(dataset) == {"C-ELEC-2"}
+
+
+def test_inactive_filter_matches_whole_catalog(dataset):
+    assert CourseFilters().matching_courses(dataset) == set(dataset.courses)
+
+
+def test_home_form_offers_catalog_facets_and_applies_them(dataset, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "get_dataset", lambda: dataset)
+    client = main.app.test_client()
+
+    home = client.get("/").get_data(as_text=True)
+    assert '<option value="technical-elective"' in home
+    assert '<option value="hybrid"' in home
+    assert '<select name="max_difficulty"' in home
+
+    page = client.post("/", data={"student_id": "S-2", "delivery": "hybrid", "max_difficulty": ""}).get_data(as_text=True)
+    assert "ELEC-2" in page
+    assert "CORE-2" not in page
+    assert '<input type="hidden" name="delivery" value="hybrid">' in page
+    assert 'name="max_difficulty"' not in page
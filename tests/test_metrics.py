@@ -0,0 +1,47 @@
+import json
+
+from app.metrics import MetricsRegistry
+
+
+def test_render_counters_and_cumulative_histograms():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.inc("requests_total", route="/")
+    registry.inc("requests_total", 2, route="/")
+    registry.observe("latency_seconds", 0.05, stage="score")
+    registry.observe("latency_seconds", 0.5, stage="score")
+    registry.observe("latency_seconds", 5.0, stage="score")
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/"} 3' in lines
+    assert 'latency_seconds_bucket{stage="score",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="score",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{stage="score",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{stage="score"} 5.55' in lines
+    assert 'latency_seconds_count{stage="score"} 3' in lines
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.inc("errors_total", reason='bad "row"\n')
+
+    assert 'errors_total{reason="bad \\"row\\"\\n"} 1' in registry.render()
+
+
+def _write_snapshot(directory, pid, value):
+    snapshot = {"counters": [["requests_total", [["route", "/"]], value]], "histograms": []}
+    (directory / f"metrics_{pid}_1.json").write_text(json.dumps(snapshot), encoding="utf-8")
+
+
+def test_render_sums_snapshots_and_forgets_exited_processes(tmp_path):
+    registry = MetricsRegistry(tmp_path)
+    registry.inc("requests_total", route="/")
+    _write_snapshot(tmp_path, 999999, 4)
+
+    assert 'requests_total{route="/"} 5' in registry.render()
+
+    registry.forget_process(999999)
+
+    assert not list(tmp_path.glob("metrics_999999_*.json"))
+    assert 'requests_total{route="/"} 1' in registry.render()
@@ -0,0 +1,20 @@
+from app.pdf_export import PDF_CACHE, generate_recommendations_pdf, pdf_cache_key
+
+ARGS = (None, None, [], "interests", ["cache-test"])
+
+
+def test_cache_hit_returns_the_first_render():
+    PDF_CACHE.pop(pdf_cache_key(*ARGS))
+
+    first = generate_recommendations_pdf(*ARGS).getvalue()
+    second = generate_recommendations_pdf(*ARGS).getvalue()
+
+    assert first.startswith(b"%PDF")
+    assert second == first
+    assert PDF_CACHE.get(pdf_cache_key(*ARGS)) == first
+
+
+def test_key_depends_on_document_inputs_only():
+    assert pdf_cache_key(*ARGS) == pdf_cache_key(*ARGS)
+    assert pdf_cache_key(None, None, [], "interests", ["other"]) != pdf_cache_key(*ARGS)
+    assert pdf_cache_key(None, None, [], "history", ["cache-test"]) != pdf_cache_key(*ARGS)
@@ -0,0 +1,117 @@
+import io
+import json
+import os
+import time
+import zipfile
+
+import pytest
+
+from app.pdf_jobs import JobQueueFull, PdfJobQueue
+
+
+def _args(interest):
+    # Distinct arguments per test, so no submission is answered from PDF_CACHE
+    return None, None, [], "interests", [interest]
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    queue = PdfJobQueue(max_workers=1, max_pending=2, jobs_dir=tmp_path)
+    yield queue
+    if queue._executor is not None:
+        queue._executor.shutdown(cancel_futures=True)
+
+
+def _wait_for(queue, job_id, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = queue.status(job_id)
+        if status["status"] != "pending":
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} still pending")
+
+
+def test_submitted_job_renders_and_is_shared_through_jobs_dir(jobs, tmp_path):
+    job_id = jobs.submit(*_args("python"), filename="plan.pdf")
+
+    assert _wait_for(jobs, job_id)["status"] == "done"
+    assert jobs.result(job_id).startswith(b"%PDF")
+    other_worker = PdfJobQueue(jobs_dir=tmp_path)
+    assert other_worker.status(job_id)["status"] == "done"
+    assert other_worker.result(job_id) == jobs.result(job_id)
+
+
+def test_pool_is_rebuilt_after_a_worker_process_dies(jobs):
+    crashed = jobs._submit(os._exit, 1)
+    assert crashed.exception(timeout=60) is not None
+
+    job_id = jobs.submit(*_args("databases"), filename="after-crash.pdf")
+
+    assert _wait_for(jobs, job_id)["status"] == "done"
+
+
+def test_failed_submit_leaves_nothing_pending(jobs, monkeypatch):
+    def refuse(*args):
+        raise RuntimeError("cannot schedule new futures after shutdown")
+
+    monkeypatch.setattr(jobs, "_submit", refuse)
+    for _ in range(jobs.max_pending + 1):
+        with pytest.raises(RuntimeError):
+            jobs.submit(*_args("refused"), filename="plan.pdf")
+
+    assert jobs._pending == 0
+    assert not jobs._in_flight
+    assert not jobs._jobs
+
+
+def test_full_queue_is_rejected(jobs, monkeypatch):
+    monkeypatch.setattr(jobs, "max_pending", 0)
+
+    with pytest.raises(JobQueueFull):
+        jobs.submit(*_args("queue-full"), filename="plan.pdf")
+
+
+def test_jobs_dir_evicts_least_recently_used_pdfs(tmp_path):
+    queue = PdfJobQueue(cache_bytes=0, jobs_dir=tmp_path, jobs_dir_bytes=250)
+    first = queue._add_finished_job(b"1" * 100, "first.pdf")
+    second = queue._add_finished_job(b"2" * 100, "second.pdf")
+    now = time.time()
+    os.utime(tmp_path / f"{first}.pdf", (now - 20, now - 20))
+    os.utime(tmp_path / f"{second}.pdf", (now - 10, now - 10))
+
+    assert queue.result(first) == b"1" * 100
+    third = queue._add_finished_job(b"3" * 100, "third.pdf")
+
+    assert queue.status(second)["status"] == "expired"
+    assert queue.result(second) is None
+    assert queue.status(first)["status"] == "done"
+    assert queue.status(third)["status"] == "done"
+
+
+def test_pdf_larger_than_the_jobs_dir_budget_is_not_written(tmp_path):
+    queue = PdfJobQueue(cache_bytes=0, jobs_dir=tmp_path, jobs_dir_bytes=50)
+
+    job_id = queue._add_finished_job(b"x" * 100, "big.pdf")
+
+    assert not (tmp_path / f"{job_id}.pdf").exists()
+    assert queue.status(job_id)["status"] == "expired"
+
+
+def test_stream_zip_writes_documents_in_order_with_a_manifest(jobs):
+    documents = [
+        {"filename": "a.pdf", "student_id": "S-1", "args": _args("zip-a")},
+        {"filename": "missing.pdf", "student_id": "S-404", "error": "Unknown student ID."},
+        {"filename": "b.pdf", "student_id": "S-2", "args": _args("zip-b")},
+        {"filename": "a-again.pdf", "student_id": "S-1", "args": _args("zip-a")},
+    ]
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(jobs.stream_zip(documents))))
+
+    assert archive.namelist() == ["a.pdf", "b.pdf", "a-again.pdf", "manifest.json"]
+    assert archive.read("a.pdf").startswith(b"%PDF")
+    manifest = json.loads(archive.read("manifest.json"))["documents"]
+    assert [entry["filename"] for entry in manifest] == ["a.pdf", "missing.pdf", "b.pdf", "a-again.pdf"]
+    assert manifest[1] == {"filename": "missing.pdf", "student_id": "S-404", "error": "Unknown student ID."}
+    assert manifest[0]["bytes"] == len(archive.read("a.pdf"))
+    assert manifest[3]["cached"] is True
@@ -0,0 +1,62 @@
+from app.planner import plan_pathways
+
+
+def _course_ids(plan):
+    return [[course["course_id"] for course in term["courses"]] for term in plan["terms"]]
+
+
+def _assert_feasible(plan, dataset, completed):
+    done = set(completed)
+    for term in plan["terms"]:
+        taken = {course["course_id"] for course in term["courses"]}
+        for course_id in taken:
+            assert course_id in dataset.offered_courses(term["term_code"])
+            prerequisites = dataset.courses[course_id]["prerequisites"]
+            assert set(filter(None, prerequisites.split("|"))) <= done
+        done |= taken
+
+
+def test_plans_respect_offerings_and_prerequisites(dataset):
+    result = plan_pathways("S-3", start_term="2026F", dataset=dataset)
+
+    best = result["plans"][0]
+    assert best["complete"] is True
+    assert _course_ids(best) == [["C-CORE-1", "C-ELEC-2"], ["C-CORE-2"]]
+    assert [term["term_code"] for term in best["terms"]] == ["2026F", "2027W"]
+    for plan in result["plans"]:
+        _assert_feasible(plan, dataset, ())
+    assert result["unplanned_requirements"] == [
+        {"requirement_id": "GPA", "label": "Maintain a cumulative GPA of 3.0"}
+    ]
+
+
+def test_completed_courses_count_toward_requirements(dataset):
+    result = plan_pathways("S-2", start_term="2026F", dataset=dataset)
+
+    core = next(item for item in result["requirements"] if item["requirement_id"] == "CORE")
+    assert core["completed_credits"] == 3.0
+    assert core["remaining_credits"] == 3.0
+    assert _course_ids(result["plans"][0]) == [["C-ELEC-2"], ["C-CORE-2"]]
+    _assert_feasible(result["plans"][0], dataset, dataset.student_completed_courses["S-2"])
+
+
+def test_finished_student_needs_no_terms(dataset):
+    result = plan_pathways("S-1", start_term="2026F", dataset=dataset)
+
+    assert result["plans"] == [{"complete": True, "terms_used": 0, "total_score": 0, "mean_score": 0.0, "terms": []}]
+
+
+def test_course_load_limit_stretches_the_plan(dataset):
+    result = plan_pathways("S-3", start_term="2026F", courses_per_term=1, dataset=dataset)
+
+    best = result["plans"][0]
+    assert best["terms_used"] == 4
+    assert all(len(term["courses"]) <= 1 for term in best["terms"])
+    _assert_feasible(best, dataset, ())
+
+
+def test_too_few_terms_yields_no_plan(dataset):
+    result = plan_pathways("S-3", start_term="2026F", max_terms=1, dataset=dataset)
+
+    assert result["plans"] == []
+    assert result["timed_out"] is False
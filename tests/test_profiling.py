@@ -0,0 +1,44 @@
+import pytest
+
+import main
+from app.profiling import RequestProfiler
+
+TOKEN = "s3cret"
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "profiler", RequestProfiler(TOKEN, tmp_path))
+    return main.app.test_client()
+
+
+def test_non_ascii_token_is_rejected_without_error(client):
+    response = client.get("/metrics", headers={"X-Profile": "sécret"})
+
+    assert response.status_code == 200
+    assert "X-Profile-Report" not in response.headers
+
+
+def test_profiled_request_writes_a_report(client, tmp_path):
+    response = client.get(f"/metrics?profile={TOKEN}&profile_format=text")
+
+    assert response.headers["X-Profile-Status"] == "captured"
+    report_id = response.headers["X-Profile-Report"]
+    assert "function calls" in response.get_data(as_text=True)
+    assert (tmp_path / f"{report_id}.pstats").exists()
+
+
+def test_streamed_response_is_profiled_until_the_body_is_sent(client, tmp_path):
+    response = client.post(
+        f"/bulk-recommendations?profile={TOKEN}&profile_format=text",
+        data="student_id\nNOT-A-STUDENT\n",
+        content_type="text/csv",
+    )
+    report_id = response.headers["X-Profile-Report"]
+
+    assert b'"error"' in response.data
+    response.close()
+    summary = (tmp_path / f"{report_id}.txt").read_text(encoding="utf-8")
+    assert "recommend_rows" in summary
+    # The slot was released once the stream closed
+    assert client.get(f"/metrics?profile={TOKEN}").headers["X-Profile-Status"] == "captured"
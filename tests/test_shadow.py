@@ -0,0 +1,68 @@
+import pytest
+
+from app.shadow import ShadowRunner, load_engine, rank_correlation, topn_overlap
+
+
+def test_topn_overlap():
+    assert topn_overlap(["a", "b", "c", "d"], ["b", "d", "x"]) == 0.5
+    assert topn_overlap(["a"], []) == 0.0
+    assert topn_overlap([], []) == 1.0
+    assert topn_overlap([], ["a"]) == 0.0
+
+
+def test_rank_correlation_extremes():
+    assert rank_correlation(["a", "b", "c", "d"], ["a", "b", "c", "d"]) == 1.0
+    assert rank_correlation(["a", "b", "c", "d"], ["d", "c", "b", "a"]) == -1.0
+
+
+def test_rank_correlation_uses_only_common_courses():
+    # x and y are ignored; a, b, c keep the same relative order
+    assert rank_correlation(["a", "x", "b", "c"], ["y", "a", "b", "c"]) == 1.0
+    assert rank_correlation(["a", "b", "c"], ["b", "a", "c"]) == pytest.approx(0.5)
+
+
+def test_rank_correlation_needs_two_common_courses():
+    assert rank_correlation(["a", "b"], ["a", "x"]) is None
+    assert rank_correlation([], []) is None
+
+
+def test_load_engine():
+    assert load_engine("app.shadow:topn_overlap") is topn_overlap
+    with pytest.raises(ValueError):
+        load_engine("app.shadow")
+    with pytest.raises(ValueError):
+        load_engine("app.shadow:KINDS")
+
+
+def _items(*course_ids):
+    return [{"course_id": course_id} for course_id in course_ids]
+
+
+def test_runner_returns_primary_result_and_shadows_sampled_calls():
+    calls = []
+
+    def engine(*args, **kwargs):
+        calls.append((args, kwargs))
+        return _items("b", "a")
+
+    runner = ShadowRunner({"interests": ("candidate", engine)}, sample_rate=1.0)
+    result = runner.run("interests", lambda tags, top_n: _items("a", "b"), ["ml"], top_n=2)
+    runner._get_executor().shutdown(wait=True)
+
+    assert result == _items("a", "b")
+    assert calls == [((["ml"],), {"top_n": 2})]
+    assert runner._pending == 0
+
+
+def test_runner_skips_unsampled_kinds_and_survives_engine_errors():
+    def broken(*args, **kwargs):
+        raise RuntimeError("shadow failure")
+
+    off = ShadowRunner({"student": ("broken", broken)}, sample_rate=0.0)
+    assert not off.enabled("student")
+    assert off.run("student", lambda: _items("a")) == _items("a")
+
+    on = ShadowRunner({"student": ("broken", broken)}, sample_rate=1.0)
+    assert on.run("student", lambda: _items("a")) == _items("a")
+    on._get_executor().shutdown(wait=True)
+    assert on._pending == 0
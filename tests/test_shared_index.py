@@ -0,0 +1,50 @@
+import pytest
+
+from app.data_loader import SyntheticDataset, _share_dataset
+from app.recommender import recommend_for_interests, recommend_for_student
+from app.shared_index import SharedIndex, course_students_view, student_courses_view, student_tags_view
+
+
+@pytest.fixture
+def index(dataset):
+    return SharedIndex(
+        dataset.student_completed_courses,
+        dataset.student_interest_tags,
+        list(dataset.courses),
+        dataset.interest_catalog,
+    )
+
+
+def test_views_match_the_dict_indexes(dataset, index):
+    completed = student_courses_view(index)
+    completers = course_students_view(index)
+    tags = student_tags_view(index)
+
+    assert {sid: set(courses) for sid, courses in completed.items()} == dataset.student_completed_courses
+    assert {cid: set(students) for cid, students in completers.items()} == dataset.collaborative_matrix
+    assert {sid: set(values) for sid, values in tags.items()} == dataset.student_interest_tags
+    assert "C-CORE-2" in completed["S-1"]
+    assert "C-NOPE" not in completed["S-1"]
+    assert len(completers["C-CORE-1"]) == 2
+
+
+def test_label_sets_support_set_algebra(index):
+    completed = student_courses_view(index)
+    first, second = completed["S-1"], completed["S-2"]
+
+    assert first & second == {"C-CORE-1"}
+    assert second | {"C-NEW"} == {"C-CORE-1", "C-NEW"}
+    assert first - second == {"C-CORE-2", "C-ELEC-1", "C-ELEC-2"}
+    assert {"C-CORE-1", "C-NEW"} & second == {"C-CORE-1"}
+    assert second <= first
+    assert isinstance(first ^ second, set)
+
+
+def test_shared_dataset_scores_identically(data_dir):
+    plain = SyntheticDataset(data_dir)
+    shared = _share_dataset(SyntheticDataset(data_dir))
+
+    assert shared.shared is not None
+    for student_id in ("S-1", "S-2"):
+        assert recommend_for_student(student_id, dataset=shared) == recommend_for_student(student_id, dataset=plain)
+    assert recommend_for_interests(["python"], dataset=shared) == recommend_for_interests(["python"], dataset=plain)
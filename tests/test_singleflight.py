@@ -0,0 +1,133 @@
+import itertools
+import threading
+
+import pytest
+
+from app.metrics import METRICS, SINGLEFLIGHT_CALLS
+from app.singleflight import SingleFlight
+
+WAIT = 5.0
+
+
+def _start_followers(group, key, func, count, results, errors):
+    def call():
+        try:
+            results.append(group.do(key, func))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+_names = itertools.count()
+
+
+def _group():
+    return SingleFlight(f"test-{next(_names)}")
+
+
+def _followers(group):
+    prefix = f'{SINGLEFLIGHT_CALLS}{{group="{group.name}",role="follower"}} '
+    for line in METRICS.render().splitlines():
+        if line.startswith(prefix):
+            return int(float(line[len(prefix):]))
+    return 0
+
+
+def _wait_for_followers(group, count):
+    # Followers are counted just before they block on the leader
+    pause = threading.Event()
+    for _ in range(500):
+        if _followers(group) >= count:
+            return
+        pause.wait(0.01)
+    raise AssertionError("followers never joined the flight")
+
+
+def test_concurrent_callers_share_one_execution():
+    group = _group()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(WAIT)
+        return ["shared"]
+
+    results, errors = [], []
+    leader = _start_followers(group, "k", compute, 1, results, errors)
+    assert started.wait(WAIT)
+    followers = _start_followers(group, "k", compute, 4, results, errors)
+    _wait_for_followers(group, 4)
+    release.set()
+    for thread in leader + followers:
+        thread.join(WAIT)
+
+    assert len(calls) == 1
+    assert errors == []
+    assert len(results) == 5
+    assert all(result is results[0] for result in results)
+    assert group.in_flight() == 0
+
+
+def test_leader_exception_reaches_every_follower():
+    group = _group()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(WAIT)
+        raise ValueError("boom")
+
+    results, errors = [], []
+    leader = _start_followers(group, "k", fail, 1, results, errors)
+    assert started.wait(WAIT)
+    followers = _start_followers(group, "k", fail, 3, results, errors)
+    _wait_for_followers(group, 3)
+    release.set()
+    for thread in leader + followers:
+        thread.join(WAIT)
+
+    assert results == []
+    assert len(errors) == 4
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert group.in_flight() == 0
+
+
+def test_finished_keys_are_not_cached():
+    group = _group()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert group.do("k", compute) == 1
+    assert group.do("k", compute) == 2
+
+
+def test_failed_call_can_be_retried():
+    group = _group()
+
+    with pytest.raises(RuntimeError):
+        group.do("k", _raise)
+    assert group.do("k", lambda: "ok") == "ok"
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    group = _group()
+    release = threading.Event()
+    results, errors = [], []
+    blocked = _start_followers(group, "slow", lambda: release.wait(WAIT), 1, results, errors)
+
+    assert group.do("fast", lambda: "done") == "done"
+    release.set()
+    blocked[0].join(WAIT)
+
+
+def _raise():
+    raise RuntimeError("nope")
@@ -0,0 +1,50 @@
+from app.data_loader import SyntheticDataset
+from app.snapshots import issue_snapshot_token, load_snapshot
+
+SECRET = "test-secret"
+RECOMMENDATIONS = [
+    {"course_id": "C-CORE-2", "combined_score": 0.9, "content_score": 0.8, "collab_score": 0.5},
+    {"course_id": "C-ELEC-2", "combined_score": 0.4, "content_score": 0.3, "collab_score": 0.1},
+]
+
+
+def _token(dataset, context="history", student_id="S-2", recommendations=RECOMMENDATIONS):
+    return issue_snapshot_token(SECRET, dataset, context, student_id, ["python"], recommendations)
+
+
+def test_round_trip_restores_ranking_and_scores(dataset):
+    loaded = load_snapshot(SECRET, _token(dataset), dataset, "history", "S-2")
+
+    assert loaded is not None
+    recommendations, interests = loaded
+    assert interests == ["python"]
+    assert [item["course_id"] for item in recommendations] == ["C-CORE-2", "C-ELEC-2"]
+    assert recommendations[0]["combined_score"] == 0.9
+
+
+def test_wrong_key_or_tampered_token_is_rejected(dataset):
+    token = _token(dataset)
+
+    assert load_snapshot("other-secret", token, dataset, "history", "S-2") is None
+    assert load_snapshot(SECRET, token[:-2] + "xx", dataset, "history", "S-2") is None
+    assert load_snapshot(SECRET, "not-a-token", dataset, "history", "S-2") is None
+
+
+def test_mismatched_request_is_rejected(dataset):
+    token = _token(dataset)
+
+    assert load_snapshot(SECRET, token, dataset, "interests", "S-2") is None
+    assert load_snapshot(SECRET, token, dataset, "history", "S-1") is None
+
+
+def test_stale_dataset_version_is_rejected(dataset, data_dir):
+    token = _token(dataset)
+    newer = SyntheticDataset(data_dir, version="something-else")
+
+    assert load_snapshot(SECRET, token, newer, "history", "S-2") is None
+
+
+def test_unknown_course_is_rejected(dataset):
+    missing = [dict(RECOMMENDATIONS[0], course_id="C-GONE")]
+
+    assert load_snapshot(SECRET, _token(dataset, recommendations=missing), dataset, "history", "S-2") is None
@@ -0,0 +1,37 @@
+from app.data_loader import SyntheticDataset
+from app.recommender import recommend_for_interests, recommend_for_student
+
+from .conftest import write_csv
+
+
+def _ids(recommendations):
+    return {item["course_id"] for item in recommendations}
+
+
+def test_unpublished_terms_fall_back_to_term_patterns(dataset):
+    assert dataset.published_terms == ()
+    assert dataset.offered_courses("2026F") == {"C-CORE-1", "C-ELEC-2"}
+    assert dataset.offered_courses("2027W") == {"C-CORE-1", "C-CORE-2"}
+    assert dataset.offered_courses("2027S") == {"C-ELEC-1"}
+
+
+def test_published_offerings_override_term_patterns(data_dir):
+    write_csv(data_dir / "course_offerings.csv", [
+        {"offering_id": "O-1", "course_id": "C-ELEC-1", "term_code": "2026F"},
+        {"offering_id": "O-2", "course_id": "C-GONE", "term_code": "2026F"},
+    ])
+    dataset = SyntheticDataset(data_dir)
+
+    assert dataset.published_terms == ("2026F",)
+    assert dataset.offered_courses("2026F") == {"C-ELEC-1"}
+    assert dataset.offered_courses("2027W") == {"C-CORE-1", "C-CORE-2"}
+
+
+def test_recommendations_only_include_offered_courses(dataset):
+    summer = recommend_for_interests(["python", "cloud-computing"], dataset=dataset, term="2026S")
+    fall = recommend_for_student("S-2", dataset=dataset, term="2026F")
+
+    assert _ids(summer) == {"C-ELEC-1"}
+    assert _ids(fall) == {"C-ELEC-2"}
+    assert _ids(recommend_for_student("S-2", dataset=dataset, term="2027W")) == {"C-CORE-2"}
+    assert recommend_for_student("S-1", dataset=dataset, term="2027W") == []
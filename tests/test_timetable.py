@@ -0,0 +1,65 @@
+from app.timetable import TermTimetable, get_timetable
+
+
+def _offering(course_id, days, start, end, offering_id=None):
+    return {
+        "offering_id": offering_id or f"O-{course_id}",
+        "course_id": course_id,
+        "term_code": "2026F",
+        "meeting_days": days,
+        "start_time": start,
+        "end_time": end,
+    }
+
+
+def test_clashing_sections_are_never_combined():
+    timetable = TermTimetable("2026F", [
+        _offering("A", "Mon|Wed", "09:00", "10:30"),
+        _offering("B", "Wed", "10:00", "11:00"),
+        _offering("C", "Wed", "10:30", "12:00"),
+    ])
+
+    chosen, exhaustive = timetable.best_conflict_free({"A": 1.0, "B": 0.9, "C": 0.5}, top_n=3)
+
+    assert [course_id for course_id, _ in chosen] == ["A", "C"]
+    assert exhaustive is True
+
+
+def test_best_total_beats_greedy_choice():
+    timetable = TermTimetable("2026F", [
+        _offering("A", "Tue", "09:00", "12:00"),
+        _offering("B", "Tue", "09:00", "10:00"),
+        _offering("C", "Tue", "11:00", "12:00"),
+    ])
+
+    chosen, _ = timetable.best_conflict_free({"A": 1.0, "B": 0.9, "C": 0.9}, top_n=2)
+
+    assert sorted(course_id for course_id, _ in chosen) == ["B", "C"]
+
+
+def test_alternative_section_avoids_a_clash():
+    timetable = TermTimetable("2026F", [
+        _offering("A", "Thu", "13:00", "14:00"),
+        _offering("B", "Thu", "13:30", "14:30", "O-B1"),
+        _offering("B", "Fri", "13:30", "14:30", "O-B2"),
+    ])
+
+    chosen, _ = timetable.best_conflict_free({"A": 1.0, "B": 0.8}, top_n=2)
+
+    assert [timetable.meeting(idx)["offering_id"] for _, idx in chosen] == ["O-A", "O-B2"]
+
+
+def test_zero_score_courses_fill_free_slots():
+    timetable = TermTimetable("2026F", [
+        _offering("A", "Mon", "09:00", "10:00"),
+        _offering("B", "Mon", "11:00", "12:00"),
+        _offering("C", "", "", ""),
+    ])
+
+    chosen, _ = timetable.best_conflict_free({"A": 1.0, "B": 0.0, "C": 0.0}, top_n=3)
+
+    assert sorted(course_id for course_id, _ in chosen) == ["A", "B", "C"]
+
+
+def test_unpublished_term_has_no_timetable(dataset):
+    assert get_timetable("2026F", dataset) is None
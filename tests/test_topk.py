@@ -0,0 +1,107 @@
+import random
+from collections import Counter
+
+import pytest
+
+from app import recommender
+from app.recommender import _normalize, recommend_for_interests, recommend_for_student
+from app.topk import sparse_content_scores, top_k
+
+
+def _dense_content_scores(candidates, profile, dataset):
+    # The full scan top_k replaced: every candidate, every feature
+    scores = {}
+    for course_id in candidates:
+        course = dataset.courses[course_id]
+        score = 0.0
+        for skill in dataset.course_skill_tags.get(course_id, set()):
+            score += profile.get(skill, 0.0)
+        score += profile.get(f"category::{course['category']}", 0.0)
+        score += profile.get(f"delivery::{course.get('delivery_mode', '')}", 0.0)
+        for term in course.get("term_patterns", "").split("|"):
+            if term.strip():
+                score += 0.1 * profile.get(f"term::{term.strip().lower()}", 0.0)
+        scores[course_id] = score
+    return scores
+
+
+def _dense_top_k(candidates, content_raw, collab_scores, content_weight, collab_weight, top_n, boosts=None):
+    boosts = boosts or {}
+    content_scores = _normalize(content_raw)
+    combined = {
+        course_id: content_weight * content_scores.get(course_id, 0.0)
+        + collab_weight * collab_scores.get(course_id, 0.0)
+        + boosts.get(course_id, 0.0)
+        for course_id in candidates
+    }
+    ranked = sorted(candidates, key=lambda course_id: (-combined[course_id], course_id))[:top_n]
+    return [
+        (course_id, combined[course_id], content_scores[course_id], collab_scores.get(course_id, 0.0))
+        for course_id in ranked
+    ]
+
+
+@pytest.mark.parametrize(
+    "profile",
+    [
+        Counter(),
+        Counter({"python": 2.0}),
+        Counter({"machine-learning": 1.0, "category::core": 0.5, "term::winter": 3.0}),
+        Counter({"delivery::online": 1.0, "unknown-skill": 4.0}),
+    ],
+)
+def test_sparse_content_scores_match_a_full_scan(dataset, profile):
+    candidates = set(dataset.courses)
+
+    sparse = sparse_content_scores(candidates, profile, dataset)
+    dense = _dense_content_scores(candidates, profile, dataset)
+
+    assert {course_id: sparse.get(course_id, 0.0) for course_id in candidates} == dense
+    assert all(dense[course_id] == 0.0 for course_id in candidates - sparse.keys())
+
+
+def test_sparse_content_scores_stay_within_the_candidates(dataset):
+    scores = sparse_content_scores({"C-CORE-2"}, Counter({"python": 1.0}), dataset)
+
+    assert scores == {"C-CORE-2": 1.0}
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_top_k_matches_a_full_sort(seed):
+    rng = random.Random(seed)
+    candidates = {f"C-{index:03d}" for index in range(rng.randint(1, 40))}
+    pool = sorted(candidates)
+    # Coarse values so ties, zero-only and constant scores all come up
+    content_raw = {course_id: rng.choice([0.0, 0.5, 1.0, 2.0]) for course_id in rng.sample(pool, rng.randint(0, len(pool)))}
+    collab_scores = _normalize({course_id: rng.choice([0.0, 1.0, 3.0]) for course_id in rng.sample(pool, rng.randint(0, len(pool)))})
+    boosts = {course_id: rng.choice([-0.2, 0.1]) for course_id in rng.sample(pool, rng.randint(0, min(3, len(pool))))}
+    top_n = rng.randint(1, len(pool) + 2)
+
+    # Dense scoring treats every unscored candidate as an explicit 0.0
+    dense_content = {course_id: content_raw.get(course_id, 0.0) for course_id in candidates}
+    expected = _dense_top_k(candidates, dense_content, collab_scores, 0.6, 0.4, top_n, boosts)
+    actual = top_k(candidates, content_raw, collab_scores, 0.6, 0.4, top_n, boosts=boosts)
+
+    assert [row[0] for row in actual] == [row[0] for row in expected]
+    for got, want in zip(actual, expected):
+        assert got[1:] == pytest.approx(want[1:])
+
+
+def test_top_k_handles_empty_input():
+    assert top_k(set(), {}, {}, 0.6, 0.4, 5) == []
+    assert top_k({"C-1"}, {}, {}, 0.6, 0.4, 0) == []
+
+
+def test_recommendations_match_dense_scoring(dataset, monkeypatch):
+    def run():
+        return (
+            [recommend_for_student(student_id, top_n=3, dataset=dataset) for student_id in ("S-2", "S-3")],
+            [recommend_for_interests(interests, top_n=3, dataset=dataset)
+             for interests in (["python"], ["cloud-computing", "machine-learning"], ["unknown"])],
+        )
+
+    sparse = run()
+    monkeypatch.setattr(recommender, "_score_content", _dense_content_scores)
+    monkeypatch.setattr(recommender, "top_k", _dense_top_k)
+
+    assert run() == sparse